@@ -1,16 +1,148 @@
+import json
+
 from django.contrib import admin
-from .models import Property, Lead, Contact, PropertyImage
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+
+from .jobs import TASKS, _load_tasks
+from .models import Property, Lead, Contact, PropertyImage, Job
+from .search import text_search
+
+# Built to stay fast with hundreds of thousands of rows: related rows are
+# joined in (no per-row __str__ queries), foreign keys use autocomplete or
+# raw-id widgets instead of <select>s listing every row, filters offer fixed
+# values instead of SELECT DISTINCT over the table and match indexed
+# columns, and big changelists show PostgreSQL's row estimate instead of
+# running COUNT(*).
+
+# Below this many (estimated) rows, an exact count is cheap enough
+EXACT_COUNT_LIMIT = 10000
+
+
+class EstimatedCountPaginator(Paginator):
+    """Uses the planner's row estimate when it's above EXACT_COUNT_LIMIT (PostgreSQL only)."""
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if hasattr(queryset, 'explain') and connections[queryset.db].vendor == 'postgresql':
+            plan = json.loads(queryset.order_by().explain(format='json'))
+            estimate = int(plan[0]['Plan']['Plan Rows'])
+            if estimate > EXACT_COUNT_LIMIT:
+                return estimate
+        return super().count
+
+
+class ScalableAdmin(admin.ModelAdmin):
+    paginator = EstimatedCountPaginator
+    # Skips the second, unfiltered COUNT(*) the changelist runs for "x of y"
+    show_full_result_count = False
+    list_per_page = 50
+
+
+def values_filter(field_name, values, title=None):
+    """A list filter with fixed choices (no SELECT DISTINCT); any ?<field>= value still works."""
+    class ValuesFilter(admin.SimpleListFilter):
+        parameter_name = field_name
+
+        def lookups(self, request, model_admin):
+            return [(value, value) for value in values]
+
+        def queryset(self, request, queryset):
+            if self.value():
+                return queryset.filter(**{field_name: self.value()})
+            return queryset
+
+    ValuesFilter.title = title or field_name.replace('_', ' ')
+    return ValuesFilter
+
+
+def _task_names():
+    _load_tasks()
+    return sorted(TASKS)
+
+
+def _task_queues():
+    _load_tasks()
+    return sorted({queue for _func, queue, _attempts in TASKS.values()})
 
-# Register your models here.
-# admin.site.register(Property)
-admin.site.register(Lead)
-admin.site.register(Contact)
-admin.site.register(PropertyImage)
 
 class PropertyImageInline(admin.TabularInline):
     model = PropertyImage
     extra = 1
 
+
 @admin.register(Property)
-class PropertyAdmin(admin.ModelAdmin):
-    inlines = [PropertyImageInline]
\ No newline at end of file
+class PropertyAdmin(ScalableAdmin):
+    inlines = [PropertyImageInline]
+    list_display = ['id', 'title', 'type', 'status', 'price', 'colony', 'owner', 'leads_count', 'created_at']
+    list_select_related = ['owner']
+    list_filter = [
+        values_filter('status', ['Available', 'Reserved', 'Sold', 'Rented']),
+        values_filter('type', ['House', 'Plot', 'Commercial']),
+        ('created_at', admin.DateFieldListFilter),
+    ]
+    ordering = ['-created_at', '-id']
+    search_fields = ['title']  # See get_search_results; also enables autocomplete for Property
+    autocomplete_fields = ['owner']
+    readonly_fields = ['leads_count', 'new_leads_count', 'price_value', 'area_sqft', 'price_per_sqft']
+
+    def get_search_results(self, request, queryset, search_term):
+        # An id, or the same indexed full-text search the site uses, instead of LIKE '%...%' on title
+        search_term = search_term.strip()
+        if not search_term:
+            return queryset, False
+        if search_term.isdigit():
+            return queryset.filter(pk=search_term), False
+        return text_search(queryset, search_term), False
+
+
+@admin.register(Lead)
+class LeadAdmin(ScalableAdmin):
+    list_display = ['id', 'buyer_name', 'buyer_phone', 'status', 'property', 'created_at']
+    list_select_related = ['property']
+    list_filter = [values_filter('status', ['New', 'Contacted']), ('created_at', admin.DateFieldListFilter)]
+    ordering = ['-created_at', '-id']
+    # Case-sensitive exact matches so the indexes can be used (iexact/icontains can't)
+    search_fields = ['buyer_phone__exact']
+    autocomplete_fields = ['property']
+    raw_id_fields = ['buyer', 'seller']
+
+
+@admin.register(Contact)
+class ContactAdmin(ScalableAdmin):
+    list_display = ['id', 'name', 'email', 'subject', 'created_at']
+    list_filter = [('created_at', admin.DateFieldListFilter)]
+    ordering = ['-created_at', '-id']
+    search_fields = ['email__exact']
+
+
+@admin.register(PropertyImage)
+class PropertyImageAdmin(ScalableAdmin):
+    list_display = ['id', 'property', 'image', 'card_image']
+    list_select_related = ['property']
+    ordering = ['-id']
+    search_fields = ['property__id__exact']  # See get_search_results
+    autocomplete_fields = ['property']
+
+    def get_search_results(self, request, queryset, search_term):
+        # The admin's own lookup casts the id to text, which can't use the index
+        search_term = search_term.strip()
+        if not search_term:
+            return queryset, False
+        if search_term.isdigit():
+            return queryset.filter(property_id=int(search_term)), False
+        return queryset.none(), False
+
+
+@admin.register(Job)
+class JobAdmin(ScalableAdmin):
+    list_display = ['id', 'name', 'queue', 'status', 'attempts', 'run_after', 'finished_at']
+    list_filter = [
+        'status',  # Choices field: no query
+        values_filter('queue', _task_queues()),
+        values_filter('name', _task_names(), title='task'),
+    ]
+    ordering = ['-id']
+    readonly_fields = ['created_at', 'finished_at', 'locked_by', 'locked_at', 'last_error']
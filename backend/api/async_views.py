@@ -0,0 +1,116 @@
+from asgiref.sync import sync_to_async
+from django.views.decorators.http import require_safe
+from rest_framework.exceptions import APIException, NotAuthenticated, NotFound
+from rest_framework.request import Request
+
+from .authentication import CachedJWTAuthentication
+from .cache import JSONResponse, acached_response
+from .filters import property_ordering
+from .models import Property
+from .pagination import KeysetPagination
+from .replicas import ause_replica
+from .serializers import (
+    PROPERTY_CARD_FIELDS, PropertySerializer, DashboardPropertySerializer, MyInterestSerializer, sparse_property_fields,
+)
+from .views import (
+    property_list_queryset, property_search_queryset, my_listings_queryset, my_interests_queryset,
+)
+
+# Async twins of the hot read endpoints, mounted under /api/async/. They take
+# the same parameters and return the same bodies and cache headers as the
+# sync views, but await the database through Django's async ORM, so under an
+# ASGI server (see core/asgi.py) a worker keeps serving other requests while
+# one waits on Postgres.
+
+
+def _error(exc, request=None):
+    detail = exc.detail if isinstance(exc.detail, (list, dict)) else {'detail': exc.detail}
+    response = JSONResponse(detail, status=exc.status_code)
+    if exc.status_code == 401 and request is not None:
+        response['WWW-Authenticate'] = CachedJWTAuthentication().authenticate_header(request)
+    return response
+
+
+async def _authenticated_user(request):
+    # The cached-user path (api/authentication.py) usually does no database I/O
+    result = await sync_to_async(CachedJWTAuthentication().authenticate)(request)
+    if result is None:
+        raise NotAuthenticated()
+    return result[0]
+
+
+def _api_view(view):
+    # What @api_view gives the sync views: query_params and DRF-shaped errors
+    @require_safe
+    async def wrapped(request, *args, **kwargs):
+        drf_request = Request(request)
+        try:
+            return await view(drf_request, *args, **kwargs)
+        except APIException as exc:
+            return _error(exc, request)
+    wrapped.__name__ = view.__name__
+    return wrapped
+
+
+def _paginated(paginator, data):
+    # What KeysetPagination.get_paginated_response returns, as a JSONResponse
+    response = JSONResponse(paginator.get_paginated_data(data))
+    for name, value in paginator.get_headers().items():
+        response[name] = value
+    return response
+
+
+@_api_view
+async def property_list(request):
+    async def build():
+        await ause_replica(cached=True)
+        fields = sparse_property_fields(request.query_params, PROPERTY_CARD_FIELDS)
+        paginator = KeysetPagination()
+        properties = await paginator.apaginate_queryset(
+            property_list_queryset(request.query_params, fields), request,
+            ordering=property_ordering(request.query_params),
+        )
+        return _paginated(paginator, PropertySerializer(properties, many=True, fields=fields).data)
+    return await acached_response(request, 'get_properties', build)
+
+
+@_api_view
+async def property_search(request):
+    async def build():
+        await ause_replica(cached=True)
+        fields = sparse_property_fields(request.query_params, PROPERTY_CARD_FIELDS)
+        properties, ordering = property_search_queryset(request.query_params, fields)
+        paginator = KeysetPagination()
+        page = await paginator.apaginate_queryset(properties, request, ordering=ordering)
+        return _paginated(paginator, PropertySerializer(page, many=True, fields=fields).data)
+    return await acached_response(request, 'search_properties', build)
+
+
+@_api_view
+async def property_detail(request, pk):
+    async def build():
+        await ause_replica(cached=True)
+        fields = sparse_property_fields(request.query_params)
+        prop = await Property.objects.with_card_data(fields).filter(pk=pk).afirst()
+        if prop is None:
+            raise NotFound('No Property matches the given query.')
+        return JSONResponse(PropertySerializer(prop, context={'request': request}, fields=fields).data)
+    return await acached_response(request, 'properties-detail', build)
+
+
+@_api_view
+async def my_listings(request):
+    user = await _authenticated_user(request)
+    await ause_replica(user)
+    paginator = KeysetPagination()
+    properties = await paginator.apaginate_queryset(my_listings_queryset(user), request)
+    return _paginated(paginator, DashboardPropertySerializer(properties, many=True).data)
+
+
+@_api_view
+async def my_interests(request):
+    user = await _authenticated_user(request)
+    await ause_replica(user)
+    paginator = KeysetPagination()
+    leads = await paginator.apaginate_queryset(my_interests_queryset(user), request)
+    return _paginated(paginator, MyInterestSerializer(leads, many=True).data)
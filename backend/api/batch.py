@@ -0,0 +1,69 @@
+import json
+from urllib.parse import urlsplit
+
+from django.http import HttpRequest, QueryDict
+from django.urls import Resolver404, resolve
+
+# Upper bound on calls per batch, so one request can't fan out without limit
+MAX_BATCH_CALLS = 20
+BATCH_METHODS = ('GET', 'HEAD')
+# Outer-request headers that don't describe the sub-call
+DROPPED_META = ('CONTENT_LENGTH', 'CONTENT_TYPE', 'HTTP_IF_NONE_MATCH', 'HTTP_IF_MODIFIED_SINCE')
+
+
+def _sub_request(request, match, path, query_string, method):
+    """A copy of the outer request (headers, host, user) pointed at another URL."""
+    sub = HttpRequest()
+    sub.method = method
+    sub.path = sub.path_info = path
+    sub.META = {key: value for key, value in request.META.items() if key not in DROPPED_META}
+    sub.META.update(PATH_INFO=path, QUERY_STRING=query_string, REQUEST_METHOD=method)
+    sub.GET = QueryDict(query_string)
+    sub.resolver_match = match
+    if request.user.is_authenticated:
+        # DRF picks these up instead of running the authenticators again, so the
+        # JWT is verified (and the user loaded) once for the whole batch
+        sub._force_auth_user = request.user
+        sub._force_auth_token = request.auth
+    return sub
+
+
+def _body(response):
+    if getattr(response, 'streaming', False):
+        return None, 'Streaming responses (exports) cannot be batched.'
+    if hasattr(response, 'data'):
+        return response.data, None
+    if hasattr(response, 'render'):
+        response.render()
+    content = response.content.decode() if response.content else None
+    try:
+        return (json.loads(content) if content else None), None
+    except ValueError:
+        return content, None
+
+
+def run_call(request, call):
+    """Run one {"method": "GET", "url": "/api/..."} call; always returns a result dict, never raises for bad input."""
+    if not isinstance(call, dict) or not isinstance(call.get('url'), str):
+        return {'status': 400, 'body': {'error': 'Each call needs a "url".'}}
+    method = str(call.get('method', 'GET')).upper()
+    url = urlsplit(call['url'])
+    result = {'url': call['url']}
+    if method not in BATCH_METHODS:
+        return {**result, 'status': 405, 'body': {'error': 'Only read-only (GET/HEAD) calls can be batched.'}}
+    try:
+        match = resolve(url.path)
+    except Resolver404:
+        match = None
+    # Only DRF views (they carry .cls); admin and static views need middleware we skip
+    if match is None or not hasattr(match.func, 'cls'):
+        return {**result, 'status': 404, 'body': {'error': 'Not found.'}}
+    if getattr(match.func, 'batchable', True) is False:
+        return {**result, 'status': 400, 'body': {'error': 'This endpoint cannot be batched.'}}
+
+    response = match.func(_sub_request(request, match, url.path, url.query, method), *match.args, **match.kwargs)
+    body, error = _body(response)
+    if error:
+        return {**result, 'status': 400, 'body': {'error': error}}
+    headers = {name: response[name] for name in ('ETag', 'Last-Modified', 'X-Cache') if response.has_header(name)}
+    return {**result, 'status': response.status_code, 'headers': headers, 'body': body}
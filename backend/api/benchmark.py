@@ -0,0 +1,408 @@
+import http.client
+import itertools
+import math
+import threading
+import platform
+import subprocess
+import time
+from datetime import timedelta
+from io import BytesIO
+from urllib.parse import urlsplit
+
+import django
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.db.models import Count
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from .models import Property, PropertyImage, Lead, Contact, Upload
+from .sync import SyncPagination
+from .uploads import cancel_upload, receive_chunk, start_upload
+
+BENCH_PASSWORD = 'bench-pass-123'
+# A 1x1 GIF for the chunked upload endpoints
+BENCH_PHOTO = (
+    b'GIF89a\x01\x00\x01\x00\x80\x00\x00\x00\x00\x00\xff\xff\xff!\xf9\x04\x01\x00'
+    b'\x00\x00\x00,\x00\x00\x00\x00\x01\x00\x01\x00\x00\x02\x02D\x01\x00;'
+)
+
+
+class Endpoint:
+    """
+    One benchmarked request. `url` and `data` may use {property_id} etc. from
+    the fixtures; `prepare(fixtures)` runs untimed before each request and
+    returns extra format values (e.g. a fresh row to delete). `session` logs
+    the actor in with a session cookie instead of a bearer token, for plain
+    Django views (/metrics/).
+    """
+
+    def __init__(self, name, method, url, actor=None, data=None, format='json', prepare=None, expect=(200,),
+                 headers=None, session=False):
+        self.name = name
+        self.method = method
+        self.url = url
+        self.actor = actor
+        self.data = data
+        self.format = format
+        self.prepare = prepare
+        self.expect = expect
+        self.headers = headers or {}
+        self.session = session
+
+
+def _throwaway_property(fixtures):
+    prop = Property.objects.create(
+        owner=fixtures['seller'], title='Benchmark listing', price='50 Lakh', area='200 gaj',
+        location='Sangrur', colony='Model Town',
+    )
+    return {'throwaway_id': prop.id}
+
+
+def _listing_csv(fixtures):
+    rows = ['title,price,location,colony,type,area,beds,baths']
+    rows += [f'Plot {i},30 Lakh,Sangrur,Green Avenue,Plot,150 gaj,0,0' for i in range(5)]
+    return {'file': SimpleUploadedFile('listings.csv', '\n'.join(rows).encode(), content_type='text/csv')}
+
+
+def _new_submitter(fixtures):
+    # A fresh phone/email and client IP, so the throttles and duplicate checks
+    # (api/submissions.py) let every request through to the INSERT
+    n = next(fixtures['counter'])
+    return {'phone': f'97{n:08d}', 'email': f"bench-{fixtures['tag']}-{n}@example.com",
+            'client_ip': f'10.{n // 65536 % 256}.{n // 256 % 256}.{n % 256}'}
+
+
+def _no_open_uploads(fixtures):
+    # Cancel the uploader's earlier uploads, so it stays under UPLOAD_MAX_OPEN
+    for upload in Upload.objects.filter(owner=fixtures['uploader'], status=Upload.UPLOADING):
+        cancel_upload(upload)
+    return {}
+
+
+def _new_upload(fixtures):
+    _no_open_uploads(fixtures)
+    upload = start_upload(fixtures['uploader'], 'photo.gif', len(BENCH_PHOTO))
+    return {'upload_id': upload.id, 'content_range': f'bytes 0-{len(BENCH_PHOTO) - 1}/{len(BENCH_PHOTO)}'}
+
+
+def _received_upload(fixtures):
+    values = _new_upload(fixtures)
+    upload = Upload.objects.get(pk=values['upload_id'])
+    receive_chunk(upload, values['content_range'], len(BENCH_PHOTO), BytesIO(BENCH_PHOTO))
+    return values
+
+
+def _register(fixtures):
+    n = next(fixtures['counter'])
+    return {'email': f"bench-{fixtures['tag']}-{n}@example.com", 'password': BENCH_PASSWORD,
+            'full_name': 'Bench User', 'phone': '9800000000'}
+
+
+# Every route in core/urls.py and api/urls.py but the admin (a test checks).
+# Writes are rolled back at the end of the run.
+ENDPOINTS = [
+    Endpoint('api-root', 'get', '/api/'),
+    Endpoint('properties-list', 'get', '/api/properties/'),
+    Endpoint('properties-list-filtered', 'get', '/api/properties/?type=House&min_price=30%20lakh&sort=price_low'),
+    Endpoint('properties-search', 'get', '/api/properties/search/'),
+    Endpoint('properties-search-text', 'get', '/api/properties/search/?q=model%20town'),
+    Endpoint('properties-search-images', 'get', '/api/properties/search/?expand=images'),
+    Endpoint('properties-changes', 'get', '/api/properties/changes/?page_size=1000'),
+    Endpoint('properties-changes-since', 'get', '/api/properties/changes/?since={sync_token}'),
+    Endpoint('properties-changes-images', 'get', '/api/properties/changes/?expand=images&page_size=1000'),
+    Endpoint('property-detail', 'get', '/api/properties/{property_id}/'),
+    Endpoint('property-update', 'patch', '/api/properties/{property_id}/', 'seller',
+             data={'description': 'Updated by the benchmark'}, format='multipart'),
+    Endpoint('property-delete', 'delete', '/api/properties/{throwaway_id}/', 'seller',
+             prepare=_throwaway_property, expect=(204,)),
+    Endpoint('property-create', 'post', '/api/properties/create/', 'seller', format='multipart',
+             data={'title': 'Bench house', 'price': '60 Lakh', 'location': 'Sangrur', 'colony': 'Model Town',
+                   'type': 'House', 'area': '200 gaj', 'beds': '3', 'baths': '2'}),
+    Endpoint('properties-import', 'post', '/api/properties/import/', 'seller', format='multipart',
+             prepare=_listing_csv, data={'file': '{file}'}),
+    Endpoint('my-listings', 'get', '/api/properties/my-listings/', 'seller'),
+    Endpoint('my-interests', 'get', '/api/leads/my-interests/', 'buyer'),
+    Endpoint('dashboard', 'get', '/api/dashboard/', 'seller'),
+    Endpoint('batch', 'post', '/api/batch/', 'seller', data={'calls': [
+        {'url': '/api/profile/'}, {'url': '/api/properties/my-listings/'}, {'url': '/api/leads/my-interests/'},
+    ]}),
+    Endpoint('leads-list', 'get', '/api/leads/'),
+    Endpoint('lead-detail', 'get', '/api/leads/{lead_id}/'),
+    Endpoint('lead-submit', 'post', '/api/leads/', 'buyer', expect=(201,), prepare=_new_submitter,
+             data={'property': '{property_id}', 'buyer_name': 'Bench Buyer', 'buyer_phone': '{phone}'},
+             headers={'REMOTE_ADDR': '{client_ip}'}),
+    # A double tap: answered with the existing lead, no INSERT (the first request creates it)
+    Endpoint('lead-submit-duplicate', 'post', '/api/leads/', 'buyer', prepare=_new_submitter, expect=(200, 201),
+             data={'property': '{property_id}', 'buyer_name': 'Bench Buyer', 'buyer_phone': '{lead_phone}'},
+             headers={'REMOTE_ADDR': '{client_ip}'}),
+    Endpoint('contact-submit', 'post', '/api/contact/', expect=(201,), prepare=_new_submitter,
+             data={'name': 'Bench', 'email': '{email}', 'subject': 'Hi', 'message': 'Benchmark'},
+             headers={'REMOTE_ADDR': '{client_ip}'}),
+    Endpoint('register', 'post', '/api/register/', prepare=lambda fixtures: {'body': _register(fixtures)},
+             data='{body}', expect=(201,)),
+    Endpoint('login', 'post', '/api/login/', data={'username': '{login_username}', 'password': BENCH_PASSWORD}),
+    Endpoint('token-refresh', 'post', '/api/token/refresh/', data={'refresh': '{refresh_token}'}),
+    Endpoint('profile', 'get', '/api/profile/', 'seller'),
+    Endpoint('users-me', 'get', '/api/users/me/', 'seller'),
+    Endpoint('seller-leads', 'get', '/api/seller/leads/', 'seller'),
+    Endpoint('seller-leads-export-csv', 'get', '/api/seller/leads/export/', 'seller'),
+    Endpoint('seller-leads-export-ndjson', 'get', '/api/seller/leads/export/?output=ndjson', 'seller'),
+    Endpoint('seller-leads-stats', 'get', '/api/seller/leads/stats/', 'seller'),
+    Endpoint('cache-stats', 'get', '/api/cache/stats/', 'staff'),
+    Endpoint('upload-start', 'post', '/api/uploads/', 'uploader', expect=(201,),
+             prepare=_no_open_uploads,
+             data={'filename': 'photo.gif', 'size': len(BENCH_PHOTO)}),
+    Endpoint('upload-status', 'get', '/api/uploads/{upload_id}/', 'uploader', prepare=_new_upload),
+    Endpoint('upload-chunk', 'put', '/api/uploads/{upload_id}/', 'uploader', prepare=_new_upload,
+             data='{photo}', format=None,
+             headers={'content_type': 'application/octet-stream', 'HTTP_CONTENT_RANGE': '{content_range}'}),
+    Endpoint('upload-complete', 'post', '/api/uploads/{upload_id}/complete/', 'uploader', prepare=_received_upload),
+    Endpoint('upload-cancel', 'delete', '/api/uploads/{upload_id}/', 'uploader', prepare=_new_upload, expect=(204,)),
+    # The async twins (api/async_views.py); in-process they run under the sync handler
+    Endpoint('async-properties-list', 'get', '/api/async/properties/'),
+    Endpoint('async-properties-search', 'get', '/api/async/properties/search/?q=model%20town'),
+    Endpoint('async-property-detail', 'get', '/api/async/properties/{property_id}/'),
+    Endpoint('async-my-listings', 'get', '/api/async/properties/my-listings/', 'seller'),
+    Endpoint('async-my-interests', 'get', '/api/async/leads/my-interests/', 'buyer'),
+    Endpoint('metrics', 'get', '/metrics/', 'staff', session=True),
+    Endpoint('health', 'get', '/health/'),
+    Endpoint('media', 'get', f"/{settings.MEDIA_URL.strip('/')}/{{media_path}}"),
+]
+
+
+def _fill(value, values):
+    # Substitute {placeholders}; a value that is exactly "{name}" is replaced by the object itself
+    if isinstance(value, str):
+        if value.startswith('{') and value.endswith('}') and value[1:-1] in values:
+            return values[value[1:-1]]
+        return value.format(**values)
+    if isinstance(value, dict):
+        return {key: _fill(item, values) for key, item in value.items()}
+    return value
+
+
+def build_fixtures():
+    """Pick the busiest seller, a buyer with interests and add the users the auth endpoints need."""
+    seller_id = (
+        Lead.objects.filter(seller__isnull=False).values('seller')
+        .annotate(n=Count('id')).order_by('-n').values_list('seller', flat=True).first()
+    )
+    seller = User.objects.get(id=seller_id) if seller_id else None
+    prop = Property.objects.filter(owner=seller).order_by('-id').first() if seller else None
+    lead = Lead.objects.filter(seller=seller).order_by('-id').first() if seller else None
+    media_path = PropertyImage.objects.order_by('id').values_list('image', flat=True).first()
+    if prop is None or lead is None or media_path is None:
+        raise ValueError('The benchmark needs properties with images and leads. Seed some data first.')
+    buyer = User.objects.filter(id=lead.buyer_id).first() or seller
+
+    tag = f'{timezone.now().timestamp():.0f}'
+    login_user = User.objects.create_user(username=f'bench-login-{tag}@example.com', password=BENCH_PASSWORD)
+    staff = User.objects.create_user(username=f'bench-staff-{tag}@example.com', is_staff=True)
+    uploader = User.objects.create_user(username=f'bench-uploader-{tag}@example.com')
+    return {
+        'seller': seller, 'buyer': buyer, 'staff': staff, 'uploader': uploader, 'tag': tag,
+        'counter': itertools.count(), 'property_id': prop.id, 'lead_id': lead.id, 'lead_phone': f'96{tag[-8:]}',
+        'login_username': login_user.username, 'refresh_token': str(RefreshToken.for_user(login_user)),
+        'sync_token': _sync_token(), 'media_path': media_path, 'photo': BENCH_PHOTO,
+    }
+
+
+def _sync_token():
+    # A client 50 listing changes behind, that read the deletions an hour ago
+    # (seeded listings are backdated, so their times can't be used for that)
+    updated_at, pk = list(Property.objects.order_by('-updated_at', '-id').values_list('updated_at', 'id')[:50])[-1]
+    return SyncPagination().encode_cursor([updated_at, pk, timezone.now() - timedelta(hours=1)])
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def _client(fixtures, actor, tokens, session=False):
+    client = APIClient()
+    if actor and session:
+        client.force_login(fixtures[actor])
+    elif actor:
+        # Real bearer tokens, so authentication cost is part of the measurement
+        if actor not in tokens:
+            tokens[actor] = str(RefreshToken.for_user(fixtures[actor]).access_token)
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {tokens[actor]}')
+    return client
+
+
+def _request(client, endpoint, values):
+    url = _fill(endpoint.url, values)
+    data = _fill(endpoint.data, values)
+    response = getattr(client, endpoint.method)(url, data, format=endpoint.format, **_fill(endpoint.headers, values))
+    if getattr(response, 'streaming', False):
+        b''.join(response.streaming_content)
+    return response
+
+
+def run_endpoint(endpoint, fixtures, requests=50, warmup=5, tokens=None):
+    tokens = {} if tokens is None else tokens
+    client = _client(fixtures, endpoint.actor, tokens, endpoint.session)
+    timings, queries, sizes, statuses = [], [], [], {}
+
+    for i in range(warmup + requests):
+        values = dict(fixtures)
+        if endpoint.prepare:
+            values.update(endpoint.prepare(fixtures))
+        with CaptureQueriesContext(connection) as captured:
+            started = time.perf_counter()
+            response = _request(client, endpoint, values)
+            elapsed = time.perf_counter() - started
+        if i < warmup:
+            continue
+        timings.append(elapsed)
+        queries.append(len(captured.captured_queries))
+        sizes.append(0 if getattr(response, 'streaming', False) else len(response.content))
+        statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+    timings.sort()
+    total = sum(timings)
+    return {
+        'method': endpoint.method.upper(),
+        'url': endpoint.url,
+        'requests': requests,
+        'errors': sum(count for status, count in statuses.items() if status not in endpoint.expect),
+        'statuses': {str(status): count for status, count in sorted(statuses.items())},
+        'throughput_rps': round(requests / total, 2) if total else None,
+        'mean_ms': round(total / requests * 1000, 3) if requests else None,
+        'p50_ms': round(percentile(timings, 50) * 1000, 3) if timings else None,
+        'p95_ms': round(percentile(timings, 95) * 1000, 3) if timings else None,
+        'p99_ms': round(percentile(timings, 99) * 1000, 3) if timings else None,
+        'max_ms': round(timings[-1] * 1000, 3) if timings else None,
+        'queries_mean': round(sum(queries) / len(queries), 2) if queries else None,
+        'queries_max': max(queries) if queries else None,
+        'bytes_mean': round(sum(sizes) / len(sizes)) if sizes else None,
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, timeout=5, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def run_benchmark(endpoints=None, requests=50, warmup=5, only=None, progress=None):
+    """
+    Drive each endpoint in-process through the full middleware/DRF stack and
+    return a JSON-serialisable report. Run it inside a transaction that gets
+    rolled back: the write endpoints insert rows.
+    """
+    fixtures = build_fixtures()
+    tokens = {}
+    results = {}
+    for endpoint in endpoints or ENDPOINTS:
+        if only and not any(pattern in endpoint.name for pattern in only):
+            continue
+        results[endpoint.name] = run_endpoint(endpoint, fixtures, requests, warmup, tokens)
+        if progress:
+            progress(endpoint.name, results[endpoint.name])
+
+    return {
+        'meta': {
+            'commit': git_commit(),
+            'created_at': timezone.now().isoformat(),
+            'database': connection.vendor,
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'requests': requests,
+            'warmup': warmup,
+            'dataset': {
+                'users': User.objects.count(), 'properties': Property.objects.count(),
+                'leads': Lead.objects.count(), 'contacts': Contact.objects.count(),
+                'busiest_seller_leads': Lead.objects.filter(seller=fixtures['seller']).count(),
+            },
+        },
+        'endpoints': results,
+    }
+
+
+def compare(baseline, current, metric='p50_ms'):
+    """Rows of (endpoint, old, new, change %) for endpoints present in both reports."""
+    rows = []
+    for name, result in current['endpoints'].items():
+        old = baseline.get('endpoints', {}).get(name, {}).get(metric)
+        new = result.get(metric)
+        change = round((new - old) / old * 100, 1) if old and new is not None else None
+        rows.append((name, old, new, change))
+    return rows
+
+
+# --- Concurrent load against a running server ---
+
+def _connection(base_url):
+    parts = urlsplit(base_url)
+    connection_class = http.client.HTTPSConnection if parts.scheme == 'https' else http.client.HTTPConnection
+    return connection_class(parts.hostname, parts.port, timeout=30), parts.path.rstrip('/')
+
+
+def run_load(base_url, path, concurrency=20, duration=10.0, headers=None, bust_cache=True):
+    """
+    Hit base_url + path from `concurrency` keep-alive connections for
+    `duration` seconds and return throughput/latency stats in the same shape
+    as run_endpoint. bust_cache adds a unique query param so the server's
+    response cache can't answer for the database.
+    """
+    timings, statuses, errors = [], {}, [0]
+    lock = threading.Lock()
+    counter = itertools.count()
+    deadline = time.perf_counter() + duration
+
+    def worker():
+        connection, prefix = _connection(base_url)
+        while time.perf_counter() < deadline:
+            url = prefix + path
+            if bust_cache:
+                url += ('&' if '?' in url else '?') + f'_bench={next(counter)}'
+            started = time.perf_counter()
+            try:
+                connection.request('GET', url, headers=headers or {})
+                response = connection.getresponse()
+                response.read()
+            except (OSError, http.client.HTTPException):
+                with lock:
+                    errors[0] += 1
+                connection.close()
+                connection, prefix = _connection(base_url)
+                continue
+            elapsed = time.perf_counter() - started
+            with lock:
+                timings.append(elapsed)
+                statuses[response.status] = statuses.get(response.status, 0) + 1
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - started
+
+    timings.sort()
+    return {
+        'url': base_url + path,
+        'concurrency': concurrency,
+        'requests': len(timings),
+        'errors': errors[0] + sum(count for status, count in statuses.items() if status >= 400),
+        'statuses': {str(status): count for status, count in sorted(statuses.items())},
+        'throughput_rps': round(len(timings) / wall, 2),
+        'p50_ms': round(percentile(timings, 50) * 1000, 3) if timings else None,
+        'p95_ms': round(percentile(timings, 95) * 1000, 3) if timings else None,
+        'p99_ms': round(percentile(timings, 99) * 1000, 3) if timings else None,
+        'max_ms': round(timings[-1] * 1000, 3) if timings else None,
+    }
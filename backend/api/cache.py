@@ -0,0 +1,191 @@
+import hashlib
+import json
+import time
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+
+# Public property reads are cached under a "generation" number. Any change to
+# a Property or PropertyImage bumps the generation (see api/signals.py), which
+# orphans every cached entry at once without having to know their keys.
+GENERATION_KEY = 'api:properties:generation'
+MODIFIED_KEY = 'api:properties:modified'
+STATS_KEY = 'api:cache-stats:{namespace}:{outcome}'
+STATS_NAMESPACES_KEY = 'api:cache-stats:namespaces'
+
+
+def cache_timeout():
+    return getattr(settings, 'PROPERTY_CACHE_TIMEOUT', 300)
+
+
+def _fresh_generation():
+    # When the counter is lost (evicted, flushed) it restarts from a value no
+    # earlier generation used, or entries cached back then would count as current
+    return time.time_ns()
+
+
+def _generation():
+    values = cache.get_many([GENERATION_KEY, MODIFIED_KEY])
+    generation = values.get(GENERATION_KEY)
+    modified = values.get(MODIFIED_KEY)
+    if generation is None or modified is None:
+        # Cold cache: start a fresh generation so nothing stale is served
+        cache.add(GENERATION_KEY, _fresh_generation(), None)
+        cache.add(MODIFIED_KEY, int(time.time()), None)
+        values = cache.get_many([GENERATION_KEY, MODIFIED_KEY])
+        generation = values.get(GENERATION_KEY) or _fresh_generation()
+        modified = values.get(MODIFIED_KEY, int(time.time()))
+    return generation, modified
+
+
+def invalidate_properties():
+    """Drop every cached public property response."""
+    cache.set(MODIFIED_KEY, int(time.time()), None)
+    try:
+        cache.incr(GENERATION_KEY)
+    except ValueError:
+        cache.set(GENERATION_KEY, _fresh_generation(), None)
+
+
+def _record(namespace, outcome):
+    key = STATS_KEY.format(namespace=namespace, outcome=outcome)
+    if not cache.add(key, 1, None):
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, 1, None)
+    namespaces = cache.get(STATS_NAMESPACES_KEY) or set()
+    if namespace not in namespaces:
+        cache.set(STATS_NAMESPACES_KEY, namespaces | {namespace}, None)
+
+
+def cache_stats():
+    """Hit/miss counters per cached endpoint, e.g. {'get_properties': {'hits': 9, 'misses': 1, 'hit_rate': 0.9}}."""
+    stats = {}
+    for namespace in sorted(cache.get(STATS_NAMESPACES_KEY) or ()):
+        hits = cache.get(STATS_KEY.format(namespace=namespace, outcome='hits'), 0)
+        misses = cache.get(STATS_KEY.format(namespace=namespace, outcome='misses'), 0)
+        total = hits + misses
+        stats[namespace] = {'hits': hits, 'misses': misses, 'hit_rate': round(hits / total, 4) if total else None}
+    return stats
+
+
+def _cache_key(request, namespace, generation):
+    # The host is part of the key because paginated responses contain absolute URLs
+    params = sorted((key, value) for key in request.GET for value in request.GET.getlist(key))
+    raw = json.dumps([request.get_host(), request.path, params])
+    digest = hashlib.md5(raw.encode()).hexdigest()
+    return f'api:response:{namespace}:{generation}:{digest}'
+
+
+def cached_response(request, namespace, build):
+    """
+    Serve `build()` from the cache, keyed on the request's path and query
+    params. Adds ETag/Last-Modified headers and answers conditional GETs with
+    304. Only 200 responses are cached.
+    """
+    generation, modified = _generation()
+    key = _cache_key(request, namespace, generation)
+    entry = cache.get(key)
+
+    if entry is None:
+        _record(namespace, 'misses')
+        response = build()
+        if response.status_code != 200:
+            return response
+        entry = _entry(response)
+        cache.set(key, entry, cache_timeout())
+        outcome = 'MISS'
+    else:
+        _record(namespace, 'hits')
+        outcome = 'HIT'
+
+    return _finish(request, entry, modified, outcome, Response)
+
+
+async def acached_response(request, namespace, build):
+    """
+    cached_response for async views: `build` is a coroutine function and the
+    response class is `JSONResponse` (a plain Django response).
+    """
+    generation, modified = await sync_to_async(_generation)()
+    key = _cache_key(request, namespace, generation)
+    entry = await cache.aget(key)
+
+    if entry is None:
+        await sync_to_async(_record)(namespace, 'misses')
+        response = await build()
+        if response.status_code != 200:
+            return response
+        entry = _entry(response)
+        await cache.aset(key, entry, cache_timeout())
+        outcome = 'MISS'
+    else:
+        await sync_to_async(_record)(namespace, 'hits')
+        outcome = 'HIT'
+
+    return _finish(request, entry, modified, outcome, JSONResponse)
+
+
+# Response headers that are part of the cached content
+CACHED_HEADERS = ('Link',)
+
+
+def _entry(response):
+    body = json.dumps(response.data, cls=DjangoJSONEncoder, sort_keys=True)
+    headers = {name: response[name] for name in CACHED_HEADERS if response.has_header(name)}
+    return {'data': response.data, 'headers': headers, 'etag': quote_etag(hashlib.md5(body.encode()).hexdigest())}
+
+
+def _finish(request, entry, modified, outcome, response_class):
+    response = get_conditional_response(request, etag=entry['etag'], last_modified=modified)
+    if response is None:
+        response = response_class(entry['data'])
+        for name, value in entry.get('headers', {}).items():
+            response[name] = value
+
+    response['ETag'] = entry['etag']
+    response['Last-Modified'] = http_date(modified)
+    # Browsers may keep the body but must revalidate before reusing it
+    response['Cache-Control'] = 'public, no-cache'
+    response['X-Cache'] = outcome
+    return response
+
+
+class JSONResponse(HttpResponse):
+    """A DRF-rendered JSON body without the DRF view machinery (async views)."""
+
+    def __init__(self, data, status=200):
+        super().__init__(JSONRenderer().render(data), status=status, content_type='application/json')
+        self.data = data
+
+
+def cache_public_read(namespace):
+    """Decorator for public function-based read views (apply under @api_view)."""
+    def decorator(view):
+        @wraps(view)
+        def wrapped(request, *args, **kwargs):
+            return cached_response(request, namespace, lambda: view(request, *args, **kwargs))
+        return wrapped
+    return decorator
+
+
+class CachedReadMixin:
+    """Caches list/retrieve on a viewset; writes go through untouched."""
+    cache_namespace = None
+
+    def list(self, request, *args, **kwargs):
+        build = lambda: super(CachedReadMixin, self).list(request, *args, **kwargs)
+        return cached_response(request, f'{self.cache_namespace}-list', build)
+
+    def retrieve(self, request, *args, **kwargs):
+        build = lambda: super(CachedReadMixin, self).retrieve(request, *args, **kwargs)
+        return cached_response(request, f'{self.cache_namespace}-detail', build)
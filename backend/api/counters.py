@@ -0,0 +1,96 @@
+from collections import defaultdict
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce, Greatest, TruncDate
+
+from .models import Property, Lead, LeadDailyStat
+
+# Lead counters live on Property (leads_count, new_leads_count) and per day in
+# LeadDailyStat. They are adjusted by deltas from api/signals.py inside the
+# lead's own transaction, so dashboards read them instead of aggregating the
+# lead table. Bulk writes (bulk_create, queryset.update/delete) skip the
+# signals; call rebuild_lead_counters() (or `manage.py rebuild_lead_counters`)
+# after those.
+
+NEW_STATUS = 'New'
+
+
+def _adjust(field, delta):
+    if delta >= 0:
+        return F(field) + delta
+    # Positive integer columns; a drifted counter is clamped rather than failing the write
+    return Greatest(F(field) + delta, Value(0))
+
+
+def apply_lead_change(old, new):
+    """Apply the difference between two Lead.counter_state() values (either may be None)."""
+    if old == new:
+        return
+    totals = defaultdict(lambda: [0, 0])  # property_id -> [leads, new_leads]
+    days = defaultdict(lambda: [0, 0])    # (property_id, day) -> [leads, new_leads]
+    for state, sign in ((old, -1), (new, 1)):
+        if state is None:
+            continue
+        property_id, day, is_new = state
+        totals[property_id][0] += sign
+        totals[property_id][1] += sign * is_new
+        days[property_id, day][0] += sign
+        days[property_id, day][1] += sign * is_new
+
+    for property_id, (leads, new_leads) in totals.items():
+        if leads or new_leads:
+            Property.objects.filter(pk=property_id).update(
+                leads_count=_adjust('leads_count', leads), new_leads_count=_adjust('new_leads_count', new_leads)
+            )
+    for (property_id, day), (leads, new_leads) in days.items():
+        if leads or new_leads:
+            _bump_day(property_id, day, leads, new_leads)
+
+
+def _bump_day(property_id, day, leads, new_leads):
+    rows = LeadDailyStat.objects.filter(property_id=property_id, day=day)
+    changes = {'leads': _adjust('leads', leads), 'new_leads': _adjust('new_leads', new_leads)}
+    if rows.update(**changes) or leads < 0 or new_leads < 0:
+        return
+    try:
+        # Savepoint, so losing the race to another request doesn't break the outer transaction
+        with transaction.atomic():
+            # The listing's owner, like rebuild_lead_counters (not the lead's own seller column)
+            seller_id = Property.objects.filter(pk=property_id).values_list('owner_id', flat=True).first()
+            LeadDailyStat.objects.create(
+                property_id=property_id, seller_id=seller_id, day=day, leads=leads, new_leads=new_leads
+            )
+    except IntegrityError:
+        rows.update(**changes)
+
+
+def rebuild_lead_counters():
+    """
+    Recompute every counter and rollup row from the lead table. Returns the
+    number of properties whose counters were wrong.
+    """
+    with transaction.atomic():
+        leads = Lead.objects.filter(property=OuterRef('pk')).order_by().values('property')
+        total = leads.annotate(n=Count('id')).values('n')
+        new = leads.filter(status=NEW_STATUS).annotate(n=Count('id')).values('n')
+        drifted = (
+            Property.objects.annotate(true_leads=Coalesce(Subquery(total), 0), true_new=Coalesce(Subquery(new), 0))
+            .exclude(leads_count=F('true_leads'), new_leads_count=F('true_new'))
+            .count()
+        )
+        Property.objects.update(leads_count=Coalesce(Subquery(total), 0), new_leads_count=Coalesce(Subquery(new), 0))
+
+        LeadDailyStat.objects.all().delete()
+        rows = (
+            Lead.objects.filter(property__isnull=False).order_by()
+            .annotate(day=TruncDate('created_at'))
+            .values('property', 'property__owner', 'day')
+            .annotate(leads=Count('id'), new_leads=Count('id', filter=Q(status=NEW_STATUS)))
+        )
+        LeadDailyStat.objects.bulk_create([
+            LeadDailyStat(property_id=row['property'], seller_id=row['property__owner'], day=row['day'],
+                          leads=row['leads'], new_leads=row['new_leads'])
+            for row in rows
+        ], batch_size=2000)
+    return drifted
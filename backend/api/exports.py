@@ -0,0 +1,59 @@
+import csv
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+# Columns in export order: (header, queryset field)
+LEAD_EXPORT_COLUMNS = [
+    ('id', 'id'),
+    ('created_at', 'created_at'),
+    ('status', 'status'),
+    ('property_id', 'property_id'),
+    ('property_title', 'property__title'),
+    ('buyer_name', 'buyer_name'),
+    ('buyer_phone', 'buyer_phone'),
+]
+EXPORT_CHUNK_SIZE = 2000
+# Spreadsheets run a cell starting with one of these as a formula
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+
+class _Echo:
+    # csv.writer wants a file; this one just hands each line back
+    def write(self, value):
+        return value
+
+
+def _rows(queryset):
+    # .iterator() streams from a server-side cursor on PostgreSQL, so only one
+    # chunk of rows is in memory however many leads there are
+    fields = [field for _header, field in LEAD_EXPORT_COLUMNS]
+    return queryset.values_list(*fields).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+
+
+def _csv_cell(value):
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        # Names and titles come from the public; a leading ' makes Excel/Sheets show them as text
+        return "'" + value
+    return value
+
+
+def stream_leads_csv(queryset):
+    writer = csv.writer(_Echo())
+    yield writer.writerow([header for header, _field in LEAD_EXPORT_COLUMNS])
+    for row in _rows(queryset):
+        yield writer.writerow([_csv_cell(value) for value in row])
+
+
+def stream_leads_ndjson(queryset):
+    headers = [header for header, _field in LEAD_EXPORT_COLUMNS]
+    for row in _rows(queryset):
+        yield json.dumps(dict(zip(headers, row)), cls=DjangoJSONEncoder) + '\n'
+
+
+LEAD_EXPORT_FORMATS = {
+    'csv': (stream_leads_csv, 'text/csv'),
+    'ndjson': (stream_leads_ndjson, 'application/x-ndjson'),
+}
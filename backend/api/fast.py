@@ -0,0 +1,164 @@
+import orjson
+from django.utils import timezone
+from rest_framework import ISO_8601, serializers
+from rest_framework.fields import empty
+from rest_framework.utils.encoders import JSONEncoder
+from rest_framework.renderers import BrowsableAPIRenderer, JSONRenderer
+from rest_framework.settings import api_settings
+
+from .metrics import timer
+from .models import PropertyImage
+from .serializers import PropertySerializer
+
+# Serializer-free path for the hottest read-only lists (get_properties,
+# get_my_interests, SellerLeadsView). Rows come straight from .values() and
+# are shaped by the *existing* serializer's field list, so a field added to
+# the serializer shows up here too. The output is byte-for-byte what the
+# serializer + JSONRenderer would send (see FastSerializationTests).
+
+# Fields whose to_representation() is a no-op for the values the database
+# hands back (str for text columns, int for integer and FK columns, bool)
+PASSTHROUGH_FIELDS = (
+    serializers.CharField, serializers.IntegerField, serializers.BooleanField,
+    serializers.ChoiceField, serializers.PrimaryKeyRelatedField,
+)
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer on orjson, producing the same bytes as DRF's for str, int,
+    bool, None, lists and dicts. Datetimes, decimals and other types go
+    through DRF's encoder. orjson formats some floats differently (1e16 vs
+    1e+16), so only use it on views that don't return floats.
+    """
+    options = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS | orjson.OPT_NON_STR_KEYS
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if self.ensure_ascii or not self.compact or self.get_indent(accepted_media_type or '', renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+        ret = orjson.dumps(data, default=JSONEncoder().default, option=self.options)
+        # Like DRF: valid JSON, but they end a JavaScript string literal
+        return ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+
+
+FAST_RENDERERS = [FastJSONRenderer, BrowsableAPIRenderer]
+
+
+def _converter(field):
+    if isinstance(field, PASSTHROUGH_FIELDS):
+        return None
+    if isinstance(field, serializers.DateTimeField):
+        return _datetime_converter(field)
+    return field.to_representation
+
+
+def _datetime_converter(field):
+    # DateTimeField.to_representation looks up the output format and the
+    # current timezone for every value; look them up once per list instead
+    output_format = getattr(field, 'format', api_settings.DATETIME_FORMAT)
+    field_timezone = field.timezone if hasattr(field, 'timezone') else field.default_timezone()
+    if output_format is None or field_timezone is None:
+        return field.to_representation
+    iso = output_format.lower() == ISO_8601
+
+    def convert(value):
+        if isinstance(value, str) or timezone.is_naive(value):
+            return field.to_representation(value)
+        value = value.astimezone(field_timezone)
+        if not iso:
+            return value.strftime(output_format)
+        value = value.isoformat()
+        return value[:-6] + 'Z' if value.endswith('+00:00') else value
+    return convert
+
+
+def values_rows(serializer, queryset, computed=None, keys=None):
+    """
+    Serialize `queryset` the way `serializer` (a serializer instance) would,
+    but from .values() dicts instead of model instances. Dotted sources may
+    follow forward foreign keys.
+
+    `computed` maps fields the database can't produce directly (method
+    fields) to (lookups, function): the lookups are added to the .values()
+    call and function(row) returns the field's value.
+
+    With `keys` (lookups, e.g. a pagination cursor's fields) the result is
+    (rows, positions), positions holding each row's raw values for `keys`.
+    """
+    computed = computed or {}
+    plan, lookups = [], set(keys or ())
+    for name, field in serializer.fields.items():
+        if field.write_only:
+            continue
+        if name in computed:
+            extra, function = computed[name]
+            lookups.update(extra)
+            plan.append((name, None, function, (), field))
+            continue
+        if isinstance(field, (serializers.BaseSerializer, serializers.SerializerMethodField)):
+            raise ValueError(f'{name!r} needs an entry in `computed`.')
+        lookup = '__'.join(field.source_attrs)
+        # For source='property.title', a missing property (not a missing title)
+        # is what DRF treats specially, so fetch the foreign key too
+        via = tuple('__'.join(field.source_attrs[:i]) for i in range(1, len(field.source_attrs)))
+        lookups.update((lookup, *via))
+        convert = _converter(field)
+        plan.append((name, lookup, convert, via, field))
+
+    rows, positions = [], []
+    with timer('serialize'):
+        for row in queryset.select_related(None).prefetch_related(None).values(*lookups):
+            if keys is not None:
+                positions.append([row[key] for key in keys])
+            item = {}
+            for name, lookup, convert, via, field in plan:
+                if lookup is None:
+                    item[name] = convert(row)
+                    continue
+                value = row[lookup]
+                if via and any(row[step] is None for step in via):
+                    # What Field.get_attribute does when the chain hits None
+                    if field.default is not empty:
+                        value = field.get_default()
+                    elif field.allow_null:
+                        value = None
+                    else:
+                        continue  # SkipField: the key is left out
+                item[name] = value if value is None or convert is None else convert(value)
+            rows.append(item)
+    if keys is not None:
+        return rows, positions
+    return rows
+
+
+def _submitted_by(row):
+    if row['owner__username'] is None:
+        return 'Sangrur Estate'
+    return row['owner__first_name'] if row['owner__first_name'] else row['owner__username']
+
+
+def property_rows(queryset, fields, keys=None):
+    """PropertySerializer(queryset, many=True, fields=fields).data for fieldsets without 'images'."""
+    serializer = PropertySerializer(fields=fields)
+    computed = {
+        'submitted_by': (('owner__first_name', 'owner__username'), _submitted_by),
+        'cover_image': ((), lambda row: None),  # Filled in below
+    }
+    result = values_rows(serializer, queryset, computed, keys)
+    rows = result[0] if keys is not None else result
+
+    if rows and 'cover_image' in serializer.fields:
+        covers = {}
+        images = (
+            PropertyImage.objects.filter(property_id__in=[row['id'] for row in rows]).order_by('id')
+            .values_list('property_id', 'image', 'card_image')
+        )
+        for property_id, image, card_image in images:
+            if property_id not in covers:
+                field_name, name = ('card_image', card_image) if card_image else ('image', image)
+                covers[property_id] = PropertyImage._meta.get_field(field_name).storage.url(name)
+        for row in rows:
+            row['cover_image'] = covers.get(row['id'])
+    return result
@@ -0,0 +1,137 @@
+from datetime import datetime, time
+
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from rest_framework.exceptions import ValidationError
+from .units import parse_price, parse_area
+
+# Sort keys accepted by the property search endpoints.
+# Every ordering ends with 'id' so keyset pagination has a unique position.
+PROPERTY_SORTS = {
+    'newest': ('-created_at', '-id'),
+    'oldest': ('created_at', 'id'),
+    'beds': ('-beds', '-created_at', '-id'),
+    'baths': ('-baths', '-created_at', '-id'),
+    'price_low': ('price_value', 'id'),
+    'price_high': ('-price_value', '-id'),
+    'area': ('-area_sqft', '-id'),
+    'price_per_sqft': ('price_per_sqft', 'id'),
+}
+DEFAULT_PROPERTY_SORT = 'newest'
+
+
+def _int_param(params, name):
+    value = params.get(name)
+    if value in (None, ''):
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise ValidationError({name: 'Must be a whole number.'})
+
+
+def _amount_param(params, name, parser, message):
+    # Accepts plain numbers as well as the listing format, e.g. min_price=50 lakh
+    value = params.get(name)
+    if value in (None, ''):
+        return None
+    parsed = parser(value)
+    if parsed is None:
+        raise ValidationError({name: message})
+    return parsed
+
+
+def filter_properties(queryset, params):
+    """Apply the public search query params to a Property queryset."""
+    location = (params.get('location') or '').strip()
+    if location:
+        # Same behaviour as the old client-side search: match location OR colony
+        queryset = queryset.filter(Q(location__icontains=location) | Q(colony__icontains=location))
+
+    colony = (params.get('colony') or '').strip()
+    if colony:
+        queryset = queryset.filter(colony__icontains=colony)
+
+    property_type = params.get('type')
+    if property_type and property_type != 'all':
+        queryset = queryset.filter(type=property_type)
+
+    property_status = params.get('status')
+    if property_status and property_status != 'all':
+        queryset = queryset.filter(status=property_status)
+
+    # beds/baths are minimums ("3+ beds")
+    beds = _int_param(params, 'beds')
+    if beds is not None:
+        queryset = queryset.filter(beds__gte=beds)
+
+    baths = _int_param(params, 'baths')
+    if baths is not None:
+        queryset = queryset.filter(baths__gte=baths)
+
+    price_message = 'Must be an amount in rupees, e.g. 5000000 or 50 lakh.'
+    min_price = _amount_param(params, 'min_price', parse_price, price_message)
+    if min_price is not None:
+        queryset = queryset.filter(price_value__gte=min_price)
+
+    max_price = _amount_param(params, 'max_price', parse_price, price_message)
+    if max_price is not None:
+        queryset = queryset.filter(price_value__lte=max_price)
+
+    area_message = 'Must be an area in sq ft, e.g. 1800 or 200 gaj.'
+    min_area = _amount_param(params, 'min_area', parse_area, area_message)
+    if min_area is not None:
+        queryset = queryset.filter(area_sqft__gte=min_area)
+
+    max_area = _amount_param(params, 'max_area', parse_area, area_message)
+    if max_area is not None:
+        queryset = queryset.filter(area_sqft__lte=max_area)
+
+    return queryset
+
+
+def property_ordering(params):
+    sort = params.get('sort') or DEFAULT_PROPERTY_SORT
+    if sort not in PROPERTY_SORTS:
+        raise ValidationError({'sort': f"Must be one of: {', '.join(PROPERTY_SORTS)}."})
+    return PROPERTY_SORTS[sort]
+
+
+def _datetime_param(params, name, end_of_day=False):
+    # Accepts a date (2026-01-31) or a full ISO datetime
+    value = params.get(name)
+    if not value:
+        return None
+    try:
+        day = parse_date(value)
+        parsed = datetime.combine(day, time.max if end_of_day else time.min) if day else parse_datetime(value)
+    except ValueError:
+        parsed = None
+    if parsed is None:
+        raise ValidationError({name: 'Must be a date (YYYY-MM-DD) or ISO datetime.'})
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
+def filter_created_between(queryset, params):
+    """?since= / ?until= on created_at, both inclusive."""
+    since = _datetime_param(params, 'since')
+    if since is not None:
+        queryset = queryset.filter(created_at__gte=since)
+    until = _datetime_param(params, 'until', end_of_day=True)
+    if until is not None:
+        queryset = queryset.filter(created_at__lte=until)
+    return queryset
+
+
+def filter_days_between(queryset, params):
+    """?since= / ?until= on a DateField named day, both inclusive."""
+    since = _datetime_param(params, 'since')
+    if since is not None:
+        queryset = queryset.filter(day__gte=timezone.localdate(since))
+    until = _datetime_param(params, 'until', end_of_day=True)
+    if until is not None:
+        queryset = queryset.filter(day__lte=timezone.localdate(until))
+    return queryset
@@ -0,0 +1,72 @@
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps
+
+# Resized copies generated for every uploaded photo: field name -> max width/height.
+# WebP at this quality is typically 20-40x smaller than a phone JPEG original.
+VARIANTS = {
+    'card_image': 480,
+    'detail_image': 1280,
+    'full_image': 2048,
+}
+WEBP_QUALITY = 80
+# The original is re-encoded (only when it carries metadata) at this quality
+ORIGINAL_JPEG_QUALITY = 95
+
+
+def _encode_webp(image, max_size):
+    resized = image.copy()
+    resized.thumbnail((max_size, max_size), Image.LANCZOS)
+    buffer = BytesIO()
+    # Saving without exif= drops all metadata (GPS, camera serials, ...)
+    resized.save(buffer, format='WEBP', quality=WEBP_QUALITY, method=4)
+    return ContentFile(buffer.getvalue())
+
+
+def _strip_metadata(original, transposed):
+    # The original stays public (the `image` URL and the fallback until the
+    # variants exist), so it mustn't keep GPS/camera EXIF either. Re-encoded
+    # in its own format, rotation baked in; None if there's nothing to strip
+    if not original.getexif() and 'xmp' not in original.info:
+        return None
+    image_format = original.format or 'JPEG'
+    options = {'icc_profile': original.info['icc_profile']} if original.info.get('icc_profile') else {}
+    if image_format == 'JPEG':
+        if transposed.mode not in ('RGB', 'L', 'CMYK'):
+            transposed = transposed.convert('RGB')
+        options['quality'] = ORIGINAL_JPEG_QUALITY
+    buffer = BytesIO()
+    transposed.save(buffer, format=image_format, **options)
+    return ContentFile(buffer.getvalue()), f'photo.{image_format.lower().replace("jpeg", "jpg")}'
+
+
+def generate_variants(property_image):
+    """
+    Build the WebP variants for a PropertyImage, strip metadata from the
+    original, and save them on the row. Safe to call again; existing
+    variants are replaced.
+    """
+    property_image.image.open('rb')
+    try:
+        with Image.open(property_image.image) as original:
+            # Phones store rotation in EXIF; bake it in before metadata is dropped
+            transposed = ImageOps.exif_transpose(original)
+            stripped = _strip_metadata(original, transposed)
+            image = transposed.convert('RGBA' if transposed.mode in ('RGBA', 'LA', 'P') else 'RGB')
+            image.load()
+    finally:
+        property_image.image.close()
+
+    # Each file is stored under its content hash; an old one may be shared
+    # with another row, so it's left for `manage.py gc_media`
+    fields = list(VARIANTS)
+    if stripped is not None:
+        content, name = stripped
+        property_image.image.save(name, content, save=False)
+        fields.append('image')
+    for field_name, max_size in VARIANTS.items():
+        getattr(property_image, field_name).save(f'{max_size}.webp', _encode_webp(image, max_size), save=False)
+
+    property_image.save(update_fields=fields)
+    return property_image
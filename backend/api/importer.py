@@ -0,0 +1,270 @@
+import csv
+import io
+import json
+import os
+import zipfile
+
+from django.core.files.base import File
+from django.db import transaction
+
+from .cache import invalidate_properties
+from .jobs import enqueue_many
+from .models import Property, PropertyImage
+from .serializers import PropertyImportSerializer
+from .uploads import checked_image_extension, max_upload_size
+
+IMPORT_BATCH_SIZE = 500
+DATA_EXTENSIONS = ('.csv', '.json', '.jsonl', '.ndjson')
+
+
+class BadRow:
+    """A record that couldn't be parsed: reported as a rejected row, and the import carries on."""
+
+    def __init__(self, line, message):
+        self.line = line
+        self.message = message
+
+
+class ImportAborted(ValueError):
+    """The rest of the file can't be read. `report` covers what was imported before that."""
+
+    def __init__(self, message, report):
+        super().__init__(message)
+        self.report = report
+
+
+# --- Reading rows ---
+
+def _iter_json_array(stream, chunk_size=64 * 1024):
+    # Decodes one object at a time so a large array is never held in memory
+    decoder = json.JSONDecoder()
+    buffer = ''
+    started = False
+    while True:
+        chunk = stream.read(chunk_size)
+        buffer += chunk
+        while True:
+            buffer = buffer.lstrip()
+            if not started:
+                if not buffer:
+                    break
+                if buffer[0] != '[':
+                    raise ValueError('JSON input must be an array of objects')
+                buffer, started = buffer[1:], True
+                continue
+            buffer = buffer.lstrip(',').lstrip()
+            if not buffer or buffer[0] == ']':
+                break
+            try:
+                item, end = decoder.raw_decode(buffer)
+            except ValueError:
+                if not chunk:
+                    raise
+                break  # Object continues in the next chunk
+            yield item
+            buffer = buffer[end:]
+        if not chunk:
+            return
+
+
+def iter_rows(stream, filename):
+    """Yield dict rows from a CSV, JSON array or JSON-lines text stream."""
+    name = filename.lower()
+    if name.endswith('.csv'):
+        reader = csv.DictReader(stream)
+        while True:
+            try:
+                row = next(reader)
+            except StopIteration:
+                return
+            except csv.Error as exc:
+                # The reader carries on at the next line. (DictReader.line_num
+                # is only updated after a good record; its csv.reader's is current.)
+                yield BadRow(reader.reader.line_num, f'Unreadable CSV record: {exc}')
+                continue
+            # CSV lists images as "a.jpg;b.jpg"
+            images = row.get('images') or ''
+            row['images'] = [path.strip() for path in images.split(';') if path.strip()]
+            yield row
+    elif name.endswith(('.jsonl', '.ndjson')):
+        for number, line in enumerate(stream, start=1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError as exc:
+                row = BadRow(number, f'Invalid JSON: {exc}')
+            yield row
+    elif name.endswith('.json'):
+        yield from _iter_json_array(stream)
+    else:
+        raise ValueError(f'Unsupported file type: {filename}. Use CSV, JSON or JSON lines.')
+
+
+# --- Finding images ---
+
+class DirectoryImages:
+    """Image paths relative to a folder on disk (management command)."""
+
+    def __init__(self, base_dir):
+        self.base_dir = base_dir
+
+    def exists(self, path):
+        return os.path.isfile(os.path.join(self.base_dir, path))
+
+    def open(self, path):
+        return open(os.path.join(self.base_dir, path), 'rb')
+
+    def size(self, path):
+        return os.path.getsize(os.path.join(self.base_dir, path))
+
+
+class ZipImages:
+    """Image paths relative to the root of a zip archive."""
+
+    def __init__(self, archive):
+        self.archive = archive
+        self.names = set(archive.namelist())
+
+    def exists(self, path):
+        return path in self.names
+
+    def open(self, path):
+        return self.archive.open(path)
+
+    def size(self, path):
+        return self.archive.getinfo(path).file_size
+
+
+class NoImages:
+    def exists(self, path):
+        return False
+
+    def open(self, path):
+        raise FileNotFoundError(path)
+
+
+# --- Import ---
+
+def _clean(row):
+    # Blank CSV cells mean "use the default", not "empty string"
+    return {key: value for key, value in row.items() if value not in ('', None)}
+
+
+def _validate(row, images):
+    serializer = PropertyImportSerializer(data=_clean(row))
+    errors = {} if serializer.is_valid() else dict(serializer.errors)
+    paths = row.get('images') or []
+    if not isinstance(paths, list):
+        errors['images'] = ['Must be a list of image paths.']
+        return serializer, [], errors
+    # Same checks as uploaded photos: a real image within UPLOAD_MAX_SIZE, stored
+    # under the extension its content has (an "image" named x.html must never
+    # be served as HTML from /media/)
+    checked, problems = [], []
+    for path in paths:
+        if not isinstance(path, str) or not images.exists(path):
+            problems.append(f'Not found: {path}')
+        elif images.size(path) > max_upload_size():
+            problems.append(f'Too large: {path} (at most {max_upload_size() // (1024 * 1024)} MB)')
+        else:
+            with images.open(path) as handle:
+                extension = checked_image_extension(handle)
+            if extension is None:
+                problems.append(f'Not a readable image: {path}')
+            else:
+                checked.append((path, extension))
+    if problems:
+        errors['images'] = problems
+    return serializer, checked, errors
+
+
+def _write_batch(batch, owner, images):
+    with transaction.atomic():
+        properties = []
+        for serializer, _paths in batch:
+            prop = Property(owner=owner, status='Available', **serializer.validated_data)
+            # bulk_create skips save(), so fill the parsed columns here
+            prop.refresh_numeric_fields()
+            properties.append(prop)
+        Property.objects.bulk_create(properties)
+
+        property_images = []
+        for prop, (_serializer, paths) in zip(properties, batch):
+            for path, extension in paths:
+                with images.open(path) as handle:
+                    property_image = PropertyImage(property=prop)
+                    property_image.image.save(f'photo{extension}', File(handle), save=False)
+                    property_images.append(property_image)
+        PropertyImage.objects.bulk_create(property_images)
+
+        enqueue_many('process_property_image', [{'image_id': image.id} for image in property_images])
+        # bulk_create sends no post_save, so drop the public cache ourselves
+        transaction.on_commit(invalidate_properties)
+    return properties
+
+
+def import_properties(rows, owner, images=None, batch_size=IMPORT_BATCH_SIZE, dry_run=False):
+    """
+    Validate and insert listings in batches. Each batch (properties, images
+    and their jobs) is one transaction, so a failure never leaves a property
+    without its images. Invalid rows are skipped and reported by row number
+    (1 = first data row), plus the line for records that couldn't be parsed.
+    If the rest of the file can't be read at all, ImportAborted carries the
+    report of the batches already written.
+    """
+    images = images or NoImages()
+    report = {'created': 0, 'created_ids': [], 'errors': []}
+    batch = []
+
+    def flush():
+        if batch and not dry_run:
+            created = _write_batch(batch, owner, images)
+            report['created_ids'].extend(prop.id for prop in created)
+        report['created'] += len(batch)
+        batch.clear()
+
+    rows = iter(rows)
+    number = 0
+    while True:
+        try:
+            row = next(rows)
+        except StopIteration:
+            break
+        except (ValueError, UnicodeDecodeError, csv.Error) as exc:
+            flush()
+            raise ImportAborted(f'Row {number + 1} and after could not be read: {exc}', report) from exc
+        number += 1
+        if isinstance(row, BadRow):
+            report['errors'].append({'row': number, 'line': row.line, 'errors': {'non_field_errors': [row.message]}})
+            continue
+        if not isinstance(row, dict):
+            report['errors'].append({'row': number, 'errors': {'non_field_errors': ['Row must be an object.']}})
+            continue
+        serializer, paths, errors = _validate(row, images)
+        if errors:
+            report['errors'].append({'row': number, 'errors': errors})
+            continue
+        batch.append((serializer, paths))
+        if len(batch) >= batch_size:
+            flush()
+    flush()
+    return report
+
+
+def import_file(fileobj, filename, owner, **options):
+    """Import from an uploaded/opened binary file: CSV, JSON, JSON lines, or a zip holding one of those plus images."""
+    if filename.lower().endswith('.zip'):
+        with zipfile.ZipFile(fileobj) as archive:
+            data_files = [name for name in archive.namelist() if name.lower().endswith(DATA_EXTENSIONS)]
+            if len(data_files) != 1:
+                raise ValueError('The zip must contain exactly one CSV/JSON file with the listings.')
+            with archive.open(data_files[0]) as raw:
+                stream = io.TextIOWrapper(raw, encoding='utf-8-sig', newline='')
+                return import_properties(iter_rows(stream, data_files[0]), owner, ZipImages(archive), **options)
+
+    stream = io.TextIOWrapper(fileobj, encoding='utf-8-sig', newline='')
+    try:
+        return import_properties(iter_rows(stream, filename), owner, options.pop('images', None), **options)
+    finally:
+        stream.detach()
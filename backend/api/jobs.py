@@ -0,0 +1,165 @@
+import logging
+import os
+import socket
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Count, F
+from django.utils import timezone
+
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+# name -> (function, queue, max_attempts)
+TASKS = {}
+# PostgreSQL advisory lock held while a claim checks the queue limits
+CLAIM_LOCK_ID = 0x6a6f6273
+
+
+def task(name, queue='default', max_attempts=3):
+    """Register a function as a background task. It receives the job payload as kwargs."""
+    def decorator(func):
+        TASKS[name] = (func, queue, max_attempts)
+        return func
+    return decorator
+
+
+def enqueue(name, delay=None, **payload):
+    """
+    Queue a task. The row is written in the caller's transaction, so the job
+    only becomes visible to workers if the surrounding work commits.
+    """
+    _load_tasks()
+    func, queue, max_attempts = TASKS[name]
+    if getattr(settings, 'JOBS_RUN_EAGERLY', False):
+        # Dev/test convenience: run inline once the caller's transaction commits
+        transaction.on_commit(lambda: func(**payload))
+        return None
+    run_after = timezone.now() + delay if delay else timezone.now()
+    return Job.objects.create(name=name, queue=queue, payload=payload, max_attempts=max_attempts, run_after=run_after)
+
+
+def enqueue_many(name, payloads):
+    """Queue one job per payload with a single INSERT."""
+    _load_tasks()
+    func, queue, max_attempts = TASKS[name]
+    if getattr(settings, 'JOBS_RUN_EAGERLY', False):
+        for payload in payloads:
+            transaction.on_commit(lambda payload=payload: func(**payload))
+        return []
+    now = timezone.now()
+    return Job.objects.bulk_create([
+        Job(name=name, queue=queue, payload=payload, max_attempts=max_attempts, run_after=now)
+        for payload in payloads
+    ])
+
+
+def _load_tasks():
+    # Task modules register themselves on import
+    from . import tasks  # noqa: F401
+
+
+def worker_id():
+    return f'{socket.gethostname()}:{os.getpid()}'
+
+
+def queue_limits():
+    """Max jobs running at once per queue, across all workers (JOB_QUEUE_CONCURRENCY)."""
+    return getattr(settings, 'JOB_QUEUE_CONCURRENCY', {})
+
+
+def release_stale_jobs():
+    """
+    Jobs whose worker died mid-run (crash, OOM kill) go back to the queue, or
+    fail if that was their last attempt: the attempt was counted when it was
+    claimed, so a job that kills its worker every time doesn't retry forever.
+    """
+    timeout = getattr(settings, 'JOB_LOCK_TIMEOUT', 600)
+    now = timezone.now()
+    stale = Job.objects.filter(status=Job.RUNNING, locked_at__lt=now - timedelta(seconds=timeout))
+    stale.filter(attempts__gte=F('max_attempts')).update(
+        status=Job.FAILED, locked_by='', locked_at=None, finished_at=now,
+        last_error='The worker running this job stopped before it finished.',
+    )
+    return stale.update(status=Job.QUEUED, locked_by='', locked_at=None)
+
+
+def claim_job(worker, queues=None):
+    """
+    Atomically take the next runnable job, or return None.
+
+    Claiming is a conditional UPDATE (status still 'queued'), so two workers
+    can race for the same row and only one wins, on any database. The UPDATE
+    also counts the attempt, so it's counted even if the worker never comes back.
+    """
+    now = timezone.now()
+    limits = queue_limits()
+    candidates = Job.objects.filter(status=Job.QUEUED, run_after__lte=now)
+    if queues:
+        candidates = candidates.filter(queue__in=queues)
+
+    with transaction.atomic():
+        full_queues = []
+        if limits:
+            # Counting running jobs and claiming one must not interleave with
+            # another worker's claim, or both can pass a full queue's check.
+            # (SQLite, for development, runs a single worker.)
+            if connection.vendor == 'postgresql':
+                with connection.cursor() as cursor:
+                    cursor.execute('SELECT pg_advisory_xact_lock(%s)', [CLAIM_LOCK_ID])
+            running = Job.objects.filter(status=Job.RUNNING).values('queue').annotate(n=Count('id'))
+            full_queues = [row['queue'] for row in running if row['n'] >= limits.get(row['queue'], float('inf'))]
+
+        # Rows another worker is claiming right now are skipped, not waited on
+        next_ids = (
+            candidates.exclude(queue__in=full_queues).order_by('run_after', 'id')
+            .select_for_update(skip_locked=True).values_list('id', flat=True)[:10]
+        )
+        for job_id in next_ids:
+            claimed = Job.objects.filter(id=job_id, status=Job.QUEUED).update(
+                status=Job.RUNNING, locked_by=worker, locked_at=now, attempts=F('attempts') + 1,
+            )
+            if claimed:
+                return Job.objects.get(id=job_id)
+    return None
+
+
+def run_job(job):
+    # job.attempts already counts this run (see claim_job)
+    _load_tasks()
+    try:
+        func = TASKS[job.name][0]
+        func(**job.payload)
+    except Exception as exc:
+        logger.exception('Job %s failed (attempt %s/%s)', job, job.attempts, job.max_attempts)
+        job.last_error = ''.join(traceback.format_exception(exc))[-4000:]
+        job.locked_by, job.locked_at = '', None
+        if job.attempts < job.max_attempts:
+            # Exponential backoff: 30s, 60s, 120s, ...
+            job.status = Job.QUEUED
+            job.run_after = timezone.now() + timedelta(seconds=30 * 2 ** (job.attempts - 1))
+        else:
+            job.status = Job.FAILED
+            job.finished_at = timezone.now()
+    else:
+        job.status = Job.DONE
+        job.finished_at = timezone.now()
+        job.locked_by, job.locked_at = '', None
+    job.save(update_fields=['status', 'attempts', 'run_after', 'last_error', 'locked_by', 'locked_at', 'finished_at'])
+    return job
+
+
+def run_pending_jobs(queues=None, limit=None):
+    """Run queued jobs in this process until none are runnable. Returns the number run."""
+    worker = worker_id()
+    count = 0
+    while limit is None or count < limit:
+        job = claim_job(worker, queues)
+        if job is None:
+            break
+        run_job(job)
+        count += 1
+    return count
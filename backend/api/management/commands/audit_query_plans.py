@@ -0,0 +1,125 @@
+import re
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext, override_settings
+from rest_framework.test import APIClient
+
+from api.models import Property
+from api.seed import seed_dataset
+
+# Every read endpoint: (url, who to authenticate as). {property_id} is filled in.
+AUDIT_ENDPOINTS = [
+    ('/api/properties/', None),
+    ('/api/properties/?type=House', None),
+    ('/api/properties/search/', None),
+    ('/api/properties/search/?status=Available', None),
+    ('/api/properties/search/?type=Plot', None),
+    ('/api/properties/search/?sort=price_low', None),
+    ('/api/properties/{property_id}/', None),
+    ('/api/properties/my-listings/', 'seller'),
+    ('/api/leads/my-interests/', 'buyer'),
+    ('/api/dashboard/', 'seller'),
+    ('/api/seller/leads/', 'seller'),
+    ('/api/seller/leads/export/', 'seller'),
+    ('/api/seller/leads/stats/', 'seller'),
+    ('/api/leads/', None),
+    ('/api/users/me/', 'seller'),
+]
+
+POSTGRES_SEQ_SCAN = re.compile(r'Seq Scan on (\w+)')
+# "SCAN api_lead" is a full scan; "SCAN api_lead USING INDEX ..." walks an index
+SQLITE_FULL_SCAN = re.compile(r'\bSCAN (\w+)(?!.*USING (?:COVERING )?INDEX)')
+SQLITE_SORT = 'USE TEMP B-TREE FOR ORDER BY'
+
+
+class Command(BaseCommand):
+    help = (
+        'Run every read endpoint in-process, EXPLAIN each SELECT it issues and flag sequential scans. '
+        'Sorts no index covers are reported too, and fail the audit with --strict. '
+        'Exits non-zero when anything is flagged.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seed', type=int, default=0, metavar='N',
+                            help='Insert N synthetic properties (and 5N leads) first; rolled back afterwards.')
+        parser.add_argument('--strict', action='store_true',
+                            help='Also fail on sorts no index covers (SQLite only; Postgres plans are not checked for sorts).')
+        parser.add_argument('--verbose-plans', action='store_true', help='Print every plan, not just flagged ones.')
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            if options['seed']:
+                seed_dataset(properties=options['seed'], leads=options['seed'] * 5, users=max(10, options['seed'] // 20))
+            if connection.vendor == 'postgresql':
+                connection.cursor().execute('ANALYZE')
+                # Small tables make the planner prefer seq scans even when an index
+                # exists; this makes a seq scan mean "no usable index"
+                connection.cursor().execute('SET LOCAL enable_seqscan = off')
+
+            flagged = self.audit(options['verbose_plans'], options['strict'])
+            transaction.set_rollback(True)
+
+        if flagged:
+            raise CommandError(f'{flagged} query plan(s) flagged.')
+        self.stdout.write(self.style.SUCCESS('No sequential scans found.'))
+
+    def actors(self):
+        prop = Property.objects.order_by('-id').first()
+        if prop is None:
+            raise CommandError('No properties to audit against. Run with --seed N.')
+        buyer = User.objects.filter(leads_buyer__isnull=False).first() or prop.owner
+        return prop, {'seller': prop.owner, 'buyer': buyer}
+
+    def explain(self, sql):
+        prefix = 'EXPLAIN QUERY PLAN ' if connection.vendor == 'sqlite' else 'EXPLAIN '
+        with connection.cursor() as cursor:
+            cursor.execute(prefix + sql)
+            rows = cursor.fetchall()
+        if connection.vendor == 'sqlite':
+            return '\n'.join(row[-1] for row in rows)
+        return '\n'.join(row[0] for row in rows)
+
+    def problems(self, plan):
+        """Returns (scans, sorts) found in a plan."""
+        if connection.vendor == 'postgresql':
+            return [f'sequential scan on {table}' for table in POSTGRES_SEQ_SCAN.findall(plan)], []
+        if connection.vendor == 'sqlite':
+            scans = [f'full scan of {table}' for table in SQLITE_FULL_SCAN.findall(plan)]
+            # Expected for prefetches (id IN (...) ORDER BY id), so only fatal with --strict
+            sorts = ['sort without an index'] if SQLITE_SORT in plan else []
+            return scans, sorts
+        return [], []
+
+    def audit(self, verbose, strict):
+        prop, users = self.actors()
+        flagged = 0
+        # Cached responses would hide the queries
+        with override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}}):
+            for url, actor in AUDIT_ENDPOINTS:
+                url = url.format(property_id=prop.id)
+                client = APIClient()
+                if actor:
+                    client.force_authenticate(users[actor])
+                with CaptureQueriesContext(connection) as captured:
+                    response = client.get(url)
+                    if getattr(response, 'streaming', False):
+                        b''.join(response.streaming_content)
+                self.stdout.write(self.style.MIGRATE_HEADING(f'{url} -> {response.status_code}'))
+
+                for query in captured.captured_queries:
+                    sql = query['sql']
+                    if not sql.lstrip().upper().startswith('SELECT'):
+                        continue
+                    plan = self.explain(sql)
+                    scans, sorts = self.problems(plan)
+                    problems = scans + sorts
+                    if scans or (strict and sorts):
+                        flagged += 1
+                        self.stdout.write(self.style.ERROR(f"  FLAGGED ({'; '.join(problems)}): {sql[:160]}"))
+                    elif sorts:
+                        self.stdout.write(self.style.WARNING(f"  note ({'; '.join(sorts)}): {sql[:160]}"))
+                    if problems or verbose:
+                        self.stdout.write('    ' + plan.replace('\n', '\n    '))
+        return flagged
@@ -0,0 +1,78 @@
+import json
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Count
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import AccessToken
+
+from api.benchmark import git_commit, run_load
+from api.models import Property
+
+# (name, sync path, async path, needs a logged-in seller)
+READ_PAIRS = [
+    ('properties-list', '/api/properties/?type=House', '/api/async/properties/?type=House', False),
+    ('properties-search', '/api/properties/search/', '/api/async/properties/search/', False),
+    ('property-detail', '/api/properties/{property_id}/', '/api/async/properties/{property_id}/', False),
+    ('my-listings', '/api/properties/my-listings/', '/api/async/properties/my-listings/', True),
+    ('my-interests', '/api/leads/my-interests/', '/api/async/leads/my-interests/', True),
+]
+
+
+class Command(BaseCommand):
+    help = (
+        'Measure concurrent-connection throughput of the sync read endpoints on a WSGI server against their '
+        '/api/async/ twins on an ASGI server. Start both servers on the same database first, e.g. '
+        '"gunicorn core.wsgi -w 2 -b :8000" and '
+        '"gunicorn core.asgi:application -k uvicorn_worker.UvicornWorker -w 2 -b :8001".'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sync-url', default='http://127.0.0.1:8000', help='WSGI server base URL.')
+        parser.add_argument('--async-url', default='http://127.0.0.1:8001', help='ASGI server base URL.')
+        parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 10, 50],
+                            help='Concurrent connections; each level is run separately.')
+        parser.add_argument('--duration', type=float, default=10.0, help='Seconds per endpoint and level.')
+        parser.add_argument('--only', action='append', metavar='NAME', help='Only endpoints whose name contains NAME.')
+        parser.add_argument('--allow-cache', action='store_true',
+                            help="Let the servers' response cache answer (by default every request is a cache miss).")
+        parser.add_argument('--output', help='Write the JSON report here.')
+
+    def handle(self, *args, **options):
+        # Needs the same database and SECRET_KEY as the servers, to pick rows and sign a token
+        seller = User.objects.annotate(n=Count('properties')).filter(n__gt=0).order_by('-n').first()
+        prop = Property.objects.order_by('-id').first()
+        if seller is None or prop is None:
+            raise CommandError('No properties found. Run seed_data against the same database first.')
+        headers = {'Authorization': f'Bearer {AccessToken.for_user(seller)}'}
+
+        results = {}
+        for name, sync_path, async_path, needs_auth in READ_PAIRS:
+            if options['only'] and not any(pattern in name for pattern in options['only']):
+                continue
+            for concurrency in options['concurrency']:
+                for flavour, base_url, path in (('sync', options['sync_url'], sync_path),
+                                                ('async', options['async_url'], async_path)):
+                    result = run_load(
+                        base_url, path.format(property_id=prop.id), concurrency, options['duration'],
+                        headers=headers if needs_auth else None, bust_cache=not options['allow_cache'],
+                    )
+                    results[f'{name}:{flavour}:c{concurrency}'] = result
+                    self.stdout.write(
+                        f"{name:<18} {flavour:<5} c={concurrency:<4} {result['throughput_rps']:>9.1f} req/s  "
+                        f"p50 {result['p50_ms'] or 0:>8.2f}ms  p99 {result['p99_ms'] or 0:>8.2f}ms  "
+                        f"errors {result['errors']}"
+                    )
+
+        if options['output']:
+            report = {
+                'meta': {
+                    'commit': git_commit(), 'created_at': timezone.now().isoformat(),
+                    'sync_url': options['sync_url'], 'async_url': options['async_url'],
+                    'duration': options['duration'], 'cache': options['allow_cache'],
+                },
+                'endpoints': results,
+            }
+            with open(options['output'], 'w') as handle:
+                json.dump(report, handle, indent=2)
+            self.stdout.write(f"Report written to {options['output']}")
@@ -0,0 +1,64 @@
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Count
+from rest_framework.renderers import JSONRenderer
+
+from api.benchmark import percentile
+from api.fast import FastJSONRenderer, property_rows, values_rows
+from api.models import Lead, Property
+from api.serializers import PROPERTY_CARD_FIELDS, LeadSerializer, MyInterestSerializer, PropertySerializer
+
+
+class Command(BaseCommand):
+    help = (
+        'Time serializer + JSONRenderer against the .values() rows + orjson path (api/fast.py) for the '
+        'property list, my-interests and seller-leads bodies, on the data already in the database '
+        '(run seed_data first). Both paths include their queries.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=20, help='Timed runs per path.')
+
+    def handle(self, *args, **options):
+        buyer = User.objects.annotate(n=Count('leads_buyer')).order_by('-n').first()
+        seller = User.objects.annotate(n=Count('leads_seller')).order_by('-n').first()
+        if not Property.objects.exists() or buyer is None:
+            raise CommandError('No data found. Run seed_data first.')
+
+        fields = set(PROPERTY_CARD_FIELDS)
+        properties = Property.objects.order_by('-created_at', '-id')
+        interests = Lead.objects.filter(buyer=buyer).select_related('property').order_by('-created_at', '-id')
+        seller_leads = Lead.objects.filter(seller=seller).order_by('-created_at', '-id')
+        # Every run clones its queryset, so none of them reads an earlier run's result cache
+        cases = [
+            ('properties-list',
+             lambda: JSONRenderer().render(PropertySerializer(properties.with_card_data(fields), many=True, fields=fields).data),
+             lambda: FastJSONRenderer().render(property_rows(properties, fields))),
+            ('my-interests',
+             lambda: JSONRenderer().render(MyInterestSerializer(interests.all(), many=True).data),
+             lambda: FastJSONRenderer().render(values_rows(MyInterestSerializer(), interests))),
+            ('seller-leads',
+             lambda: JSONRenderer().render(LeadSerializer(seller_leads.all(), many=True).data),
+             lambda: FastJSONRenderer().render(values_rows(LeadSerializer(), seller_leads))),
+        ]
+
+        for name, slow, fast in cases:
+            body = slow()
+            if fast() != body:
+                raise CommandError(f'{name}: the fast path produced different bytes.')
+            slow_ms, fast_ms = self.time(slow, options['repeat']), self.time(fast, options['repeat'])
+            self.stdout.write(
+                f'{name:<16} {len(body):>9}B  serializer p50 {slow_ms:>8.2f}ms  fast p50 {fast_ms:>8.2f}ms  '
+                f'{slow_ms / fast_ms:>5.1f}x'
+            )
+
+    def time(self, function, repeat):
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            function()
+            timings.append(time.perf_counter() - started)
+        timings.sort()
+        return percentile(timings, 50) * 1000
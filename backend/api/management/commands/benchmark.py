@@ -0,0 +1,87 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.test.utils import override_settings
+
+from api.benchmark import compare, run_benchmark
+from api.seed import seed_dataset
+
+
+class Command(BaseCommand):
+    help = (
+        'Drive every API route in-process and report throughput, p50/p95/p99 latency and SQL query counts. '
+        'Everything (including --seed data and rows the write endpoints create) is rolled back afterwards. '
+        'Save with --output and compare two commits with --compare.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=50, help='Timed requests per endpoint.')
+        parser.add_argument('--warmup', type=int, default=5, help='Untimed requests per endpoint first.')
+        parser.add_argument('--only', action='append', metavar='NAME',
+                            help='Only endpoints whose name contains NAME (repeatable).')
+        parser.add_argument('--seed', type=int, default=0, metavar='N',
+                            help='Seed N properties (10N leads, skewed) for this run only.')
+        parser.add_argument('--with-cache', action='store_true',
+                            help='Keep the configured cache. By default it is disabled so every request hits the database.')
+        parser.add_argument('--output', help='Write the JSON report here.')
+        parser.add_argument('--compare', metavar='BASELINE', help='A previous --output file to diff p50/p95 against.')
+
+    def handle(self, *args, **options):
+        if options['requests'] < 1:
+            raise CommandError('--requests must be at least 1')
+        baseline = None
+        if options['compare']:
+            try:
+                with open(options['compare']) as handle:
+                    baseline = json.load(handle)
+            except (OSError, ValueError) as exc:
+                raise CommandError(f"Can't read baseline: {exc}")
+
+        cache_settings = {} if options['with_cache'] else {
+            'CACHES': {'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}}
+        }
+        with override_settings(**cache_settings), transaction.atomic():
+            if options['seed']:
+                seed_dataset(properties=options['seed'], leads=options['seed'] * 10,
+                             users=max(20, options['seed'] // 25), contacts=options['seed'] // 5, images_per_property=2)
+            try:
+                report = run_benchmark(
+                    requests=options['requests'], warmup=options['warmup'], only=options['only'],
+                    progress=self.report_line,
+                )
+            except ValueError as exc:
+                raise CommandError(str(exc))
+            transaction.set_rollback(True)
+        report['meta']['cache'] = options['with_cache']
+
+        if options['output']:
+            with open(options['output'], 'w') as handle:
+                json.dump(report, handle, indent=2)
+            self.stdout.write(f"Report written to {options['output']}")
+
+        if baseline:
+            self.print_comparison(baseline, report)
+
+        failing = [name for name, result in report['endpoints'].items() if result['errors']]
+        if failing:
+            raise CommandError(f"Unexpected status codes from: {', '.join(failing)}")
+
+    def report_line(self, name, result):
+        self.stdout.write(
+            f"{name:<30} {result['throughput_rps'] or 0:>9.1f} req/s  "
+            f"p50 {result['p50_ms']:>8.2f}ms  p95 {result['p95_ms']:>8.2f}ms  p99 {result['p99_ms']:>8.2f}ms  "
+            f"queries {result['queries_mean']:>6}  {result['bytes_mean'] or 0:>8}B  {result['statuses']}"
+        )
+
+    def print_comparison(self, baseline, report):
+        self.stdout.write(self.style.MIGRATE_HEADING(
+            f"\nvs {baseline.get('meta', {}).get('commit') or 'baseline'} (negative = faster)"
+        ))
+        p95 = {name: change for name, _old, _new, change in compare(baseline, report, 'p95_ms')}
+        for name, old, new, change in compare(baseline, report, 'p50_ms'):
+            if old is None:
+                self.stdout.write(f'{name:<30} new endpoint')
+                continue
+            style = self.style.ERROR if change is not None and change > 10 else self.style.SUCCESS
+            self.stdout.write(style(f'{name:<30} p50 {old:>8.2f} -> {new:>8.2f}ms ({change:+.1f}%)  p95 {p95[name] or 0:+.1f}%'))
@@ -0,0 +1,71 @@
+import posixpath
+from datetime import timedelta
+
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+from django.db.models import FileField
+from django.utils import timezone
+
+from api.models import PropertyImage, Upload
+from api.uploads import cancel_upload
+
+
+def _walk(storage, directory):
+    if not storage.exists(directory):
+        return
+    directories, files = storage.listdir(directory)
+    for name in files:
+        yield posixpath.join(directory, name)
+    for name in directories:
+        yield from _walk(storage, posixpath.join(directory, name))
+
+
+class Command(BaseCommand):
+    help = (
+        'Delete uploaded property photos and variants that no PropertyImage row points at any more. '
+        'Content-addressed files can be shared between rows, so deleting a row never deletes its files. '
+        'Also drops chunked uploads that were abandoned or never attached to a property.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--min-age', type=float, default=24,
+                            help='Only delete files older than this many hours, so uploads whose row is '
+                                 'not committed yet survive (default 24).')
+        parser.add_argument('--dry-run', action='store_true', help='List what would be deleted.')
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(hours=options['min_age'])
+        stale = Upload.objects.filter(updated_at__lt=cutoff)
+        if options['dry_run']:
+            self.stdout.write(f'Would drop {stale.count()} stale upload(s)')
+        else:
+            for upload in stale.iterator():
+                cancel_upload(upload)
+
+        fields = [field for field in PropertyImage._meta.get_fields() if isinstance(field, FileField)]
+        referenced = set(Upload.objects.exclude(file='').values_list('file', flat=True))
+        for names in PropertyImage.objects.values_list(*(field.name for field in fields)).iterator(chunk_size=2000):
+            referenced.update(name for name in names if name)
+
+        # The top-level upload directories (property_images/ covers variants/ and seed/ too)
+        roots = {field.upload_to.strip('/').split('/')[0] for field in fields}
+        deleted = freed = kept = 0
+        for root in sorted(roots):
+            for name in _walk(default_storage, root):
+                if name in referenced:
+                    kept += 1
+                    continue
+                if default_storage.get_modified_time(name) > cutoff:
+                    continue
+                size = default_storage.size(name)
+                if options['dry_run']:
+                    self.stdout.write(f'Would delete {name} ({size} bytes)')
+                else:
+                    default_storage.delete(name)
+                deleted += 1
+                freed += size
+
+        verb = 'Would delete' if options['dry_run'] else 'Deleted'
+        self.stdout.write(self.style.SUCCESS(
+            f'{verb} {deleted} orphaned file(s), {freed} bytes; {kept} file(s) still in use.'
+        ))
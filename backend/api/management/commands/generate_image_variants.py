@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from api.images import generate_variants
+from api.models import PropertyImage
+
+
+class Command(BaseCommand):
+    help = 'Build the resized WebP variants for property images that do not have them yet.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true', help='Rebuild variants for every image.')
+
+    def handle(self, *args, **options):
+        images = PropertyImage.objects.order_by('id')
+        if not options['all']:
+            images = images.filter(card_image__isnull=True) | images.filter(card_image='')
+
+        done = failed = 0
+        for property_image in images.iterator(chunk_size=100):
+            try:
+                generate_variants(property_image)
+                done += 1
+            except (OSError, ValueError) as exc:
+                failed += 1
+                self.stderr.write(f'Image {property_image.id} ({property_image.image.name}): {exc}')
+
+        self.stdout.write(self.style.SUCCESS(f'Generated variants for {done} image(s), {failed} failed.'))
@@ -0,0 +1,50 @@
+import json
+import os
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from api.importer import DirectoryImages, IMPORT_BATCH_SIZE, ImportAborted, import_file
+
+
+class Command(BaseCommand):
+    help = (
+        'Bulk import listings from a CSV, JSON array, JSON-lines file or a zip holding one of those plus images. '
+        'Image paths are relative to the data file (or the zip root).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Listings file (.csv, .json, .jsonl, .ndjson or .zip).')
+        parser.add_argument('--owner', required=True, help='Email/username of the user who will own the listings.')
+        parser.add_argument('--images-dir', help='Folder image paths are relative to (default: the data file folder).')
+        parser.add_argument('--batch-size', type=int, default=IMPORT_BATCH_SIZE)
+        parser.add_argument('--dry-run', action='store_true', help='Validate only, write nothing.')
+
+    def handle(self, *args, **options):
+        try:
+            owner = User.objects.get(username=options['owner'])
+        except User.DoesNotExist:
+            raise CommandError(f"No user '{options['owner']}'")
+
+        path = options['path']
+        import_options = {'batch_size': options['batch_size'], 'dry_run': options['dry_run']}
+        if not path.lower().endswith('.zip'):
+            images_dir = options['images_dir'] or os.path.dirname(os.path.abspath(path))
+            import_options['images'] = DirectoryImages(images_dir)
+
+        try:
+            with open(path, 'rb') as fileobj:
+                report = import_file(fileobj, path, owner, **import_options)
+        except ImportAborted as exc:
+            ids = ', '.join(map(str, exc.report['created_ids'])) or 'none'
+            raise CommandError(f'{exc}. Listings imported before that: {ids}')
+        except (OSError, ValueError) as exc:
+            raise CommandError(str(exc))
+
+        for error in report['errors']:
+            line = f" (line {error['line']})" if 'line' in error else ''
+            self.stderr.write(f"Row {error['row']}{line}: {json.dumps(error['errors'])}")
+        verb = 'Would import' if options['dry_run'] else 'Imported'
+        self.stdout.write(self.style.SUCCESS(
+            f"{verb} {report['created']} listing(s); {len(report['errors'])} row(s) rejected."
+        ))
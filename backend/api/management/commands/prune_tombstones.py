@@ -0,0 +1,20 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from api.sync import prune_tombstones, tombstone_retention
+
+
+class Command(BaseCommand):
+    help = (
+        'Delete tombstones (deleted listings/photos) older than SYNC_TOMBSTONE_DAYS. '
+        'Clients with an older sync token get a 410 and do a full sync instead.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=float, help='Keep this many days instead of SYNC_TOMBSTONE_DAYS.')
+
+    def handle(self, *args, **options):
+        older_than = timedelta(days=options['days']) if options['days'] is not None else tombstone_retention()
+        count = prune_tombstones(older_than)
+        self.stdout.write(self.style.SUCCESS(f'Deleted {count} tombstone(s) older than {older_than.days} day(s).'))
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from api.counters import rebuild_lead_counters
+from api.models import LeadDailyStat
+
+
+class Command(BaseCommand):
+    help = (
+        'Recompute Property.leads_count/new_leads_count and the LeadDailyStat rollup from the lead table. '
+        'Run after bulk lead writes that bypass the model signals, or if counters look wrong.'
+    )
+
+    def handle(self, *args, **options):
+        drifted = rebuild_lead_counters()
+        self.stdout.write(self.style.SUCCESS(
+            f'Rebuilt lead counters ({drifted} properties were off) and {LeadDailyStat.objects.count()} daily rollup rows.'
+        ))
@@ -0,0 +1,50 @@
+import signal
+import threading
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connection
+
+from api.jobs import release_stale_jobs, run_pending_jobs, worker_id
+
+
+class Command(BaseCommand):
+    help = 'Run background jobs from the database queue (image processing, notifications).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, default=2, help='Worker threads in this process.')
+        parser.add_argument('--queue', action='append', dest='queues', help='Only run these queues (repeatable).')
+        parser.add_argument('--sleep', type=float, default=1.0, help='Seconds to wait when the queue is empty.')
+        parser.add_argument('--once', action='store_true', help='Drain the runnable jobs and exit.')
+
+    def handle(self, *args, **options):
+        queues = options['queues']
+        if options['once']:
+            release_stale_jobs()
+            count = run_pending_jobs(queues)
+            self.stdout.write(self.style.SUCCESS(f'Ran {count} job(s).'))
+            return
+
+        stop = threading.Event()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(signum, lambda *_: stop.set())
+
+        def loop():
+            try:
+                while not stop.is_set():
+                    close_old_connections()
+                    if not run_pending_jobs(queues, limit=50):
+                        stop.wait(options['sleep'])
+            finally:
+                connection.close()
+
+        release_stale_jobs()
+        threads = [threading.Thread(target=loop, daemon=True) for _ in range(max(1, options['concurrency']))]
+        for thread in threads:
+            thread.start()
+        self.stdout.write(f"Worker {worker_id()} running {len(threads)} thread(s), queues: {', '.join(queues or ['all'])}")
+
+        while not stop.is_set():
+            stop.wait(60)
+            release_stale_jobs()
+        for thread in threads:
+            thread.join()
@@ -0,0 +1,139 @@
+import mimetypes
+import os
+import re
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.core.files.storage import default_storage
+from django.http import FileResponse, Http404, HttpResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from django.views.decorators.http import require_safe
+
+from .storage import content_digest
+
+# Serves MEDIA_ROOT. Content-addressed files (api/storage.py) never change,
+# so browsers and CDNs may keep them for a year without revalidating; older
+# uploads under their original names get a shorter lifetime. With
+# MEDIA_SENDFILE set, Django only checks the file and sets the headers; the
+# bytes go out through the front-end server:
+#   'x-accel-redirect': nginx, with an `internal` location at MEDIA_ACCEL_PREFIX
+#                       aliased to MEDIA_ROOT
+#   'x-sendfile':       Apache mod_xsendfile / lighttpd
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+# Media shares its origin with the API and the admin, so only these types are
+# served to be displayed; anything else (e.g. an HTML file stored before the
+# upload checks) is sent as a download a browser won't render
+INLINE_CONTENT_TYPES = {'image/jpeg', 'image/png', 'image/gif', 'image/webp'}
+RANGE_HEADER = re.compile(r'^bytes=(\d*)-(\d*)$')
+CHUNK_SIZE = 64 * 1024
+
+
+def media_cache_max_age():
+    return getattr(settings, 'MEDIA_CACHE_MAX_AGE', 86400)
+
+
+def _read(path, start, length):
+    with open(path, 'rb') as handle:
+        handle.seek(start)
+        while length > 0:
+            chunk = handle.read(min(CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+
+
+def parse_range(header, size):
+    """
+    (start, end) for a single "bytes=" range, inclusive. None means "send the
+    whole file" (no header, several ranges, or a syntax we don't handle);
+    ValueError means nothing in the file is inside the range (416).
+    """
+    match = RANGE_HEADER.match(header or '')
+    if not match or match.group(1) == match.group(2) == '':
+        return None
+    first, last = match.groups()
+    if first == '':
+        # bytes=-500: the last 500 bytes
+        start, end = max(size - int(last), 0), size - 1
+    else:
+        start = int(first)
+        if last and int(last) < start:
+            return None  # Invalid; RFC 9110 lets us ignore it
+        end = min(int(last), size - 1) if last else size - 1
+    if start >= size or size == 0:
+        raise ValueError('Range not satisfiable')
+    return start, end
+
+
+@require_safe
+def serve_media(request, path):
+    name = path.replace('\\', '/')
+    try:
+        full_path = default_storage.path(name)
+    except (SuspiciousFileOperation, NotImplementedError):
+        raise Http404('Not found.')
+    try:
+        stat = os.stat(full_path)
+    except OSError:
+        raise Http404('Not found.')
+    if not os.path.isfile(full_path):
+        raise Http404('Not found.')
+
+    digest = content_digest(name)
+    etag = quote_etag(digest or f'{int(stat.st_mtime):x}-{stat.st_size:x}')
+    cache_control = IMMUTABLE_CACHE_CONTROL if digest else f'public, max-age={media_cache_max_age()}'
+
+    response = get_conditional_response(request, etag=etag, last_modified=int(stat.st_mtime))
+    if response is None:
+        response = _file_response(request, name, full_path, stat.st_size, etag)
+
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(stat.st_mtime)
+    response['Cache-Control'] = cache_control
+    response['X-Content-Type-Options'] = 'nosniff'
+    return response
+
+
+def _file_response(request, name, full_path, size, etag):
+    content_type = mimetypes.guess_type(full_path)[0]
+    inline = content_type in INLINE_CONTENT_TYPES
+    if not inline:
+        content_type = 'application/octet-stream'
+
+    mode = getattr(settings, 'MEDIA_SENDFILE', '')
+    if mode:
+        response = HttpResponse(content_type=content_type)
+        if mode == 'x-accel-redirect':
+            # nginx answers Range requests itself
+            response['X-Accel-Redirect'] = getattr(settings, 'MEDIA_ACCEL_PREFIX', '/protected-media/') + name
+        else:
+            response['X-Sendfile'] = full_path
+        return _disposition(response, inline)
+
+    # If-Range: only honour the range if the client's copy is still current
+    if_range = request.headers.get('If-Range')
+    try:
+        byte_range = parse_range(request.headers.get('Range'), size) if if_range in (None, etag) else None
+    except ValueError:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{size}'
+        return response
+
+    if byte_range is None:
+        response = FileResponse(open(full_path, 'rb'), content_type=content_type)
+    else:
+        start, end = byte_range
+        response = StreamingHttpResponse(_read(full_path, start, end - start + 1), status=206,
+                                         content_type=content_type)
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+        response['Content-Length'] = str(end - start + 1)
+    response['Accept-Ranges'] = 'bytes'
+    return _disposition(response, inline)
+
+
+def _disposition(response, inline):
+    if not inline:
+        response['Content-Disposition'] = 'attachment'
+    return response
@@ -0,0 +1,297 @@
+import hmac
+import logging
+import random
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.http import HttpResponse, HttpResponseForbidden
+
+# Request profiling. ProfilingMiddleware starts a profile for each request;
+# a database hook (installed on every connection) adds each query's time and
+# SQL to it, and timer() blocks in the code add named phases (serializing,
+# see api/fast.py and api/serializers.py). When the response goes out:
+#
+#   - METRICS_SERVER_TIMING adds a Server-Timing header (total, db, serialize,
+#     app), which browser dev tools show next to the request
+#   - latency, query count, SQL time, serializer time and response size go
+#     into histograms per route, scraped from /metrics/ in Prometheus format
+#   - a request slower than METRICS_SLOW_REQUEST_MS is logged (a
+#     METRICS_SLOW_SAMPLE_RATE share of them) with its slowest and most
+#     repeated SQL, to the api.metrics logger
+#
+# Each worker counts in memory and adds its counts to the shared cache every
+# METRICS_FLUSH_INTERVAL seconds, so with Redis one scrape covers all workers.
+
+logger = logging.getLogger(__name__)
+
+SECONDS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+HISTOGRAMS = {
+    # name: (help, buckets)
+    'api_request_duration_seconds': ('Time spent serving the request', SECONDS_BUCKETS),
+    'api_db_queries': ('SQL queries run per request', (0, 1, 2, 5, 10, 20, 50, 100, 200)),
+    'api_db_duration_seconds': ('Time spent in SQL per request', SECONDS_BUCKETS),
+    'api_serialize_duration_seconds': ('Time spent serializing per request (SQL excluded)', SECONDS_BUCKETS),
+    'api_response_size_bytes': ('Response body size', (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)),
+}
+# Only this many statements are kept per request for the slow-request log
+MAX_QUERIES_KEPT = 200
+
+SERIES_KEY = 'api:metrics:series'
+COUNTER_KEY = 'api:metrics:{name}:{route}:{field}'
+
+_profile = ContextVar('api_request_profile', default=None)
+
+
+class Profile:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.query_count = 0
+        self.db_time = 0.0
+        self.queries = []  # (sql, seconds), up to MAX_QUERIES_KEPT
+        self.timings = {}
+        self.active = set()
+
+
+# --- Hooks ---
+
+def _record_query(execute, sql, params, many, context):
+    profile = _profile.get()
+    if profile is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        elapsed = time.perf_counter() - start
+        profile.query_count += 1
+        profile.db_time += elapsed
+        if len(profile.queries) < MAX_QUERIES_KEPT:
+            # The SQL with %s placeholders: parameters (phones, emails) stay out of the logs
+            profile.queries.append((sql, elapsed))
+
+
+def install_query_hook(sender=None, connection=None, **kwargs):
+    if _record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_record_query)
+
+
+def install_query_hooks():
+    # New connections get the hook from connection_created; this covers any already open (see apps.py)
+    connection_created.connect(install_query_hook)
+    for connection in connections.all(initialized_only=True):
+        install_query_hook(connection=connection)
+
+
+@contextmanager
+def timer(name):
+    """Adds the time spent in the block to the current request's `name` phase, minus its SQL."""
+    profile = _profile.get()
+    if profile is None or name in profile.active:
+        # Not profiling, or nested in the same phase (already being counted)
+        yield
+        return
+    profile.active.add(name)
+    start, db_before = time.perf_counter(), profile.db_time
+    try:
+        yield
+    finally:
+        profile.active.discard(name)
+        elapsed = time.perf_counter() - start - (profile.db_time - db_before)
+        profile.timings[name] = profile.timings.get(name, 0.0) + max(elapsed, 0.0)
+
+
+# --- Histograms ---
+
+_lock = threading.Lock()
+_pending = {}  # (name, route) -> [count per bucket..., +Inf count, total count, sum]
+_last_flush = time.monotonic()
+
+
+def observe(name, route, value):
+    buckets = HISTOGRAMS[name][1]
+    with _lock:
+        series = _pending.get((name, route))
+        if series is None:
+            series = _pending[(name, route)] = [0] * (len(buckets) + 3)
+        series[bisect_left(buckets, value)] += 1
+        series[-2] += 1
+        series[-1] += value
+
+
+def _incr(key, amount):
+    if not cache.add(key, amount, None):
+        try:
+            cache.incr(key, amount)
+        except ValueError:
+            cache.set(key, amount, None)
+
+
+def flush(force=False):
+    """Add this worker's counts to the shared cache (at most every METRICS_FLUSH_INTERVAL seconds)."""
+    global _pending, _last_flush
+    now = time.monotonic()
+    if not force and now - _last_flush < getattr(settings, 'METRICS_FLUSH_INTERVAL', 10):
+        return
+    with _lock:
+        pending, _pending, _last_flush = _pending, {}, now
+    if not pending:
+        return
+    for (name, route), series in pending.items():
+        for field, amount in enumerate(series[:-2]):
+            if amount:
+                _incr(COUNTER_KEY.format(name=name, route=route, field=field), amount)
+        _incr(COUNTER_KEY.format(name=name, route=route, field='count'), series[-2])
+        # The cache only adds integers, so sums are kept in millionths
+        _incr(COUNTER_KEY.format(name=name, route=route, field='sum'), round(series[-1] * 1e6))
+    # Read-modify-write: two workers adding a new route at once can drop one
+    # from the list until its next flush, like the cache stats do
+    known = cache.get(SERIES_KEY) or set()
+    if not set(pending) <= known:
+        cache.set(SERIES_KEY, known | set(pending), None)
+
+
+def _label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"')
+
+
+def render_metrics():
+    """Every histogram in the Prometheus text format."""
+    flush(force=True)
+    series = sorted(cache.get(SERIES_KEY) or ())
+    keys = []
+    for name, route in series:
+        fields = [*range(len(HISTOGRAMS[name][1]) + 1), 'count', 'sum']
+        keys += [COUNTER_KEY.format(name=name, route=route, field=field) for field in fields]
+    values = cache.get_many(keys)
+
+    lines = []
+    for name, (help_text, buckets) in HISTOGRAMS.items():
+        lines += [f'# HELP {name} {help_text}', f'# TYPE {name} histogram']
+        for series_name, route in series:
+            if series_name != name:
+                continue
+            label = f'route="{_label(route)}"'
+            get = lambda field: values.get(COUNTER_KEY.format(name=name, route=route, field=field), 0)
+            cumulative = 0
+            for index, bound in enumerate([*buckets, '+Inf']):
+                cumulative += get(index)
+                lines.append(f'{name}_bucket{{{label},le="{bound}"}} {cumulative}')
+            lines.append(f'{name}_sum{{{label}}} {get("sum") / 1e6:g}')
+            lines.append(f'{name}_count{{{label}}} {get("count")}')
+    return '\n'.join(lines) + '\n'
+
+
+def metrics_view(request):
+    """GET /metrics/: for Prometheus (Authorization: Bearer <METRICS_TOKEN>) or a logged-in staff user."""
+    token = getattr(settings, 'METRICS_TOKEN', '')
+    header = request.headers.get('Authorization', '')
+    allowed = token and hmac.compare_digest(header.encode(), f'Bearer {token}'.encode())
+    if not allowed and not (request.user.is_authenticated and request.user.is_staff):
+        return HttpResponseForbidden('Forbidden\n')
+    return HttpResponse(render_metrics(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
+# --- Middleware ---
+
+def _route(request):
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return 'unmatched'  # 404s: their paths would make a new series each
+    return match.view_name or match._func_path
+
+
+def _response_size(response):
+    if response.streaming:
+        return int(response['Content-Length']) if response.has_header('Content-Length') else None
+    return len(response.content)
+
+
+def _server_timing(total, profile, app):
+    serialize = profile.timings.get('serialize', 0.0)
+    return ', '.join([
+        f'total;dur={total * 1000:.1f}',
+        f'db;dur={profile.db_time * 1000:.1f};desc="{profile.query_count} queries"',
+        f'serialize;dur={serialize * 1000:.1f}',
+        f'app;dur={app * 1000:.1f}',
+    ])
+
+
+def _log_slow(request, route, total, profile):
+    by_statement = {}
+    for sql, seconds in profile.queries:
+        count, spent = by_statement.get(sql, (0, 0.0))
+        by_statement[sql] = (count + 1, spent + seconds)
+    # Costliest statements first; a high count is usually an N+1
+    worst = sorted(by_statement.items(), key=lambda item: item[1][1], reverse=True)[:10]
+    logger.warning(
+        'Slow request: %s %s (%s) took %.0f ms, %d queries in %.0f ms\n%s',
+        request.method, request.path, route, total * 1000, profile.query_count, profile.db_time * 1000,
+        '\n'.join(f'  {count}x {spent * 1000:.1f} ms  {sql}' for sql, (count, spent) in worst),
+    )
+
+
+class ProfilingMiddleware:
+    """Profiles every request (sync or async); put it first in MIDDLEWARE to count the whole stack."""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'METRICS_ENABLED', True):
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        token = _profile.set(Profile())
+        try:
+            response = self.get_response(request)
+            self.finish(request, response, _profile.get())
+        finally:
+            _profile.reset(token)
+        return response
+
+    async def __acall__(self, request):
+        token = _profile.set(Profile())
+        try:
+            response = await self.get_response(request)
+            # Flushing may talk to the cache, so off the event loop
+            await sync_to_async(self.finish)(request, response, _profile.get())
+        finally:
+            _profile.reset(token)
+        return response
+
+    def finish(self, request, response, profile):
+        total = time.perf_counter() - profile.started
+        route = _route(request)
+        if route == 'metrics':
+            return  # Scrapes would only measure themselves
+        serialize = profile.timings.get('serialize', 0.0)
+        app = max(total - profile.db_time - serialize, 0.0)
+        if getattr(settings, 'METRICS_SERVER_TIMING', False):
+            response['Server-Timing'] = _server_timing(total, profile, app)
+
+        observe('api_request_duration_seconds', route, total)
+        observe('api_db_queries', route, profile.query_count)
+        observe('api_db_duration_seconds', route, profile.db_time)
+        observe('api_serialize_duration_seconds', route, serialize)
+        size = _response_size(response)
+        if size is not None:
+            observe('api_response_size_bytes', route, size)
+        flush()
+
+        threshold = getattr(settings, 'METRICS_SLOW_REQUEST_MS', 1000)
+        if threshold is not None and total * 1000 >= threshold:
+            if random.random() < getattr(settings, 'METRICS_SLOW_SAMPLE_RATE', 1.0):
+                _log_slow(request, route, total, profile)
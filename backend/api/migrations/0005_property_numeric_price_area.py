@@ -0,0 +1,60 @@
+# Generated by Django 6.0.1 on 2026-10-17 23:46
+
+from django.conf import settings
+from django.db import migrations, models
+
+from api.units import parse_price, parse_area, price_per_sqft
+
+
+def backfill_numeric_fields(apps, schema_editor):
+    Property = apps.get_model('api', 'Property')
+    batch = []
+    for prop in Property.objects.only('id', 'price', 'area').iterator(chunk_size=500):
+        prop.price_value = parse_price(prop.price)
+        prop.area_sqft = parse_area(prop.area)
+        prop.price_per_sqft = price_per_sqft(prop.price_value, prop.area_sqft)
+        batch.append(prop)
+        if len(batch) >= 500:
+            Property.objects.bulk_update(batch, ['price_value', 'area_sqft', 'price_per_sqft'])
+            batch = []
+    if batch:
+        Property.objects.bulk_update(batch, ['price_value', 'area_sqft', 'price_per_sqft'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0004_property_created_id_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='property',
+            name='area_sqft',
+            field=models.IntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='property',
+            name='price_per_sqft',
+            field=models.IntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='property',
+            name='price_value',
+            field=models.BigIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='property',
+            index=models.Index(fields=['price_value', 'id'], name='property_price_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='property',
+            index=models.Index(fields=['area_sqft', 'id'], name='property_area_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='property',
+            index=models.Index(fields=['price_per_sqft', 'id'], name='property_price_sqft_idx'),
+        ),
+        migrations.RunPython(backfill_numeric_fields, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,68 @@
+# Generated by Django 6.0.1 on 2026-10-17 23:48
+
+import django.contrib.postgres.search
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+# PostgreSQL only: the search vector is maintained by a trigger so bulk inserts
+# and queryset.update() keep it current too. Other databases skip these steps
+# and api.search falls back to plain substring matching.
+FORWARD_SQL = [
+    """
+    CREATE OR REPLACE FUNCTION api_property_search_vector_update() RETURNS trigger AS $$
+    BEGIN
+        NEW.search_vector :=
+            setweight(to_tsvector('simple', coalesce(NEW.title, '')), 'A') ||
+            setweight(to_tsvector('simple', coalesce(NEW.colony, '')), 'A') ||
+            setweight(to_tsvector('simple', coalesce(NEW.location, '')), 'B') ||
+            setweight(to_tsvector('simple', coalesce(NEW.description, '')), 'C');
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE TRIGGER api_property_search_vector_trigger
+    BEFORE INSERT OR UPDATE OF title, colony, location, description, search_vector ON api_property
+    FOR EACH ROW EXECUTE FUNCTION api_property_search_vector_update()
+    """,
+    "UPDATE api_property SET title = title",
+    "CREATE INDEX IF NOT EXISTS property_search_vector_idx ON api_property USING gin (search_vector)",
+    "CREATE INDEX IF NOT EXISTS property_title_trgm_idx ON api_property USING gin (title gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS property_colony_trgm_idx ON api_property USING gin (colony gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS property_location_trgm_idx ON api_property USING gin (location gin_trgm_ops)",
+]
+
+REVERSE_SQL = [
+    "DROP INDEX IF EXISTS property_location_trgm_idx",
+    "DROP INDEX IF EXISTS property_colony_trgm_idx",
+    "DROP INDEX IF EXISTS property_title_trgm_idx",
+    "DROP INDEX IF EXISTS property_search_vector_idx",
+    "DROP TRIGGER IF EXISTS api_property_search_vector_trigger ON api_property",
+    "DROP FUNCTION IF EXISTS api_property_search_vector_update()",
+]
+
+
+def _run_on_postgres(statements):
+    def run(apps, schema_editor):
+        if schema_editor.connection.vendor != 'postgresql':
+            return
+        for statement in statements:
+            schema_editor.execute(statement)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0005_property_numeric_price_area'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddField(
+            model_name='property',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(_run_on_postgres(FORWARD_SQL), _run_on_postgres(REVERSE_SQL)),
+    ]
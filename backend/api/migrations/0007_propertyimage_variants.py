@@ -0,0 +1,28 @@
+# Generated by Django 6.0.1 on 2026-10-17 23:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0006_property_search'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='propertyimage',
+            name='card_image',
+            field=models.ImageField(blank=True, editable=False, null=True, upload_to='property_images/variants/'),
+        ),
+        migrations.AddField(
+            model_name='propertyimage',
+            name='detail_image',
+            field=models.ImageField(blank=True, editable=False, null=True, upload_to='property_images/variants/'),
+        ),
+        migrations.AddField(
+            model_name='propertyimage',
+            name='full_image',
+            field=models.ImageField(blank=True, editable=False, null=True, upload_to='property_images/variants/'),
+        ),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 6.0.1 on 2026-10-17 23:58
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def backfill_lead_seller(apps, schema_editor):
+    # Leads posted through /api/leads/ had no seller; it is always the property owner
+    Lead = apps.get_model('api', 'Lead')
+    Property = apps.get_model('api', 'Property')
+    owner = Property.objects.filter(pk=OuterRef('property_id')).values('owner_id')[:1]
+    Lead.objects.filter(seller__isnull=True, property__isnull=False).update(seller_id=Subquery(owner))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0008_job'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='lead',
+            index=models.Index(fields=['buyer', '-created_at', '-id'], name='lead_buyer_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='lead',
+            index=models.Index(fields=['seller', '-created_at', '-id'], name='lead_seller_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='lead',
+            index=models.Index(fields=['property', '-created_at', '-id'], name='lead_property_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='lead',
+            index=models.Index(fields=['-created_at', '-id'], name='lead_created_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='property',
+            index=models.Index(fields=['owner', '-created_at', '-id'], name='property_owner_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='property',
+            index=models.Index(fields=['status', '-created_at', '-id'], name='property_status_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='property',
+            index=models.Index(fields=['type', '-created_at', '-id'], name='property_type_created_idx'),
+        ),
+        migrations.RunPython(backfill_lead_seller, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,68 @@
+# Generated by Django 6.0.1 on 2026-10-18 00:06
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce, TruncDate
+
+
+def backfill_counters(apps, schema_editor):
+    # Same as api.counters.rebuild_lead_counters, against the historical models
+    Property = apps.get_model('api', 'Property')
+    Lead = apps.get_model('api', 'Lead')
+    LeadDailyStat = apps.get_model('api', 'LeadDailyStat')
+
+    leads = Lead.objects.filter(property=OuterRef('pk')).order_by().values('property')
+    total = leads.annotate(n=Count('id')).values('n')
+    new = leads.filter(status='New').annotate(n=Count('id')).values('n')
+    Property.objects.update(leads_count=Coalesce(Subquery(total), 0), new_leads_count=Coalesce(Subquery(new), 0))
+
+    rows = (
+        Lead.objects.filter(property__isnull=False).order_by()
+        .annotate(day=TruncDate('created_at'))
+        .values('property', 'property__owner', 'day')
+        .annotate(leads=Count('id'), new_leads=Count('id', filter=Q(status='New')))
+    )
+    LeadDailyStat.objects.bulk_create([
+        LeadDailyStat(property_id=row['property'], seller_id=row['property__owner'], day=row['day'],
+                      leads=row['leads'], new_leads=row['new_leads'])
+        for row in rows
+    ], batch_size=2000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0009_endpoint_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='property',
+            name='leads_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='property',
+            name='new_leads_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.CreateModel(
+            name='LeadDailyStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('leads', models.PositiveIntegerField(default=0)),
+                ('new_leads', models.PositiveIntegerField(default=0)),
+                ('property', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_lead_stats', to='api.property')),
+                ('seller', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='daily_lead_stats', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['seller', 'day'], name='lead_daily_stat_seller_idx')],
+                'constraints': [models.UniqueConstraint(fields=('property', 'day'), name='lead_daily_stat_property_day')],
+            },
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 6.0.1 on 2026-10-18 01:29
+
+from django.db import migrations, models
+
+# PostgreSQL only: descending sorts put NULLs last (see nulls_last_order in
+# api/pagination.py), which a backwards scan of the ascending price/area
+# indexes can't give. SQLite can't declare NULLS LAST in an index.
+FORWARD_SQL = [
+    "CREATE INDEX IF NOT EXISTS property_price_desc_idx ON api_property (price_value DESC NULLS LAST, id DESC NULLS LAST)",
+    "CREATE INDEX IF NOT EXISTS property_area_desc_idx ON api_property (area_sqft DESC NULLS LAST, id DESC NULLS LAST)",
+]
+
+REVERSE_SQL = [
+    "DROP INDEX IF EXISTS property_area_desc_idx",
+    "DROP INDEX IF EXISTS property_price_desc_idx",
+]
+
+
+def _run_on_postgres(statements):
+    def run(apps, schema_editor):
+        if schema_editor.connection.vendor != 'postgresql':
+            return
+        for statement in statements:
+            schema_editor.execute(statement)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0013_delta_sync'),
+    ]
+
+    operations = [
+        # '500 Cr' over 1 sq ft doesn't fit in 32 bits
+        migrations.AlterField(
+            model_name='property',
+            name='price_per_sqft',
+            field=models.BigIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.RunPython(_run_on_postgres(FORWARD_SQL), _run_on_postgres(REVERSE_SQL)),
+    ]
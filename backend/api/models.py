@@ -1,7 +1,12 @@
-from django.db import models
+import uuid
+
+from django.db import models, transaction
+from django.contrib.postgres.search import SearchVectorField
 from django.contrib.auth.models import User
 from django.db.models.signals import post_save
 from django.dispatch import receiver
+from django.utils import timezone
+from .units import parse_price, parse_area, price_per_sqft
 
 class Profile(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='profile')
@@ -15,6 +20,18 @@ class Profile(models.Model):
     def __str__(self):
         return self.full_name
 
+class PropertyQuerySet(models.QuerySet):
+    def with_card_data(self, fields=None):
+        # Everything PropertySerializer reads, loaded in two queries total.
+        # With a sparse fieldset, only what those fields need
+        queryset = self
+        if fields is None or 'submitted_by' in fields:
+            queryset = queryset.select_related('owner')
+        if fields is None or {'images', 'cover_image'} & set(fields):
+            queryset = queryset.prefetch_related(Property.ordered_images())
+        return queryset
+
+
 class Property(models.Model):
     owner = models.ForeignKey(User, on_delete=models.CASCADE, related_name='properties')
     title = models.CharField(max_length=200)
@@ -28,13 +45,80 @@ class Property(models.Model):
     status = models.CharField(max_length=50, default='Available')
     description = models.TextField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    # Also bumped when one of its images changes (api/signals.py); drives /api/properties/changes/
+    updated_at = models.DateTimeField(auto_now=True)
+
+    # Parsed from price/area on save so the database can filter and sort on them
+    price_value = models.BigIntegerField(null=True, blank=True, editable=False) # Rupees
+    area_sqft = models.IntegerField(null=True, blank=True, editable=False)
+    price_per_sqft = models.BigIntegerField(null=True, blank=True, editable=False)
+
+    # Full-text vector over title/colony/location/description, kept up to date by
+    # a database trigger on PostgreSQL (see migration 0006). Unused elsewhere.
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    # Maintained by api/counters.py whenever a Lead is saved or deleted
+    leads_count = models.PositiveIntegerField(default=0, editable=False)
+    new_leads_count = models.PositiveIntegerField(default=0, editable=False) # Leads still in status 'New'
+
+    objects = PropertyQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # Keyset pagination order for the public listing pages
+            models.Index(fields=['-created_at', '-id'], name='property_created_id_idx'),
+            models.Index(fields=['price_value', 'id'], name='property_price_idx'),
+            models.Index(fields=['area_sqft', 'id'], name='property_area_idx'),
+            # The price_high and area sorts (DESC NULLS LAST) have their own
+            # indexes on PostgreSQL, see migration 0014
+            models.Index(fields=['price_per_sqft', 'id'], name='property_price_sqft_idx'),
+            # get_my_listings: owner=... ORDER BY created_at
+            models.Index(fields=['owner', '-created_at', '-id'], name='property_owner_created_idx'),
+            # Listing pages filtered by status/type, newest first
+            models.Index(fields=['status', '-created_at', '-id'], name='property_status_created_idx'),
+            models.Index(fields=['type', '-created_at', '-id'], name='property_type_created_idx'),
+            # Delta sync (api/sync.py) walks this order
+            models.Index(fields=['updated_at', 'id'], name='property_updated_idx'),
+        ]
 
     def __str__(self):
         return self.title
+
+    def refresh_numeric_fields(self):
+        self.price_value = parse_price(self.price)
+        self.area_sqft = parse_area(self.area)
+        self.price_per_sqft = price_per_sqft(self.price_value, self.area_sqft)
+
+    COUNTER_FIELDS = ('leads_count', 'new_leads_count')
+
+    def save(self, *args, **kwargs):
+        self.refresh_numeric_fields()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            # auto_now only applies to fields being written
+            kwargs['update_fields'] = set(update_fields) | {'updated_at'}
+            if {'price', 'area'} & set(update_fields):
+                kwargs['update_fields'] |= {'price_value', 'area_sqft', 'price_per_sqft'}
+        elif update_fields is None and self.pk and not self._state.adding:
+            # Never write back counters loaded earlier; a lead may have bumped them since
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.COUNTER_FIELDS
+            ]
+        super().save(*args, **kwargs)
+
+    @staticmethod
+    def ordered_images():
+        return models.Prefetch('images', queryset=PropertyImage.objects.order_by('id'))
     
 class PropertyImage(models.Model):
     property = models.ForeignKey(Property, on_delete=models.CASCADE, related_name='images')
     image = models.ImageField(upload_to='property_images/')
+
+    # Resized, metadata-free WebP copies built by api.images.generate_variants
+    card_image = models.ImageField(upload_to='property_images/variants/', null=True, blank=True, editable=False)
+    detail_image = models.ImageField(upload_to='property_images/variants/', null=True, blank=True, editable=False)
+    full_image = models.ImageField(upload_to='property_images/variants/', null=True, blank=True, editable=False)
     
     def __str__(self):
         return f"Image for {self.property.title}"
@@ -53,9 +137,65 @@ class Lead(models.Model):
     status = models.CharField(max_length=50, default='New')
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            # get_my_interests: buyer=... ORDER BY created_at
+            models.Index(fields=['buyer', '-created_at', '-id'], name='lead_buyer_created_idx'),
+            # Seller dashboards/exports: seller=... or property IN (...) ORDER BY created_at
+            models.Index(fields=['seller', '-created_at', '-id'], name='lead_seller_created_idx'),
+            models.Index(fields=['property', '-created_at', '-id'], name='lead_property_created_idx'),
+            # Unfiltered lead list, newest first
+            models.Index(fields=['-created_at', '-id'], name='lead_created_id_idx'),
+            # Admin: status filter, and looking a buyer up by phone
+            models.Index(fields=['status', '-created_at', '-id'], name='lead_status_created_idx'),
+            models.Index(fields=['buyer_phone'], name='lead_buyer_phone_idx'),
+        ]
+
     def __str__(self):
         return f"Lead for {self.property.title} by {self.buyer_name}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember what the row counted as, so a later save/delete can apply just the difference
+        if not instance.get_deferred_fields():
+            instance._counted_state = instance.counter_state()
+        return instance
+
+    def counter_state(self):
+        """What this lead adds to the counters: (property_id, day, is_new), or None."""
+        if self.property_id is None or self.created_at is None:
+            return None
+        return self.property_id, timezone.localdate(self.created_at), self.status == 'New'
+
+    def save(self, *args, **kwargs):
+        # The counter/rollup updates (api/signals.py) commit or roll back with the lead
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
+
+class LeadDailyStat(models.Model):
+    """
+    Leads per property per day, for seller dashboard trends. `seller` is the
+    property owner (what Lead.seller is set to). Maintained by api/counters.py.
+    """
+    property = models.ForeignKey(Property, on_delete=models.CASCADE, related_name='daily_lead_stats')
+    seller = models.ForeignKey(User, on_delete=models.CASCADE, related_name='daily_lead_stats', null=True, blank=True)
+    day = models.DateField()
+    leads = models.PositiveIntegerField(default=0)
+    new_leads = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['property', 'day'], name='lead_daily_stat_property_day'),
+        ]
+        indexes = [
+            models.Index(fields=['seller', 'day'], name='lead_daily_stat_seller_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.day}: {self.leads} leads for property {self.property_id}"
+
 class Contact(models.Model):
     name = models.CharField(max_length=200)
     email = models.EmailField()
@@ -63,11 +203,97 @@ class Contact(models.Model):
     message = models.TextField()
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            # Admin: newest first, and looking a sender up by email
+            models.Index(fields=['-created_at', '-id'], name='contact_created_idx'),
+            models.Index(fields=['email'], name='contact_email_idx'),
+        ]
+
     def __str__(self):
         return f"{self.subject} - {self.email}"
-    
+
+
+class Job(models.Model):
+    """A unit of background work, run by `manage.py run_jobs` (see api/jobs.py)."""
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUS_CHOICES = [(QUEUED, 'Queued'), (RUNNING, 'Running'), (DONE, 'Done'), (FAILED, 'Failed')]
+
+    name = models.CharField(max_length=100)
+    queue = models.CharField(max_length=50, default='default')
+    payload = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=QUEUED)
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=3)
+    run_after = models.DateTimeField(default=timezone.now)
+    locked_by = models.CharField(max_length=100, blank=True)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # The worker's "next job" lookup
+            models.Index(fields=['status', 'queue', 'run_after', 'id'], name='job_pick_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.name} #{self.id} ({self.status})"
+
+
+class Tombstone(models.Model):
+    """A deleted property or image, so syncing clients can drop it (see api/sync.py)."""
+    PROPERTY = 'property'
+    IMAGE = 'image'
+    KIND_CHOICES = [(PROPERTY, 'Property'), (IMAGE, 'Image')]
+
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    object_id = models.BigIntegerField()
+    parent_id = models.BigIntegerField(null=True, blank=True) # The property an image belonged to
+    deleted_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['deleted_at', 'id'], name='tombstone_deleted_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} #{self.object_id} deleted {self.deleted_at:%Y-%m-%d %H:%M}"
+
+
+class Upload(models.Model):
+    """A chunked, resumable photo upload; attached to a property once complete (see api/uploads.py)."""
+    UPLOADING = 'uploading'
+    COMPLETE = 'complete'
+    STATUS_CHOICES = [(UPLOADING, 'Uploading'), (COMPLETE, 'Complete')]
+
+    # Random ids, so a session can't be found by counting
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    owner = models.ForeignKey(User, on_delete=models.CASCADE, related_name='uploads')
+    filename = models.CharField(max_length=255)
+    size = models.PositiveBigIntegerField() # Declared up front, in bytes
+    received = models.PositiveBigIntegerField(default=0)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=UPLOADING)
+    file = models.ImageField(upload_to='property_images/', blank=True) # Set when complete
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            # gc_media: abandoned sessions
+            models.Index(fields=['updated_at'], name='upload_updated_idx'),
+        ]
+
+    def __str__(self):
+        return f"Upload {self.id} ({self.received}/{self.size})"
+
+
 # Signal to auto-create Profile when User is created
 @receiver(post_save, sender=User)
 def create_user_profile(sender, instance, created, **kwargs):
     if created:
-        Profile.objects.create(user=instance)
\ No newline at end of file
+        Profile.objects.create(user=instance)
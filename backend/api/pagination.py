@@ -0,0 +1,230 @@
+import base64
+import json
+from datetime import date, datetime
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import F, Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param, remove_query_param
+
+
+def _encode_value(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+
+def nulls_last_order(ordering):
+    # NULLs always sort last so keyset seek filters can reason about them
+    expressions = []
+    for name in ordering:
+        if name.startswith('-'):
+            expressions.append(F(name[1:]).desc(nulls_last=True))
+        else:
+            expressions.append(F(name).asc(nulls_last=True))
+    return expressions
+
+
+def bare_lists(request):
+    """
+    Compatibility mode: list endpoints return the page as a plain array (the
+    pre-pagination shape), with the next page in the Link header. On with
+    ?envelope=0, or for every request with API_BARE_LISTS; ?envelope=1 wins.
+    """
+    envelope = request.query_params.get('envelope')
+    if envelope in ('0', 'false'):
+        return True
+    if envelope in ('1', 'true'):
+        return False
+    return getattr(settings, 'API_BARE_LISTS', False)
+
+
+class KeysetPagination(BasePagination):
+    """
+    Keyset ("seek") pagination. The default for every list endpoint, so no
+    request can make a worker serialize a whole table.
+
+    The cursor holds the ordering values of the last row on the page, and the
+    next page is fetched with a WHERE clause on those values instead of an
+    OFFSET, so page N costs the same as page 1. The ordering must end with a
+    unique column (usually id) so every row has a single position.
+    """
+    page_size = 20
+    max_page_size = 100
+    page_size_query_param = 'page_size'
+    cursor_query_param = 'cursor'
+    ordering = ('-created_at', '-id')
+
+    def paginate_queryset(self, queryset, request, view=None, ordering=None):
+        rows = list(self._page_queryset(queryset, request, view, ordering))
+        return self._set_page(rows)
+
+    def paginate_rows(self, queryset, request, to_rows, view=None, ordering=None):
+        """
+        paginate_queryset for the .values() fast path (api/fast.py).
+        to_rows(queryset, keys) returns the serialized rows plus each row's
+        values for `keys` (the ordering fields), which the cursor is built
+        from, since the rows themselves may not include them.
+        """
+        rows, positions = to_rows(self._page_queryset(queryset, request, view, ordering), self._field_names())
+        return self._set_page(rows, positions)
+
+    async def apaginate_queryset(self, queryset, request, view=None, ordering=None):
+        # Same as paginate_queryset, for async views
+        rows = [row async for row in self._page_queryset(queryset, request, view, ordering)]
+        return self._set_page(rows)
+
+    def _page_queryset(self, queryset, request, view, ordering):
+        self.request = request
+        self.ordering = tuple(ordering or getattr(view, 'keyset_ordering', None) or self.ordering)
+        self.limit = self.get_page_size(request)
+
+        queryset = queryset.order_by(*nulls_last_order(self.ordering))
+        position = self.decode_cursor(request)
+        if position is not None:
+            position = self._typed_position(queryset.model, position)
+            queryset = queryset.filter(self._seek_filter(queryset.model, position))
+        # Fetch one extra row to know if there is a next page
+        return queryset[:self.limit + 1]
+
+    def _set_page(self, rows, positions=None):
+        self.has_next = len(rows) > self.limit
+        self.page = rows[:self.limit]
+        self.positions = positions
+        return self.page
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params.get(self.page_size_query_param, self.page_size))
+        except (TypeError, ValueError):
+            return self.page_size
+        if size <= 0:
+            return self.page_size
+        return min(size, self.max_page_size)
+
+    def get_paginated_data(self, data):
+        if bare_lists(self.request):
+            return data
+        return {
+            'next': self.get_next_link(),
+            'results': data,
+        }
+
+    def get_headers(self):
+        # Sent in both modes; the only pointer to the next page for bare lists
+        next_link = self.get_next_link()
+        return {'Link': f'<{next_link}>; rel="next"'} if next_link else {}
+
+    def get_paginated_response(self, data):
+        return Response(self.get_paginated_data(data), headers=self.get_headers())
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        if self.positions is not None:
+            position = self.positions[len(self.page) - 1]
+        else:
+            position = [self._row_value(self.page[-1], name) for name in self._field_names()]
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(position))
+
+    def get_first_link(self):
+        return remove_query_param(self.request.build_absolute_uri(), self.cursor_query_param)
+
+    # --- Cursor encoding ---
+
+    def encode_cursor(self, position):
+        values = [_encode_value(value) for value in position]
+        raw = json.dumps(values, separators=(',', ':')).encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+    def decode_cursor(self, request):
+        values = self.decode_values(request.query_params.get(self.cursor_query_param))
+        if values is not None and len(values) != len(self.ordering):
+            raise NotFound('Invalid cursor')
+        return values
+
+    def decode_values(self, encoded):
+        if not encoded:
+            return None
+        try:
+            padded = encoded + '=' * (-len(encoded) % 4)
+            values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        except (TypeError, ValueError):
+            raise NotFound('Invalid cursor')
+        if not isinstance(values, list):
+            raise NotFound('Invalid cursor')
+        return values
+
+    # --- Query building ---
+
+    def _field_names(self):
+        return [name.lstrip('-') for name in self.ordering]
+
+    def _row_value(self, row, name):
+        if isinstance(row, dict):
+            return row[name]
+        return getattr(row, name)
+
+    def _is_nullable(self, model, name):
+        try:
+            return model._meta.get_field(name).null
+        except FieldDoesNotExist:
+            return False
+
+    def _typed_position(self, model, position):
+        # The cursor comes from the client: each value must be valid for its column
+        typed = []
+        for name, value in zip(self._field_names(), position):
+            if isinstance(value, (dict, list)):
+                raise NotFound('Invalid cursor')
+            try:
+                field = model._meta.get_field(name)
+            except FieldDoesNotExist:
+                typed.append(value)
+                continue
+            if value is None:
+                typed.append(None)
+                continue
+            try:
+                value = field.to_python(value)
+                field.run_validators(value)
+            except (ValidationError, TypeError, ValueError):
+                raise NotFound('Invalid cursor')
+            typed.append(value)
+        return typed
+
+    def _seek_filter(self, model, position):
+        # Builds (a > x) OR (a = x AND (b > y OR (b = y AND ...))) from the last key up
+        condition = None
+        for name, value in reversed(list(zip(self.ordering, position))):
+            field = name.lstrip('-')
+            lookup = 'lt' if name.startswith('-') else 'gt'
+
+            if value is None:
+                after = Q(pk__in=[])
+                same = Q(**{f'{field}__isnull': True})
+            else:
+                after = Q(**{f'{field}__{lookup}': value})
+                if self._is_nullable(model, field):
+                    after |= Q(**{f'{field}__isnull': True})
+                same = Q(**{field: value})
+
+            condition = after if condition is None else after | (same & condition)
+        return condition
@@ -0,0 +1,192 @@
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+from django.http import JsonResponse
+
+from .cache import MODIFIED_KEY
+
+# Read replicas. Writes, and every read by default, go to the primary
+# ("default"). Views that can live with a moment of replication lag opt in:
+# public property lists/detail/search, and the dashboards (own listings and
+# interests), with @replica_reads / ReplicaReadMixin / use_replica(). Even
+# then a request stays on the primary when:
+#
+#   - the user wrote something in the last REPLICA_READ_YOUR_WRITES seconds
+#     (read-your-writes: a new listing shows up on the seller's dashboard)
+#   - for cached views, any listing changed in that window: cached
+#     responses are rebuilt right after a change, and must not be rebuilt
+#     from a replica that doesn't have it yet
+#   - the request has already written, or is inside a transaction
+#   - /health/ found every replica down
+#
+# Replicas come from DATABASE_REPLICA_URLS (see core/settings.py). Nothing
+# checks that they replicate; two SQLite files work as a local stand-in.
+
+RECENT_WRITE_KEY = 'api:db:recent-write:{user_id}'
+DOWN_KEY = 'api:db:down:{alias}'
+
+_state = ContextVar('api_db_routing', default=None)
+
+
+class RoutingState:
+    def __init__(self):
+        self.replica = None  # Alias reads go to, while a replica view runs
+        self.wrote = False
+
+
+def replicas():
+    return list(getattr(settings, 'DATABASE_REPLICAS', ()))
+
+
+def read_your_writes_window():
+    return getattr(settings, 'REPLICA_READ_YOUR_WRITES', 10)
+
+
+def pick_replica(user=None, cached=False):
+    """A healthy replica alias for this request's reads, or None for the primary. `cached`: the response will be cached."""
+    aliases = replicas()
+    if not aliases:
+        return None
+    user_key = RECENT_WRITE_KEY.format(user_id=user.pk) if user is not None and user.is_authenticated else None
+    down_keys = {alias: DOWN_KEY.format(alias=alias) for alias in aliases}
+    values = cache.get_many([*([MODIFIED_KEY] if cached else []), *([user_key] if user_key else []), *down_keys.values()])
+
+    modified = values.get(MODIFIED_KEY)
+    if modified is not None and time.time() - modified < read_your_writes_window():
+        return None
+    if user_key in values:
+        return None
+    healthy = [alias for alias, key in down_keys.items() if key not in values]
+    return random.choice(healthy) if healthy else None
+
+
+@contextmanager
+def use_replica(user=None, cached=False):
+    """Reads in the block go to a replica (if pick_replica allows); only works under ReplicaMiddleware."""
+    state = _state.get()
+    if state is None:
+        yield
+        return
+    previous, state.replica = state.replica, pick_replica(user, cached)
+    try:
+        yield
+    finally:
+        state.replica = previous
+
+
+def replica_reads(cached=False):
+    """Decorator for read-only function-based views (apply under @api_view and @cache_public_read)."""
+    def decorator(view):
+        @wraps(view)
+        def wrapped(request, *args, **kwargs):
+            with use_replica(request.user, cached):
+                return view(request, *args, **kwargs)
+        return wrapped
+    return decorator
+
+
+class ReplicaReadMixin:
+    """Sends a viewset's list/retrieve reads to a replica; writes go through untouched."""
+    replica_cached = False  # True when list/retrieve are cached (CachedReadMixin)
+
+    def list(self, request, *args, **kwargs):
+        with use_replica(request.user, self.replica_cached):
+            return super().list(request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        with use_replica(request.user, self.replica_cached):
+            return super().retrieve(request, *args, **kwargs)
+
+
+async def ause_replica(user=None, cached=False):
+    # For async views: picks the replica for the rest of the request
+    state = _state.get()
+    if state is not None:
+        state.replica = await sync_to_async(pick_replica)(user, cached)
+
+
+class PrimaryReplicaRouter:
+    """Django database router (DATABASE_ROUTERS) for the rules above."""
+
+    def db_for_read(self, model, **hints):
+        state = _state.get()
+        if state is None or state.replica is None or state.wrote:
+            return DEFAULT_DB_ALIAS
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS  # Reads in a transaction must see its writes
+        return state.replica
+
+    def db_for_write(self, model, **hints):
+        state = _state.get()
+        if state is not None:
+            state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True  # Replicas hold the same rows as the primary
+
+
+class ReplicaMiddleware:
+    """Gives each request its routing state, and remembers who just wrote (for read-your-writes)."""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        token = _state.set(RoutingState())
+        try:
+            response = self.get_response(request)
+            self.finish(request, _state.get())
+        finally:
+            _state.reset(token)
+        return response
+
+    async def __acall__(self, request):
+        token = _state.set(RoutingState())
+        try:
+            response = await self.get_response(request)
+            await sync_to_async(self.finish)(request, _state.get())
+        finally:
+            _state.reset(token)
+        return response
+
+    def finish(self, request, state):
+        # DRF sets request.user on the Django request too once it authenticates (JWT included)
+        user = getattr(request, 'user', None)
+        if state.wrote and replicas() and user is not None and user.is_authenticated:
+            cache.set(RECENT_WRITE_KEY.format(user_id=user.pk), True, read_your_writes_window())
+
+
+def health_view(request):
+    """
+    GET /health/: 200 if the primary answers, 503 if not. A replica that
+    doesn't answer is left out of reads for REPLICA_DOWN_SECONDS (point the
+    platform's health check here so that happens on its own).
+    """
+    status = {}
+    for alias in [DEFAULT_DB_ALIAS, *replicas()]:
+        try:
+            with connections[alias].cursor() as cursor:
+                cursor.execute('SELECT 1')
+            status[alias] = 'ok'
+            if alias != DEFAULT_DB_ALIAS:
+                cache.delete(DOWN_KEY.format(alias=alias))
+        except DatabaseError:
+            status[alias] = 'down'
+            if alias != DEFAULT_DB_ALIAS:
+                cache.set(DOWN_KEY.format(alias=alias), True, getattr(settings, 'REPLICA_DOWN_SECONDS', 30))
+    healthy = status[DEFAULT_DB_ALIAS] == 'ok'
+    return JsonResponse({'status': 'ok' if healthy else 'down', 'databases': status}, status=200 if healthy else 503)
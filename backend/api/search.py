@@ -0,0 +1,77 @@
+import re
+
+from django.contrib.postgres.search import SearchQuery, SearchRank, TrigramSimilarity
+from django.db import connections
+from django.db.models import Case, F, FloatField, Q, TextField, Value, When
+from django.db.models.functions import Greatest, Lower, Replace
+
+# Fields searched by the fallback path, with their rank weight
+FALLBACK_FIELDS = {'colony': 3.0, 'title': 2.0, 'location': 2.0, 'description': 1.0}
+
+
+def text_search(queryset, q):
+    """
+    Filter a Property queryset to rows matching the free-text query `q` and
+    annotate each row with a `rank` (higher is better).
+
+    PostgreSQL uses the GIN-indexed `search_vector` column plus trigram
+    similarity on colony/location/title, so misspellings still match.
+    Other databases (SQLite in tests) fall back to substring matching on
+    lowercased, space-stripped values.
+    """
+    if connections[queryset.db].vendor == 'postgresql':
+        return _postgres_search(queryset, q)
+    return _fallback_search(queryset, q)
+
+
+def _postgres_search(queryset, q):
+    query = SearchQuery(q, config='simple', search_type='websearch')
+    similarity = Greatest(
+        TrigramSimilarity('colony', q),
+        TrigramSimilarity('location', q),
+        TrigramSimilarity('title', q),
+    )
+    # `@@` (search_vector=query) and `%` (trigram_similar) both use GIN indexes.
+    # `%` matches above pg_trgm's similarity threshold (0.3 by default),
+    # which is enough for "Mdl Town" ~ "Model Town".
+    matches = (
+        Q(search_vector=query)
+        | Q(colony__trigram_similar=q)
+        | Q(location__trigram_similar=q)
+        | Q(title__trigram_similar=q)
+    )
+    return queryset.filter(matches).annotate(
+        rank=SearchRank(F('search_vector'), query) + similarity
+    )
+
+
+def _compact(expression):
+    # "Model Town" / "model-town" -> "modeltown"
+    lowered = Replace(Lower(expression), Value(' '), Value(''), output_field=TextField())
+    return Replace(lowered, Value('-'), Value(''), output_field=TextField())
+
+
+def _fallback_search(queryset, q):
+    compact = re.sub(r'[^0-9a-z]', '', q.lower())
+    terms = [term for term in q.split() if term]
+    if not compact:
+        return queryset.none()
+
+    annotations = {f'_compact_{name}': _compact(name) for name in FALLBACK_FIELDS}
+    queryset = queryset.annotate(**annotations)
+
+    matches = Q()
+    rank = Value(0.0, output_field=FloatField())
+    for name, weight in FALLBACK_FIELDS.items():
+        field_match = Q(**{f'_compact_{name}__contains': compact})
+        for term in terms:
+            field_match |= Q(**{f'{name}__icontains': term})
+        matches |= field_match
+        rank = rank + Case(
+            When(Q(**{f'_compact_{name}__contains': compact}), then=Value(weight)),
+            When(field_match, then=Value(weight / 2)),
+            default=Value(0.0),
+            output_field=FloatField(),
+        )
+
+    return queryset.filter(matches).annotate(rank=rank)
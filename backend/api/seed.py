@@ -0,0 +1,119 @@
+import random
+from datetime import timedelta
+from io import BytesIO
+
+from django.contrib.auth.models import User
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.utils import timezone
+from PIL import Image
+
+from .counters import rebuild_lead_counters
+from .models import Profile, Property, PropertyImage, Lead, Contact
+
+COLONIES = ['Model Town', 'Green Avenue', 'Ajit Nagar', 'Bhai Randhir Singh Nagar', 'Sunami Gate', 'Dhuri Road']
+LOCATIONS = ['Sangrur', 'Dhuri', 'Sunam', 'Malerkotla', 'Bhawanigarh']
+TYPES = ['House', 'Plot', 'Commercial']
+STATUSES = ['Available', 'Available', 'Available', 'Sold', 'Rented']
+PRICES = ['25 Lakh', '40 Lakh', '55 Lakh', '80 Lakh', '1.2 Cr', '2.5 Cr']
+AREAS = ['100 gaj', '150 gaj', '200 gaj', '10 Marla', '1 kanal', '2 kanal']
+DESCRIPTIONS = [
+    'Corner plot near the main market, east facing.',
+    'Newly built house with modular kitchen and car parking.',
+    'Shop on the main road, suitable for showroom or office.',
+    'Gated colony, 24 hour water supply, close to schools.',
+    '',
+]
+SEED_IMAGE_NAME = 'property_images/seed/placeholder.jpg'
+
+
+def zipf_weights(n, skew):
+    """Weight for rank i is 1/i^skew, so a handful of items get most of the picks."""
+    return [1 / (rank ** skew) for rank in range(1, n + 1)]
+
+
+def _placeholder_image():
+    # Every seeded image row points at one small file instead of writing
+    # thousands; same bytes, so the content-addressed name is the same too
+    buffer = BytesIO()
+    Image.new('RGB', (64, 48), (200, 180, 150)).save(buffer, format='JPEG')
+    return default_storage.save(SEED_IMAGE_NAME, ContentFile(buffer.getvalue()))
+
+
+def seed_dataset(properties=1000, leads=5000, users=100, contacts=0, images_per_property=0,
+                 skew=1.1, rng=None, batch_size=1000):
+    """
+    Insert a synthetic dataset with bulk INSERTs and return the users created.
+
+    Listings and leads are Zipf-distributed (see `skew`): the first few users
+    own most of the listings and the first few listings get most of the leads,
+    so busy sellers end up with thousands of leads like on the live site.
+    skew=0 spreads everything evenly. Meant for query-plan audits and
+    benchmarks, never for production data.
+    """
+    rng = rng or random.Random(42)
+    now = timezone.now()
+    tag = f'seed{now.timestamp():.0f}'
+
+    created_users = User.objects.bulk_create([
+        User(username=f'{tag}-{i}@example.com', email=f'{tag}-{i}@example.com') for i in range(users)
+    ], batch_size=batch_size)
+    # bulk_create skips the post_save signal that normally creates the profile
+    Profile.objects.bulk_create([
+        Profile(user=user, full_name=f'Seed User {i}', phone=f'97{i:08d}') for i, user in enumerate(created_users)
+    ], batch_size=batch_size)
+
+    owners = rng.choices(created_users, weights=zipf_weights(users, skew), k=properties)
+    listings = []
+    for owner in owners:
+        prop = Property(
+            owner=owner,
+            title=f'{rng.choice(TYPES)} in {rng.choice(COLONIES)}',
+            price=rng.choice(PRICES), area=rng.choice(AREAS),
+            location=rng.choice(LOCATIONS), colony=rng.choice(COLONIES),
+            type=rng.choice(TYPES), status=rng.choice(STATUSES),
+            beds=rng.randint(0, 5), baths=rng.randint(0, 4),
+            description=rng.choice(DESCRIPTIONS),
+        )
+        prop.refresh_numeric_fields()
+        listings.append(prop)
+    listings = Property.objects.bulk_create(listings, batch_size=batch_size)
+
+    if images_per_property and listings:
+        name = _placeholder_image()
+        PropertyImage.objects.bulk_create([
+            PropertyImage(property=prop, image=name, card_image=name, detail_image=name, full_image=name)
+            for prop in listings for _ in range(images_per_property)
+        ], batch_size=batch_size)
+
+    # Popular listings belong to popular owners, which is what skews leads per seller
+    rank = {user.id: i for i, user in enumerate(created_users)}
+    by_owner_rank = sorted(listings, key=lambda prop: rank[prop.owner_id])
+    targets = rng.choices(by_owner_rank, weights=zipf_weights(len(by_owner_rank), skew), k=leads) if listings else []
+    created_leads = Lead.objects.bulk_create([
+        Lead(
+            property=prop, seller=prop.owner, buyer=rng.choice(created_users),
+            buyer_name='Seed Buyer', buyer_phone=f'98{rng.randint(10_000_000, 99_999_999)}',
+        )
+        for prop in targets
+    ], batch_size=batch_size)
+
+    Contact.objects.bulk_create([
+        Contact(name=f'Visitor {i}', email=f'{tag}-visitor{i}@example.com',
+                subject='Enquiry', message='Looking for a house near the bus stand.')
+        for i in range(contacts)
+    ], batch_size=batch_size)
+
+    # auto_now_add stamps every row with "now"; spread them over the past year
+    for obj in listings:
+        # Last edited when posted (bulk_update doesn't apply auto_now)
+        obj.created_at = obj.updated_at = now - timedelta(minutes=rng.randint(0, 525_600))
+    Property.objects.bulk_update(listings, ['created_at', 'updated_at'], batch_size=batch_size)
+    for obj in created_leads:
+        obj.created_at = now - timedelta(minutes=rng.randint(0, 525_600))
+    Lead.objects.bulk_update(created_leads, ['created_at'], batch_size=batch_size)
+
+    # bulk_create skipped the signals that keep the lead counters in step
+    rebuild_lead_counters()
+    return created_users
+
@@ -1,22 +1,63 @@
 from rest_framework import serializers
 from django.contrib.auth.models import User
 from .models import Property, Lead, Profile, Contact, PropertyImage
+from .jobs import enqueue
+from .metrics import timer
+from .uploads import attach_uploads, checked_photo
+from django.db import transaction
+
+class TimedListSerializer(serializers.ListSerializer):
+    # many=True lists count toward the request's serializer time (api/metrics.py)
+    def to_representation(self, data):
+        with timer('serialize'):
+            return super().to_representation(data)
+
 
 class PropertyImageSerializer(serializers.ModelSerializer):
+    # Resized WebP URLs; fall back to the original until the variants exist
+    card = serializers.SerializerMethodField()
+    detail = serializers.SerializerMethodField()
+    full = serializers.SerializerMethodField()
+
     class Meta:
         model = PropertyImage
-        fields = ['id', 'image']
+        fields = ['id', 'image', 'card', 'detail', 'full']
+
+    def _variant_url(self, obj, field_name):
+        variant = getattr(obj, field_name)
+        url = variant.url if variant else obj.image.url
+        request = self.context.get('request')
+        return request.build_absolute_uri(url) if request else url
+
+    def get_card(self, obj):
+        return self._variant_url(obj, 'card_image')
+
+    def get_detail(self, obj):
+        return self._variant_url(obj, 'detail_image')
+
+    def get_full(self, obj):
+        return self._variant_url(obj, 'full_image')
     
+# What a property card shows; list endpoints send only these unless the
+# client asks for more (see sparse_property_fields)
+PROPERTY_CARD_FIELDS = (
+    'id', 'title', 'price', 'location', 'colony', 'type', 'area', 'beds', 'baths', 'status', 'created_at',
+    'price_value', 'area_sqft', 'price_per_sqft', 'cover_image',
+)
+
 class PropertySerializer(serializers.ModelSerializer):
     # --- READ: Show nested images and owner name ---
     images = PropertyImageSerializer(many=True, read_only=True)
     submitted_by = serializers.SerializerMethodField()
+    cover_image = serializers.SerializerMethodField() # First image, card-sized
     
     # --- WRITE: Accept file uploads ---
     uploaded_images = serializers.ListField(
         child=serializers.ImageField(max_length=1000000, allow_empty_file=False, use_url=False),
-        write_only=True
+        write_only=True, required=False
     )
+    # Photos already sent through the chunked upload API (api/uploads.py)
+    upload_ids = serializers.ListField(child=serializers.CharField(), write_only=True, required=False)
 
     class Meta:
         model = Property
@@ -25,10 +66,30 @@ class PropertySerializer(serializers.ModelSerializer):
             'beds', 'baths', 'status', 'description', 
             'submitted_by',  # <--- Field we fixed
             'created_at', 
+            'price_value', 'area_sqft', 'price_per_sqft', # Parsed from price/area
             'images',        # <--- Field that shows photos
-            'uploaded_images' # <--- Field for uploading
+            'cover_image',
+            'uploaded_images', # <--- Field for uploading
+            'upload_ids',
         ]
-        read_only_fields = ['submitted_by', 'created_at']
+        read_only_fields = ['submitted_by', 'created_at', 'price_value', 'area_sqft', 'price_per_sqft']
+        list_serializer_class = TimedListSerializer
+
+    def __init__(self, *args, fields=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            # Sparse fieldset: unused fields are dropped before any row is serialized
+            for name in set(self.fields) - set(fields) - {'uploaded_images', 'upload_ids'}:
+                self.fields.pop(name)
+
+    def get_cover_image(self, obj):
+        # .all() reuses the prefetched images
+        images = obj.images.all()
+        if not images:
+            return None
+        url = (images[0].card_image or images[0].image).url
+        request = self.context.get('request')
+        return request.build_absolute_uri(url) if request else url
 
     # --- LOGIC for Owner Name ---
     def get_submitted_by(self, obj):
@@ -36,25 +97,60 @@ class PropertySerializer(serializers.ModelSerializer):
             return obj.owner.first_name if obj.owner.first_name else obj.owner.username
         return "Sangrur Estate"
 
+    def validate_uploaded_images(self, value):
+        # Stored under the type found in the bytes, not the client's file name
+        return [checked_photo(image) for image in value]
+
     # --- LOGIC for Saving Property + Images ---
     def create(self, validated_data):
         # 1. Pop images
-        uploaded_images = validated_data.pop('uploaded_images')
+        uploaded_images = validated_data.pop('uploaded_images', [])
+        upload_ids = validated_data.pop('upload_ids', [])
         
         # 2. Get the user from context (passed by the View)
         request = self.context.get('request')
         if request and hasattr(request, 'user'):
             validated_data['owner'] = request.user
 
-        # 3. Create Property
-        property = Property.objects.create(**validated_data)
-        
-        # 4. Create Images
-        for image in uploaded_images:
-            PropertyImage.objects.create(property=property, image=image)
-            
+        # 3. Create Property (with its images, or not at all)
+        with transaction.atomic():
+            property = Property.objects.create(**validated_data)
+
+            # 4. Create Images; resizing happens in the background worker
+            for image in uploaded_images:
+                property_image = PropertyImage.objects.create(property=property, image=image)
+                enqueue('process_property_image', image_id=property_image.id)
+            for property_image in attach_uploads(property, validated_data.get('owner'), upload_ids):
+                enqueue('process_property_image', image_id=property_image.id)
+
         return property
     
+def sparse_property_fields(params, default=None):
+    """
+    Fields to serialize for ?fields=a,b and ?expand=images, or `default`
+    (None = every field). Unknown names are a 400, not silently ignored.
+    """
+    readable = [name for name in PropertySerializer.Meta.fields if name not in ('uploaded_images', 'upload_ids')]
+    requested = [name.strip() for name in (params.get('fields') or '').split(',') if name.strip()]
+    expand = [name.strip() for name in (params.get('expand') or '').split(',') if name.strip()]
+    unknown = [name for name in requested if name not in readable] + [name for name in expand if name != 'images']
+    if unknown:
+        raise serializers.ValidationError({'fields': f"Unknown field(s): {', '.join(unknown)}"})
+
+    if requested:
+        fields = {'id', *requested}
+    elif default is not None:
+        fields = set(default)
+    else:
+        return None
+    return fields | set(expand)
+
+class PropertyImportSerializer(serializers.ModelSerializer):
+    # Same field rules as PropertySerializer; images come from the import file instead
+    class Meta:
+        model = Property
+        fields = ['title', 'price', 'location', 'colony', 'type', 'area', 'beds', 'baths', 'description']
+
 class ContactSerializer(serializers.ModelSerializer):
     class Meta:
         model = Contact
@@ -108,19 +204,24 @@ class LeadSerializer(serializers.ModelSerializer):
     class Meta:
         model = Lead
         fields = '__all__'
+        # Set by the server from the listing and the logged-in user, never by the client
+        read_only_fields = ['seller', 'buyer']
+        list_serializer_class = TimedListSerializer
 
 class DashboardPropertySerializer(serializers.ModelSerializer):
     image = serializers.SerializerMethodField()
-    leads_count = serializers.IntegerField(read_only=True) # Calculated field
 
     class Meta:
         model = Property
-        fields = ['id', 'title', 'price', 'location', 'status', 'image', 'leads_count', 'created_at']
+        fields = ['id', 'title', 'price', 'location', 'status', 'image', 'leads_count', 'new_leads_count', 'created_at']
+        list_serializer_class = TimedListSerializer
 
     def get_image(self, obj):
-        first_image = obj.images.first()
-        if first_image:
-            return first_image.image.url
+        # .all() reuses the prefetched images; .first() would run a query per row
+        images = obj.images.all()
+        if images:
+            # The small card variant, not the multi-megabyte original
+            return (images[0].card_image or images[0].image).url
         return None
 
 # Update the MyInterestSerializer to use the new 'buyer' field filter
@@ -133,4 +234,5 @@ class MyInterestSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Lead
-        fields = ['id', 'property_id', 'property_title', 'property_location', 'property_price', 'date_contacted']
\ No newline at end of file
+        fields = ['id', 'property_id', 'property_title', 'property_location', 'property_price', 'date_contacted']
+        list_serializer_class = TimedListSerializer
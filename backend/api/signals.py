@@ -0,0 +1,69 @@
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .authentication import invalidate_cached_user
+from .cache import invalidate_properties
+from .counters import apply_lead_change
+from .models import Profile, Property, PropertyImage, Lead, Tombstone
+
+
+@receiver(post_save, sender=Property)
+@receiver(post_delete, sender=Property)
+@receiver(post_save, sender=PropertyImage)
+@receiver(post_delete, sender=PropertyImage)
+def invalidate_property_cache(sender, **kwargs):
+    # Wait for the commit so no request can re-cache the old rows in between
+    transaction.on_commit(invalidate_properties)
+
+
+@receiver(post_save, sender=PropertyImage)
+@receiver(post_delete, sender=PropertyImage)
+def touch_property(sender, instance, **kwargs):
+    # A new, resized or removed photo changes the listing's cover/images, so it must sync again
+    Property.objects.filter(pk=instance.property_id).update(updated_at=timezone.now())
+
+
+@receiver(post_delete, sender=Property)
+def record_deleted_property(sender, instance, **kwargs):
+    Tombstone.objects.create(kind=Tombstone.PROPERTY, object_id=instance.pk)
+
+
+@receiver(post_delete, sender=PropertyImage)
+def record_deleted_image(sender, instance, **kwargs):
+    Tombstone.objects.create(kind=Tombstone.IMAGE, object_id=instance.pk, parent_id=instance.property_id)
+
+
+@receiver(pre_save, sender=Lead)
+def remember_lead_state(sender, instance, **kwargs):
+    # Instances built by hand (not loaded from the db) have no snapshot yet
+    if instance.pk and not hasattr(instance, '_counted_state'):
+        old = Lead.objects.filter(pk=instance.pk).first()
+        instance._counted_state = old.counter_state() if old else None
+
+
+@receiver(post_save, sender=Lead)
+def update_lead_counters(sender, instance, created, **kwargs):
+    new = instance.counter_state()
+    apply_lead_change(None if created else getattr(instance, '_counted_state', None), new)
+    instance._counted_state = new
+
+
+@receiver(post_delete, sender=Lead)
+def remove_lead_from_counters(sender, instance, **kwargs):
+    apply_lead_change(getattr(instance, '_counted_state', instance.counter_state()), None)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_user_cache(sender, instance, **kwargs):
+    # Covers deactivation and password changes (set_password + save)
+    transaction.on_commit(lambda: invalidate_cached_user(instance.pk))
+
+
+@receiver(post_save, sender=Profile)
+@receiver(post_delete, sender=Profile)
+def invalidate_profile_cache(sender, instance, **kwargs):
+    transaction.on_commit(lambda: invalidate_cached_user(instance.user_id))
@@ -0,0 +1,61 @@
+import hashlib
+import os
+import posixpath
+import re
+
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
+
+# Content-addressed names look like property_images/3f/3fa9...c1.jpg: the
+# directory from upload_to, the first two hex digits as a fan-out directory,
+# then the SHA-256 of the bytes (no extension if they aren't an image).
+CONTENT_ADDRESSED_NAME = re.compile(r'(?:^|/)(?P<prefix>[0-9a-f]{2})/(?P<digest>[0-9a-f]{64})(?:\.[A-Za-z0-9]+)?$')
+
+
+def content_digest(name):
+    """The SHA-256 a content-addressed file name carries, or None for other names."""
+    match = CONTENT_ADDRESSED_NAME.search(name)
+    if match and match['digest'].startswith(match['prefix']):
+        return match['digest']
+    return None
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    FileSystemStorage that names every saved file after the SHA-256 of its
+    content, with the extension of the image type found in it (none if it
+    isn't an image). The same photo uploaded twice is stored once, and a URL never
+    changes meaning, so it can be cached forever (see api/media.py).
+
+    Files can be shared by several rows, so nothing deletes them when a row
+    goes away; `manage.py gc_media` removes the ones nothing points at.
+    """
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if not hasattr(content, 'chunks'):
+            content = File(content, name)
+
+        # Imported here: settings load this module before the models are ready
+        from .uploads import checked_image_extension
+
+        sha = hashlib.sha256()
+        for chunk in content.chunks():
+            sha.update(chunk)
+        content.seek(0)
+        digest = sha.hexdigest()
+        # The extension comes from the bytes, never from the client's file
+        # name: media is served from the site's own origin (api/media.py)
+        extension = checked_image_extension(content) or ''
+        content.seek(0)
+
+        directory = posixpath.dirname(str(name).replace('\\', '/'))
+        name = posixpath.join(directory, digest[:2], digest + extension)
+        if self.exists(name):
+            # Counts as new for `gc_media --min-age`: an old orphan that is uploaded
+            # again must not be deleted while the row that now uses it commits
+            os.utime(self.path(name))
+            return name
+        # Two uploads of the same new file racing here just leave one renamed copy
+        return super().save(name, content, max_length)
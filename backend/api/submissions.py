@@ -0,0 +1,192 @@
+import hashlib
+import re
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+from .models import Contact, Lead
+
+# Protection for the public write endpoints (submit_lead, LeadViewSet.create,
+# ContactViewSet.create). Both layers run on the shared cache (Redis in
+# production), so every worker sees the same state:
+#
+#   - Token-bucket throttles per client IP and per phone number. They run
+#     before the view, so a flood is turned away with a cache read and no SQL.
+#   - Duplicate detection: a repeated Idempotency-Key header, or the same
+#     phone asking about the same property within LEAD_DUPLICATE_WINDOW,
+#     gets the lead that already exists instead of a new INSERT.
+
+PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+# How long a claimed key blocks a concurrent twin while the first request writes
+PENDING = 'pending'
+PENDING_TIMEOUT = 30
+
+
+class SubmissionInProgress(Exception):
+    """The same submission is being written by another request right now."""
+
+
+def parse_rate(rate):
+    # '30/hour' -> (30, 3600), the format DRF's own throttles use
+    count, period = rate.split('/')
+    return int(count), PERIODS[period[0]]
+
+
+def _digest(value):
+    # Keeps phone numbers and emails out of cache keys
+    return hashlib.sha256(value.encode()).hexdigest()[:32]
+
+
+def normalize_phone(phone):
+    # '+91 98000-00000' and '9800000000' are the same number
+    return re.sub(r'\D', '', str(phone or ''))[-10:]
+
+
+def _field(request, name):
+    data = request.data
+    return data.get(name) if hasattr(data, 'get') else None
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """
+    A bucket of N tokens per key that refills at N per period, with the rate
+    written the DRF way in DEFAULT_THROTTLE_RATES[scope] ('30/hour'). Allows
+    a burst of N, then a steady trickle. Safe methods are never counted.
+    """
+    scope = None
+
+    def get_ident_key(self, request):
+        raise NotImplementedError
+
+    def allow_request(self, request, view):
+        rate = api_settings.DEFAULT_THROTTLE_RATES.get(self.scope)
+        if request.method in SAFE_METHODS or not rate:
+            return True
+        ident = self.get_ident_key(request)
+        if not ident:
+            return True
+        capacity, period = parse_rate(rate)
+        key = f'api:throttle:{self.scope}:{_digest(ident)}'
+
+        # Not atomic across workers: a burst split between them can slip a
+        # request or two past the limit, which is fine for flood control
+        now = time.time()
+        tokens, updated = cache.get(key) or (capacity, now)
+        tokens = min(capacity, tokens + (now - updated) * capacity / period)
+        if tokens < 1:
+            # Rejections don't write, so each one costs a single cache read
+            self.retry_after = (1 - tokens) * period / capacity
+            return False
+        cache.set(key, (tokens - 1, now), period)
+        return True
+
+    def wait(self):
+        return getattr(self, 'retry_after', None)
+
+
+class LeadIPThrottle(TokenBucketThrottle):
+    scope = 'lead_ip'
+
+    def get_ident_key(self, request):
+        return self.get_ident(request)
+
+
+class LeadPhoneThrottle(TokenBucketThrottle):
+    scope = 'lead_phone'
+
+    def get_ident_key(self, request):
+        return normalize_phone(_field(request, 'buyer_phone'))
+
+
+class ContactIPThrottle(LeadIPThrottle):
+    scope = 'contact_ip'
+
+
+LEAD_THROTTLES = [LeadIPThrottle, LeadPhoneThrottle]
+CONTACT_THROTTLES = [ContactIPThrottle]
+
+
+def duplicate_window():
+    return timedelta(seconds=getattr(settings, 'LEAD_DUPLICATE_WINDOW', 600))
+
+
+def idempotency_key(request, scope):
+    key = (request.headers.get('Idempotency-Key') or '').strip()
+    if not key:
+        return None
+    # Scoped to the caller, so nobody can fetch someone else's lead by guessing their key
+    caller = f'user:{request.user.pk}' if request.user.is_authenticated else f'ip:{BaseThrottle().get_ident(request)}'
+    return f'api:idempotency:{scope}:{_digest(f"{caller}:{key[:200]}")}'
+
+
+def submit_once(model, keys, create, find_recent=None):
+    """
+    Run create() unless a cache key in `keys` ({key: timeout}) already points
+    at a row of `model`, or find_recent() returns one. Returns (row, created).
+    A twin that arrives while the first request is still writing gets
+    SubmissionInProgress instead of waiting on it.
+    """
+    keys = {key: timeout for key, timeout in keys.items() if key}
+    stale = []
+    for key, pk in cache.get_many(list(keys)).items():
+        if pk == PENDING:
+            raise SubmissionInProgress()
+        row = model.objects.filter(pk=pk).first()
+        if row is not None:
+            return row, False
+        stale.append(key)  # The row was deleted (or its transaction rolled back)
+    cache.delete_many(stale)
+
+    row = find_recent() if find_recent else None
+    if row is not None:
+        cache.set_many({key: row.pk for key in keys}, min(keys.values(), default=None))
+        return row, False
+
+    claimed = [key for key in keys if cache.add(key, PENDING, PENDING_TIMEOUT)]
+    if len(claimed) < len(keys):
+        cache.delete_many(claimed)
+        raise SubmissionInProgress()
+    try:
+        row = create()
+    except BaseException:
+        cache.delete_many(claimed)
+        raise
+    for key, timeout in keys.items():
+        cache.set(key, row.pk, timeout)
+    return row, True
+
+
+def submit_lead_once(request, property_id, phone, create):
+    """submit_once for a lead: same Idempotency-Key, or same phone and property within the window."""
+    window = duplicate_window()
+    keys = {idempotency_key(request, 'lead'): getattr(settings, 'IDEMPOTENCY_KEY_TIMEOUT', 86400)}
+    find_recent = None
+    if property_id and normalize_phone(phone):
+        keys[f'api:duplicate:lead:{_digest(f"{property_id}:{normalize_phone(phone)}")}'] = window.total_seconds()
+        # The cache can be cold (restart, eviction); the buyer_phone index answers then
+        find_recent = lambda: (
+            Lead.objects.filter(buyer_phone=phone, property_id=property_id, created_at__gte=timezone.now() - window)
+            .order_by('-created_at').first()
+        )
+    return submit_once(Lead, keys, create, find_recent)
+
+
+def submit_contact_once(request, data, create):
+    """submit_once for a contact message: same Idempotency-Key, or the same message from the same email."""
+    window = duplicate_window()
+    email, subject, message = (str(data.get(name) or '') for name in ('email', 'subject', 'message'))
+    keys = {
+        idempotency_key(request, 'contact'): getattr(settings, 'IDEMPOTENCY_KEY_TIMEOUT', 86400),
+        f'api:duplicate:contact:{_digest(f"{email.lower()}:{subject}:{message}")}': window.total_seconds(),
+    }
+    find_recent = lambda: (
+        Contact.objects.filter(email=email, subject=subject, message=message, created_at__gte=timezone.now() - window)
+        .order_by('-created_at').first()
+    )
+    return submit_once(Contact, keys, create, find_recent)
@@ -0,0 +1,114 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import APIException, NotFound
+
+from .fast import property_rows
+from .models import Property, Tombstone
+from .pagination import KeysetPagination
+from .serializers import PropertySerializer
+
+# Delta sync for clients that keep listings in a local cache:
+#
+#   GET /api/properties/changes/             everything (a full sync)
+#   GET /api/properties/changes/?since=<t>   only what changed after token t
+#
+# -> {"changed": [cards created or updated], "deleted": {"properties": [ids], "images": [ids]},
+#     "sync_token": "...", "has_more": bool}
+#
+# Keep calling with the returned sync_token while has_more is true. The
+# token holds a keyset position in (updated_at, id) order plus how far the
+# tombstone log has been read. Rows younger than SYNC_SAFETY_LAG seconds are
+# left for the next sync: a transaction still open could commit a row with
+# an older updated_at than one already sent. Tombstones are kept
+# SYNC_TOMBSTONE_DAYS; a token older than that gets a 410 and the client
+# starts over with a full sync.
+
+
+class SyncTokenExpired(APIException):
+    status_code = 410
+    default_detail = 'This sync token is too old; do a full sync (call without "since").'
+    default_code = 'sync_token_expired'
+
+
+def tombstone_retention():
+    return timedelta(days=getattr(settings, 'SYNC_TOMBSTONE_DAYS', 30))
+
+
+def _parse_time(value):
+    parsed = parse_datetime(value) if isinstance(value, str) else None
+    if parsed is None:
+        raise NotFound('Invalid sync token')
+    return parsed
+
+
+class SyncPagination(KeysetPagination):
+    page_size = 200
+    max_page_size = 1000
+    cursor_query_param = 'since'
+    ordering = ('updated_at', 'id')
+
+    def decode_cursor(self, request):
+        # [updated_at, id, tombstones read up to]; the paginator only needs the position
+        values = self.decode_values(request.query_params.get(self.cursor_query_param))
+        if values is None:
+            self.deleted_after = None
+            return None
+        if len(values) != 3:
+            raise NotFound('Invalid sync token')
+        _parse_time(values[0])
+        if type(values[1]) is not int:  # Not a bool either
+            raise NotFound('Invalid sync token')
+        self.deleted_after = _parse_time(values[2])
+        return values[:2]
+
+
+def property_changes(request, fields):
+    """The body of /api/properties/changes/ for the card fields in `fields`."""
+    now = timezone.now()
+    horizon = now - timedelta(seconds=getattr(settings, 'SYNC_SAFETY_LAG', 5))
+    paginator = SyncPagination()
+    position = paginator.decode_cursor(request)
+    deleted_after = paginator.deleted_after
+    if deleted_after is not None and deleted_after < now - tombstone_retention():
+        raise SyncTokenExpired()
+
+    properties = Property.objects.filter(updated_at__lte=horizon).with_card_data(fields)
+    if 'images' in fields:
+        page = paginator.paginate_queryset(properties, request)
+        changed = PropertySerializer(page, many=True, fields=fields).data
+        positions = [[row.updated_at, row.id] for row in page]
+    else:
+        changed = paginator.paginate_rows(properties, request, lambda rows, keys: property_rows(rows, fields, keys))
+        positions = paginator.positions[:len(changed)]
+
+    if paginator.has_next:
+        end = positions[-1]
+    elif position is None or _parse_time(position[0]) < horizon:
+        # Caught up: the next sync starts at the horizon
+        end = [horizon, 0]
+    else:
+        end = position
+
+    # A full sync has nothing to delete; after that, whatever was deleted since the last call
+    deleted = {'properties': [], 'images': []}
+    if deleted_after is not None and deleted_after < horizon:
+        tombstones = Tombstone.objects.filter(deleted_at__gt=deleted_after, deleted_at__lte=horizon)
+        for kind, object_id in tombstones.order_by('deleted_at', 'id').values_list('kind', 'object_id'):
+            deleted['properties' if kind == Tombstone.PROPERTY else 'images'].append(object_id)
+
+    return {
+        'changed': changed,
+        'deleted': deleted,
+        'sync_token': paginator.encode_cursor([*end, max(deleted_after or horizon, horizon)]),
+        'has_more': paginator.has_next,
+    }
+
+
+def prune_tombstones(older_than=None):
+    """Delete tombstones no valid sync token can ask for any more; returns how many."""
+    cutoff = timezone.now() - (older_than or tombstone_retention())
+    deleted, _ = Tombstone.objects.filter(deleted_at__lt=cutoff).delete()
+    return deleted
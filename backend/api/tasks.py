@@ -0,0 +1,33 @@
+from django.conf import settings
+from django.core.mail import send_mail
+
+from .images import generate_variants
+from .jobs import task
+from .models import PropertyImage, Lead
+
+
+@task('process_property_image', queue='images', max_attempts=3)
+def process_property_image(image_id):
+    property_image = PropertyImage.objects.filter(id=image_id).first()
+    if property_image is None:
+        return  # Deleted before the worker got to it
+    generate_variants(property_image)
+
+
+@task('notify_seller_of_lead', queue='notifications', max_attempts=5)
+def notify_seller_of_lead(lead_id):
+    lead = Lead.objects.select_related('property__owner', 'seller').filter(id=lead_id).first()
+    if lead is None or lead.property is None:
+        return
+    seller = lead.seller or lead.property.owner
+    if not seller.email:
+        return
+    send_mail(
+        subject=f"New enquiry for {lead.property.title}",
+        message=(
+            f"{lead.buyer_name} ({lead.buyer_phone}) is interested in your listing "
+            f"\"{lead.property.title}\".\n\nLog in to your dashboard to see all enquiries."
+        ),
+        from_email=settings.DEFAULT_FROM_EMAIL,
+        recipient_list=[seller.email],
+    )
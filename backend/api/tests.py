@@ -1,3 +1,1432 @@
-from django.test import TestCase
+import csv
+import hashlib
+import io
+import json
+import os
+import re
+import shutil
+import time
+import uuid
+import zipfile
+from datetime import datetime, timedelta
+from io import BytesIO
+from urllib.parse import urlsplit
 
-# Create your tests here.
+from PIL import Image
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core import mail
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.db import connection
+from django.db.models import Count
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLResolver, get_resolver, resolve
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient, APIRequestFactory
+from rest_framework_simplejwt.tokens import AccessToken
+
+from .models import Profile, Property, PropertyImage, Lead, LeadDailyStat, Job, Upload, Contact, Tombstone
+from .units import parse_price, parse_area
+from .images import VARIANTS
+from .importer import _iter_json_array, import_file
+from .jobs import claim_job, enqueue, release_stale_jobs, run_pending_jobs, task
+from .serializers import PROPERTY_CARD_FIELDS, PropertySerializer, LeadSerializer, MyInterestSerializer
+from .fast import FastJSONRenderer, property_rows, values_rows
+from .seed import seed_dataset
+from .storage import content_digest
+from .counters import rebuild_lead_counters
+from .benchmark import ENDPOINTS, percentile, run_benchmark
+from .pagination import KeysetPagination
+from .sync import SyncPagination
+from .cache import GENERATION_KEY, MODIFIED_KEY
+from .replicas import DOWN_KEY, RECENT_WRITE_KEY, PrimaryReplicaRouter, RoutingState, _state, use_replica
+from .views import submit_lead
+
+# 1x1 transparent GIF, enough for ImageField validation
+TINY_GIF = (
+    b'GIF89a\x01\x00\x01\x00\x80\x00\x00\x00\x00\x00\xff\xff\xff!\xf9\x04\x01\x00'
+    b'\x00\x00\x00,\x00\x00\x00\x00\x01\x00\x01\x00\x00\x02\x02D\x01\x00;'
+)
+
+
+def make_user(email, name=''):
+    return User.objects.create_user(username=email, email=email, password='pass12345', first_name=name)
+
+
+def make_property(owner, images=1, **fields):
+    data = {
+        'title': 'House in Model Town', 'price': '50 Lakh', 'location': 'Sangrur',
+        'colony': 'Model Town', 'type': 'House', 'area': '200 gaj', 'beds': 3, 'baths': 2,
+    }
+    data.update(fields)
+    prop = Property.objects.create(owner=owner, **data)
+    for i in range(images):
+        PropertyImage.objects.create(
+            property=prop, image=SimpleUploadedFile(f'p{prop.id}_{i}.gif', TINY_GIF, content_type='image/gif')
+        )
+    return prop
+
+
+def make_lead(prop, buyer=None, **fields):
+    data = {'buyer_name': 'Buyer', 'buyer_phone': '9800000000'}
+    data.update(fields)
+    return Lead.objects.create(property=prop, buyer=buyer, seller=prop.owner, **data)
+
+
+@override_settings(MEDIA_ROOT='/tmp/sangrurestate-test-media')
+class ApiTestCase(TestCase):
+    def setUp(self):
+        # Cached responses would otherwise leak between tests
+        cache.clear()
+
+
+class QueryBudgetTests(ApiTestCase):
+    """
+    Pins the number of SQL queries per endpoint. Each endpoint is hit with a
+    small dataset and again after more rows are added; the count must match
+    the budget both times, so an N+1 shows up as a failure.
+    """
+    # (url, max queries, user to authenticate as)
+    BUDGETS = [
+        ('/api/properties/', 2, None),
+        ('/api/properties/search/', 2, None),
+        ('/api/properties/{property_id}/', 2, None),
+        ('/api/properties/my-listings/', 2, 'seller'),
+        ('/api/leads/my-interests/', 1, 'buyer'),
+        ('/api/seller/leads/', 1, 'seller'),
+        ('/api/leads/', 1, None),
+        ('/api/profile/', 0, 'seller'),
+        ('/api/users/me/', 1, 'seller'),
+        ('/api/dashboard/', 3, 'seller'),
+    ]
+
+    def setUp(self):
+        super().setUp()
+        self.seller = make_user('seller@example.com', 'Seller')
+        self.buyer = make_user('buyer@example.com', 'Buyer')
+        self.property = make_property(self.seller, images=2)
+        self.add_rows(2)
+
+    def add_rows(self, count):
+        for _ in range(count):
+            owner = make_user(f'owner{User.objects.count()}@example.com')
+            prop = make_property(owner, images=3)
+            make_lead(prop, buyer=self.buyer)
+            seller_prop = make_property(self.seller, images=2)
+            make_lead(seller_prop, buyer=self.buyer)
+
+    def assert_budget(self, url, budget, user):
+        url = url.format(property_id=self.property.id)
+        client = APIClient()
+        if user:
+            # The budget covers the view itself, not loading the user for the token.
+            # A fresh instance matches what authentication hands the view.
+            client.force_authenticate(User.objects.get(pk=getattr(self, user).pk))
+        with self.assertNumQueries(budget):
+            response = client.get(url)
+        self.assertEqual(response.status_code, 200, url)
+
+    def test_endpoints_stay_within_budget(self):
+        for url, budget, user in self.BUDGETS:
+            with self.subTest(url=url):
+                self.assert_budget(url, budget, user)
+
+    def test_budget_does_not_grow_with_rows(self):
+        self.add_rows(5)
+        for url, budget, user in self.BUDGETS:
+            with self.subTest(url=url):
+                self.assert_budget(url, budget, user)
+
+
+class SellerLeadsTests(ApiTestCase):
+    def test_only_leads_for_own_properties(self):
+        seller = make_user('seller@example.com')
+        other = make_user('other@example.com')
+        mine = make_lead(make_property(seller, images=0))
+        make_lead(make_property(other, images=0))
+
+        client = APIClient()
+        client.force_authenticate(seller)
+        response = client.get('/api/seller/leads/')
+        self.assertEqual([lead['id'] for lead in response.data['results']], [mine.id])
+
+
+class ListPaginationTests(ApiTestCase):
+    def setUp(self):
+        super().setUp()
+        self.seller = make_user('seller@example.com')
+        for i in range(25):
+            make_lead(make_property(self.seller, images=0, price=f'{i + 10} Lakh'), buyer=self.seller)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(self.seller)}')
+
+    def walk(self, url):
+        ids = []
+        while url:
+            body = self.client.get(url).data
+            ids += [row['id'] for row in body['results']]
+            url = body['next']
+        return ids
+
+    def test_every_list_is_paged(self):
+        for url in ['/api/properties/', '/api/properties/search/', '/api/properties/my-listings/',
+                    '/api/leads/', '/api/leads/my-interests/', '/api/seller/leads/',
+                    '/api/async/properties/', '/api/async/properties/my-listings/', '/api/async/leads/my-interests/']:
+            response = self.client.get(url, {'page_size': 1000})
+            self.assertEqual(len(response.json()['results']), 25, url)
+            response = self.client.get(url)
+            self.assertEqual(len(response.json()['results']), 20, url)
+            self.assertIn('rel="next"', response['Link'])
+
+    def test_cursors_follow_the_sort(self):
+        # The .values() path builds cursors from price_value, which isn't in the rows
+        ids = self.walk('/api/properties/?sort=price_high&page_size=7&fields=title')
+        expected = list(Property.objects.order_by('-price_value', '-id').values_list('id', flat=True))
+        self.assertEqual(ids, expected)
+        self.assertEqual(len(self.walk('/api/leads/my-interests/?page_size=10')), 25)
+        self.assertEqual(len(self.walk('/api/seller/leads/?page_size=10')), 25)
+
+    def test_tampered_cursor_is_not_found(self):
+        encode = KeysetPagination().encode_cursor
+        now = timezone.now().isoformat()
+        for url in ['/api/properties/', '/api/properties/search/', '/api/async/properties/',
+                    '/api/properties/?sort=price_low', '/api/properties/?sort=price_high&fields=title']:
+            for position in (['abc', 1], [now, 'x'], [{'a': 1}, 1], [now, [1]], [10 ** 30, 1]):
+                response = self.client.get(url, {'cursor': encode(position)})
+                self.assertEqual(response.status_code, 404, (url, position))
+                self.assertEqual(response.json(), {'detail': 'Invalid cursor'})
+
+    def test_bare_list_mode(self):
+        response = self.client.get('/api/properties/', {'envelope': '0', 'page_size': 5})
+        self.assertEqual(len(response.json()), 5)
+        next_page = self.client.get(response['Link'].split(';')[0].strip('<>'))
+        self.assertEqual(len(next_page.json()), 5)
+        self.assertFalse({row['id'] for row in response.json()} & {row['id'] for row in next_page.json()})
+        # The Link header survives the response cache
+        cached = self.client.get('/api/properties/', {'envelope': '0', 'page_size': 5})
+        self.assertEqual((cached['X-Cache'], cached['Link']), ('HIT', response['Link']))
+        with override_settings(API_BARE_LISTS=True):
+            self.assertIsInstance(self.client.get('/api/leads/my-interests/').json(), list)
+            self.assertIn('results', self.client.get('/api/leads/my-interests/?envelope=1').json())
+
+
+class UnitParsingTests(TestCase):
+    def test_parse_price(self):
+        self.assertEqual(parse_price('1.5 Cr'), 15_000_000)
+        self.assertEqual(parse_price('45 Lakh'), 4_500_000)
+        self.assertEqual(parse_price('Rs. 25,00,000'), 2_500_000)
+        self.assertIsNone(parse_price('Price on request'))
+
+    def test_parse_area(self):
+        self.assertEqual(parse_area('200 gaj'), 1800)
+        self.assertEqual(parse_area('1 kanal'), 5445)
+        self.assertEqual(parse_area('1500 sq. ft'), 1500)
+        self.assertIsNone(parse_area('big plot'))
+
+
+class PriceAreaFilterTests(ApiTestCase):
+    def setUp(self):
+        super().setUp()
+        owner = make_user('owner@example.com')
+        self.cheap = make_property(owner, images=0, price='40 Lakh', area='100 gaj')
+        self.pricey = make_property(owner, images=0, price='1.2 Cr', area='1 kanal')
+        self.unknown = make_property(owner, images=0, price='On request', area='-')
+
+    def test_numeric_fields_filled_on_save(self):
+        self.assertEqual((self.cheap.price_value, self.cheap.area_sqft), (4_000_000, 900))
+        self.cheap.price = '45 Lakh'
+        self.cheap.save(update_fields=['price'])
+        self.cheap.refresh_from_db()
+        self.assertEqual(self.cheap.price_value, 4_500_000)
+
+    def test_price_per_sqft_beyond_32_bits(self):
+        prop = make_property(self.cheap.owner, images=0, price='500 Cr', area='1')
+        prop.refresh_from_db()
+        self.assertEqual(prop.price_per_sqft, 5_000_000_000)
+
+    def test_price_range_and_sort(self):
+        response = APIClient().get('/api/properties/search/', {'min_price': '50 lakh'})
+        self.assertEqual([p['id'] for p in response.data['results']], [self.pricey.id])
+
+        response = APIClient().get('/api/properties/search/', {'sort': 'price_low'})
+        # Unparsed prices sort last
+        self.assertEqual([p['id'] for p in response.data['results']], [self.cheap.id, self.pricey.id, self.unknown.id])
+
+    def test_min_area(self):
+        response = APIClient().get('/api/properties/', {'min_area': '1000'})
+        self.assertEqual([p['id'] for p in response.data['results']], [self.pricey.id])
+
+
+class TextSearchTests(ApiTestCase):
+    def setUp(self):
+        super().setUp()
+        owner = make_user('owner@example.com')
+        self.model_town = make_property(owner, images=0, title='Corner house', colony='Model Town')
+        self.other = make_property(owner, images=0, title='Shop', colony='Green Avenue', description='Near model school')
+
+    def search(self, q, **params):
+        response = APIClient().get('/api/properties/search/', {'q': q, **params})
+        self.assertEqual(response.status_code, 200)
+        return [p['id'] for p in response.data['results']]
+
+    def test_spelling_variants_match_colony(self):
+        self.assertEqual(self.search('modeltown'), [self.model_town.id])
+        self.assertEqual(self.search('Model Town'), [self.model_town.id, self.other.id])
+
+    def test_colony_ranks_above_description(self):
+        self.assertEqual(self.search('model'), [self.model_town.id, self.other.id])
+
+    def test_combines_with_filters(self):
+        self.assertEqual(self.search('model', type='Plot'), [])
+
+
+class ResponseCacheTests(ApiTestCase):
+    def setUp(self):
+        super().setUp()
+        self.owner = make_user('owner@example.com')
+        self.property = make_property(self.owner, images=1)
+        self.client = APIClient()
+
+    def test_second_read_is_served_from_cache(self):
+        first = self.client.get('/api/properties/')
+        self.assertEqual(first['X-Cache'], 'MISS')
+        with self.assertNumQueries(0):
+            second = self.client.get('/api/properties/')
+        self.assertEqual(second['X-Cache'], 'HIT')
+        self.assertEqual(first.data, second.data)
+
+    def test_query_params_are_part_of_the_key(self):
+        self.client.get('/api/properties/')
+        self.assertEqual(self.client.get('/api/properties/', {'type': 'Plot'})['X-Cache'], 'MISS')
+
+    def test_conditional_get_returns_304(self):
+        first = self.client.get(f'/api/properties/{self.property.id}/')
+        response = self.client.get(f'/api/properties/{self.property.id}/', HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(response.status_code, 304)
+        response = self.client.get(f'/api/properties/{self.property.id}/', HTTP_IF_MODIFIED_SINCE=first['Last-Modified'])
+        self.assertEqual(response.status_code, 304)
+
+    def test_saving_a_property_invalidates(self):
+        self.client.get('/api/properties/')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.property.title = 'Renamed'
+            self.property.save()
+        response = self.client.get('/api/properties/')
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.data['results'][0]['title'], 'Renamed')
+
+    def test_change_after_the_generation_is_evicted_still_invalidates(self):
+        self.client.get('/api/properties/')
+        cache.delete(GENERATION_KEY)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.property.title = 'Renamed'
+            self.property.save()
+        response = self.client.get('/api/properties/')
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.data['results'][0]['title'], 'Renamed')
+
+    def test_deleting_an_image_invalidates(self):
+        self.client.get('/api/properties/search/')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.property.images.all().delete()
+        response = self.client.get('/api/properties/search/')
+        self.assertIsNone(response.data['results'][0]['cover_image'])
+
+    def test_stats_are_staff_only(self):
+        self.client.get('/api/properties/')
+        self.client.get('/api/properties/')
+        self.assertEqual(self.client.get('/api/cache/stats/').status_code, 401)
+
+        self.client.force_authenticate(User.objects.create_user('staff', is_staff=True))
+        stats = self.client.get('/api/cache/stats/').data
+        self.assertEqual(stats['get_properties'], {'hits': 1, 'misses': 1, 'hit_rate': 0.5})
+
+
+class ImageVariantTests(ApiTestCase):
+    def make_jpeg(self, size=(3000, 2000)):
+        exif = Image.Exif()
+        exif[0x010F] = 'PhoneMaker'  # Make
+        buffer = BytesIO()
+        Image.new('RGB', size, 'red').save(buffer, format='JPEG', exif=exif)
+        return SimpleUploadedFile('photo.jpg', buffer.getvalue(), content_type='image/jpeg')
+
+    def test_upload_generates_resized_webp_without_exif(self):
+        client = APIClient()
+        client.force_authenticate(make_user('seller@example.com'))
+        response = client.post('/api/properties/create/', {
+            'title': 'Plot', 'price': '20 Lakh', 'location': 'Sangrur', 'colony': 'Model Town',
+            'type': 'Plot', 'area': '100 gaj', 'beds': 0, 'baths': 0, 'uploaded_images': [self.make_jpeg()],
+        }, format='multipart')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(run_pending_jobs(), 1)
+
+        property_image = PropertyImage.objects.get(property_id=response.data['id'])
+        for field_name, max_size in VARIANTS.items():
+            with Image.open(getattr(property_image, field_name).path) as variant:
+                self.assertEqual(variant.format, 'WEBP')
+                self.assertEqual(max(variant.size), min(max_size, 3000))
+                self.assertFalse(variant.getexif())
+        with Image.open(property_image.image.path) as original:  # Still public, so stripped too
+            self.assertEqual(original.format, 'JPEG')
+            self.assertFalse(original.getexif())
+
+        data = APIClient().get(f'/api/properties/{property_image.property_id}/').data
+        self.assertTrue(data['images'][0]['card'].endswith(property_image.card_image.name))
+        self.assertTrue(property_image.card_image.name.endswith('.webp'))
+
+    def test_files_that_arent_photos_are_rejected(self):
+        client = APIClient()
+        client.force_authenticate(make_user('seller@example.com'))
+        listing = {'title': 'Plot', 'price': '20 Lakh', 'location': 'Sangrur', 'colony': 'Model Town',
+                   'type': 'Plot', 'area': '100 gaj'}
+        evil = SimpleUploadedFile('evil.html', b'<script>alert(1)</script>', content_type='image/gif')
+        response = client.post('/api/properties/create/', {**listing, 'uploaded_images': [evil]}, format='multipart')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('uploaded_images', response.data)
+        with self.settings(UPLOAD_MAX_SIZE=10):
+            response = client.post('/api/properties/create/', {**listing, 'uploaded_images': [self.make_jpeg()]},
+                                   format='multipart')
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Property.objects.exists())
+
+        # The serializer keeps the photo, under the type in its bytes
+        serializer = PropertySerializer(data={**listing, 'uploaded_images': [SimpleUploadedFile('photo.png', TINY_GIF)]})
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+        self.assertEqual(serializer.validated_data['uploaded_images'][0].name, 'photo.gif')
+
+
+calls = []
+
+
+@task('test_flaky', queue='test', max_attempts=2)
+def flaky_task(fail):
+    calls.append(fail)
+    if fail:
+        raise RuntimeError('boom')
+
+
+class JobQueueTests(ApiTestCase):
+    def setUp(self):
+        super().setUp()
+        calls.clear()
+
+    def test_successful_job_is_marked_done(self):
+        job = enqueue('test_flaky', fail=False)
+        self.assertEqual(run_pending_jobs(), 1)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (Job.DONE, 1))
+
+    def test_failed_job_is_retried_with_backoff_then_given_up(self):
+        job = enqueue('test_flaky', fail=True)
+        run_pending_jobs()
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.QUEUED)
+        self.assertIn('boom', job.last_error)
+        # Backoff: not runnable again straight away
+        self.assertEqual(run_pending_jobs(), 0)
+
+        Job.objects.filter(id=job.id).update(run_after=job.created_at)
+        run_pending_jobs()
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (Job.FAILED, 2))
+
+    def test_a_job_is_claimed_only_once(self):
+        enqueue('test_flaky', fail=False)
+        self.assertIsNotNone(claim_job('worker-a'))
+        self.assertIsNone(claim_job('worker-b'))
+
+    def test_claiming_counts_the_attempt(self):
+        job = enqueue('test_flaky', fail=False)
+        self.assertEqual(claim_job('worker-a').attempts, 1)
+        job.refresh_from_db()
+        self.assertEqual(job.attempts, 1)
+
+    def test_job_whose_worker_keeps_dying_is_given_up(self):
+        job = enqueue('test_flaky', fail=False)
+        stale = timezone.now() - timedelta(hours=1)
+        for _ in range(job.max_attempts):
+            claim_job('worker-a')
+            # The worker is killed mid-run; the lock times out
+            Job.objects.filter(id=job.id).update(locked_at=stale)
+            release_stale_jobs()
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts, job.locked_by), (Job.FAILED, 2, ''))
+        self.assertEqual(run_pending_jobs(), 0)
+
+    def test_queue_concurrency_limit(self):
+        enqueue('test_flaky', fail=False)
+        enqueue('test_flaky', fail=False)
+        with self.settings(JOB_QUEUE_CONCURRENCY={'test': 1}):
+            self.assertIsNotNone(claim_job('worker-a'))
+            self.assertIsNone(claim_job('worker-b'))
+
+    def test_new_lead_notifies_seller_in_background(self):
+        seller = make_user('seller@example.com')
+        prop = make_property(seller, images=0)
+        response = APIClient().post('/api/leads/', {
+            'property': prop.id, 'buyer_name': 'Aman', 'buyer_phone': '9811111111',
+        })
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(mail.outbox), 0)
+
+        run_pending_jobs()
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ['seller@example.com'])
+
+
+class BulkImportTests(ApiTestCase):
+    CSV = (
+        'title,price,location,colony,type,area,beds,baths,description,images\n'
+        'House one,50 Lakh,Sangrur,Model Town,House,200 gaj,3,2,Corner plot,a.gif;b.gif\n'
+        ',20 Lakh,Sangrur,Green Avenue,Plot,100 gaj,,,,\n'
+        'Plot two,20 Lakh,Sangrur,Green Avenue,Plot,100 gaj,,,,missing.gif\n'
+        'Shop three,80 Lakh,Dhuri,Main Bazaar,Commercial,50 gaj,,,,\n'
+    )
+
+    def setUp(self):
+        super().setUp()
+        self.owner = make_user('agent@example.com')
+        self.client = APIClient()
+        self.client.force_authenticate(self.owner)
+
+    def make_zip(self):
+        buffer = BytesIO()
+        with zipfile.ZipFile(buffer, 'w') as archive:
+            archive.writestr('listings.csv', self.CSV)
+            archive.writestr('a.gif', TINY_GIF)
+            archive.writestr('b.gif', TINY_GIF)
+        return SimpleUploadedFile('listings.zip', buffer.getvalue(), content_type='application/zip')
+
+    def test_zip_import_reports_bad_rows_and_keeps_good_ones(self):
+        response = self.client.post('/api/properties/import/', {'file': self.make_zip()}, format='multipart')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['created'], 2)
+        self.assertEqual([error['row'] for error in response.data['errors']], [2, 3])
+        self.assertIn('title', response.data['errors'][0]['errors'])
+        self.assertEqual(response.data['errors'][1]['errors']['images'], ['Not found: missing.gif'])
+
+        house = Property.objects.get(title='House one')
+        self.assertEqual((house.owner, house.price_value, house.beds), (self.owner, 5_000_000, 3))
+        self.assertEqual(house.images.count(), 2)
+        self.assertEqual(Property.objects.get(title='Shop three').beds, 0)
+        self.assertEqual(Job.objects.filter(name='process_property_image').count(), 2)
+
+    @override_settings(UPLOAD_MAX_SIZE=1024)
+    def test_zip_images_are_checked_like_uploads(self):
+        csv_text = (
+            'title,price,location,colony,area,images\n'
+            'Fake,50 Lakh,Sangrur,Model Town,200 gaj,evil.html\n'
+            'Huge,50 Lakh,Sangrur,Model Town,200 gaj,huge.gif\n'
+            'Renamed,50 Lakh,Sangrur,Model Town,200 gaj,photo.html\n'
+        )
+        buffer = BytesIO()
+        with zipfile.ZipFile(buffer, 'w') as archive:
+            archive.writestr('listings.csv', csv_text)
+            archive.writestr('evil.html', '<script>alert(1)</script>')
+            archive.writestr('huge.gif', TINY_GIF + b'\0' * 2048)
+            archive.writestr('photo.html', TINY_GIF)  # A real image under a misleading name
+        upload = SimpleUploadedFile('listings.zip', buffer.getvalue(), content_type='application/zip')
+        response = self.client.post('/api/properties/import/', {'file': upload}, format='multipart')
+        self.assertEqual(response.data['created'], 1)
+        errors = {error['row']: error['errors']['images'][0] for error in response.data['errors']}
+        self.assertEqual(errors[1], 'Not a readable image: evil.html')
+        self.assertTrue(errors[2].startswith('Too large: huge.gif'))
+        self.assertTrue(Property.objects.get(title='Renamed').images.get().image.name.endswith('.gif'))
+
+    def test_json_lines_in_batches(self):
+        lines = '\n'.join(json.dumps({
+            'title': f'Listing {i}', 'price': '10 Lakh', 'location': 'Sangrur',
+            'colony': 'Model Town', 'area': '50 gaj',
+        }) for i in range(5))
+        upload = SimpleUploadedFile('listings.jsonl', lines.encode())
+        # 3 batches of one multi-row INSERT each (plus savepoint/release)
+        with self.assertNumQueries(9):
+            report = import_file(upload, upload.name, self.owner, batch_size=2)
+        self.assertEqual(report['created'], 5)
+
+    def test_unreadable_records_are_rejected_rows(self):
+        listing = {'title': 'Listing', 'price': '10 Lakh', 'location': 'Sangrur', 'colony': 'Model Town', 'area': '50 gaj'}
+        lines = f'{json.dumps(listing)}\n{{"title": "cut\n\n{json.dumps(listing)}\n'
+        upload = SimpleUploadedFile('listings.jsonl', lines.encode())
+        response = self.client.post('/api/properties/import/', {'file': upload}, format='multipart')
+        self.assertEqual(response.data['created'], 2)
+        self.assertEqual([(error['row'], error['line']) for error in response.data['errors']], [(2, 2)])
+
+        rows = self.CSV.splitlines()
+        rows.insert(2, f'Long,1 Cr,Sangrur,Model Town,House,1 kanal,,,{"x" * (csv.field_size_limit() + 1)},')
+        upload = SimpleUploadedFile('listings.csv', '\n'.join(rows).encode())
+        response = self.client.post('/api/properties/import/', {'file': upload}, format='multipart')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['errors'][1]['line'], 3)
+        self.assertIn('Unreadable CSV record', response.data['errors'][1]['errors']['non_field_errors'][0])
+
+    def test_file_cut_short_reports_what_was_imported(self):
+        listing = {'title': 'Listing', 'price': '10 Lakh', 'location': 'Sangrur', 'colony': 'Model Town', 'area': '50 gaj'}
+        upload = SimpleUploadedFile('listings.json', f'[{json.dumps(listing)}, {json.dumps(listing)}, {{"title'.encode())
+        response = self.client.post('/api/properties/import/', {'file': upload}, format='multipart')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('Row 3', response.data['error'])
+        self.assertEqual(sorted(response.data['created_ids']), sorted(Property.objects.values_list('id', flat=True)))
+        self.assertEqual(len(response.data['created_ids']), 2)
+
+    def test_json_array_is_streamed(self):
+        rows = [{'title': f'L{i}', 'price': '1 Cr', 'location': 'S', 'colony': 'C', 'area': '1 kanal'} for i in range(3)]
+        stream = io.StringIO(json.dumps(rows, indent=2))
+        self.assertEqual(list(_iter_json_array(stream, chunk_size=7)), rows)
+
+    def test_dry_run_writes_nothing(self):
+        response = self.client.post('/api/properties/import/', {'file': self.make_zip(), 'dry_run': 'true'}, format='multipart')
+        self.assertEqual(response.data['created'], 2)
+        self.assertFalse(Property.objects.exists())
+
+
+class LeadExportTests(ApiTestCase):
+    def setUp(self):
+        super().setUp()
+        self.seller = make_user('seller@example.com')
+        prop = make_property(self.seller, images=0, title='Corner, house')
+        self.old = make_lead(prop, buyer_name='Old')
+        Lead.objects.filter(id=self.old.id).update(created_at=timezone.make_aware(datetime(2026, 1, 5, 10)))
+        self.new = make_lead(prop, buyer_name='New')
+        make_lead(make_property(make_user('other@example.com'), images=0))
+        self.client = APIClient()
+        self.client.force_authenticate(self.seller)
+
+    def export(self, **params):
+        response = self.client.get('/api/seller/leads/export/', params)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        return b''.join(response.streaming_content).decode()
+
+    def test_csv(self):
+        rows = list(csv.reader(io.StringIO(self.export())))
+        self.assertEqual(rows[0], ['id', 'created_at', 'status', 'property_id', 'property_title', 'buyer_name', 'buyer_phone'])
+        self.assertEqual([(row[0], row[4], row[5]) for row in rows[1:]], [
+            (str(self.new.id), 'Corner, house', 'New'),
+            (str(self.old.id), 'Corner, house', 'Old'),
+        ])
+
+    def test_csv_cells_are_not_formulas(self):
+        Lead.objects.filter(id=self.new.id).update(buyer_name='=HYPERLINK("http://evil")', buyer_phone='+919800000000')
+        rows = list(csv.reader(io.StringIO(self.export())))
+        self.assertEqual(rows[1][5:7], ['\'=HYPERLINK("http://evil")', "'+919800000000"])
+        self.assertEqual(rows[2][5], 'Old')
+
+    def test_ndjson_with_date_range(self):
+        lines = self.export(output='ndjson', since='2026-01-01', until='2026-01-05').splitlines()
+        self.assertEqual([json.loads(line)['buyer_name'] for line in lines], ['Old'])
+
+    def test_rejects_bad_params(self):
+        self.assertEqual(self.client.get('/api/seller/leads/export/', {'output': 'xlsx'}).status_code, 400)
+        self.assertEqual(self.client.get('/api/seller/leads/export/', {'since': 'yesterday'}).status_code, 400)
+
+
+
+class LeadCounterTests(ApiTestCase):
+    def setUp(self):
+        super().setUp()
+        self.seller = make_user('seller@example.com')
+        self.prop = make_property(self.seller, images=0)
+        self.client = APIClient()
+
+    def counts(self):
+        self.prop.refresh_from_db()
+        stats = list(LeadDailyStat.objects.values_list('leads', 'new_leads'))
+        return self.prop.leads_count, self.prop.new_leads_count, stats
+
+    def test_create_status_change_and_delete(self):
+        response = self.client.post('/api/leads/', {'property': self.prop.id, 'buyer_name': 'A', 'buyer_phone': '1'})
+        self.assertEqual(response.status_code, 201)
+        lead = make_lead(self.prop)
+        self.assertEqual(self.counts(), (2, 2, [(2, 2)]))
+
+        lead.status = 'Contacted'
+        lead.save()
+        self.assertEqual(self.counts(), (2, 1, [(2, 1)]))
+
+        Lead.objects.get(id=lead.id).delete()
+        self.assertEqual(self.counts(), (1, 1, [(1, 1)]))
+
+    def test_saving_a_property_does_not_overwrite_counters(self):
+        stale = Property.objects.get(id=self.prop.id)
+        make_lead(self.prop)
+        stale.title = 'Renamed'
+        stale.save()
+        self.assertEqual(self.counts()[:2], (1, 1))
+
+    def test_dashboard_reads_counters(self):
+        make_lead(self.prop)
+        old = make_lead(self.prop)
+        Lead.objects.filter(id=old.id).update(created_at=timezone.make_aware(datetime(2026, 1, 5, 10)))
+        rebuild_lead_counters()
+        self.client.force_authenticate(self.seller)
+
+        listings = self.client.get('/api/properties/my-listings/').data['results']
+        self.assertEqual((listings[0]['leads_count'], listings[0]['new_leads_count']), (2, 2))
+
+        stats = self.client.get('/api/seller/leads/stats/', {'since': '2026-01-01', 'until': '2026-01-31'}).data
+        self.assertEqual(stats['leads'], 1)
+        self.assertEqual([str(day['day']) for day in stats['days']], ['2026-01-05'])
+
+    def test_rebuild_repairs_drift(self):
+        make_lead(self.prop)
+        Property.objects.filter(id=self.prop.id).update(leads_count=7)
+        LeadDailyStat.objects.all().delete()
+        self.assertEqual(rebuild_lead_counters(), 1)
+        self.assertEqual(self.counts(), (1, 1, [(1, 1)]))
+
+    def test_rollups_belong_to_the_property_owner(self):
+        # Whatever the lead row says, both paths file the day under the listing's owner
+        Lead.objects.create(property=self.prop, seller=make_user('other@example.com'), buyer_name='B', buyer_phone='2')
+        incremental = list(LeadDailyStat.objects.values_list('seller', 'leads'))
+        rebuild_lead_counters()
+        self.assertEqual(incremental, [(self.seller.id, 1)])
+        self.assertEqual(list(LeadDailyStat.objects.values_list('seller', 'leads')), incremental)
+
+
+class DashboardAndBatchTests(ApiTestCase):
+    def setUp(self):
+        super().setUp()
+        self.seller = make_user('seller@example.com', 'Seller')
+        self.first = make_property(self.seller, images=0, title='First')
+        self.second = make_property(self.seller, images=0, title='Second')
+        make_lead(self.second, buyer=self.seller)
+        self.client = APIClient()
+        self.client.force_authenticate(self.seller)
+
+    def test_dashboard_sections(self):
+        data = self.client.get('/api/dashboard/').data
+        self.assertEqual(data['profile']['full_name'], 'Seller')
+        self.assertEqual([row['title'] for row in data['listings']['results']], ['Second', 'First'])
+        self.assertEqual(data['listings']['results'][0]['leads_count'], 1)
+        self.assertEqual(len(data['interests']['results']), 1)
+        self.assertIsNone(data['listings']['next'])
+
+    def test_dashboard_section_pagination(self):
+        data = self.client.get('/api/dashboard/', {'listings_page_size': 1}).data
+        self.assertEqual([row['title'] for row in data['listings']['results']], ['Second'])
+        self.assertEqual(len(data['interests']['results']), 1)
+        data = self.client.get(data['listings']['next']).data
+        self.assertEqual([row['title'] for row in data['listings']['results']], ['First'])
+        self.assertIsNone(data['listings']['next'])
+
+    def test_batch(self):
+        response = self.client.post('/api/batch/', {'calls': [
+            {'url': '/api/profile/'},
+            {'url': f'/api/properties/{self.first.id}/'},
+            {'url': '/api/properties/search/?page_size=1'},
+            {'url': '/api/seller/leads/export/'},
+            {'method': 'POST', 'url': '/api/contact/'},
+            {'url': '/api/nope/'},
+            {'url': '/api/batch/'},
+        ]}, format='json')
+        self.assertEqual(response.status_code, 200)
+        results = response.data['responses']
+        self.assertEqual([result['status'] for result in results], [200, 200, 200, 400, 405, 404, 400])
+        self.assertEqual(results[0]['body']['full_name'], 'Seller')
+        self.assertEqual(results[1]['body']['title'], 'First')
+        self.assertIn('ETag', results[1]['headers'])
+        self.assertEqual(len(results[2]['body']['results']), 1)
+
+    def test_batch_calls_run_as_the_caller(self):
+        anonymous = APIClient().post('/api/batch/', {'calls': [{'url': '/api/profile/'}]}, format='json')
+        self.assertEqual(anonymous.data['responses'][0]['status'], 401)
+        too_many = self.client.post('/api/batch/', {'calls': [{'url': '/api/profile/'}] * 21}, format='json')
+        self.assertEqual(too_many.status_code, 400)
+
+
+
+class CachedUserAuthTests(ApiTestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = make_user('seller@example.com')
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(self.user)}')
+
+    def test_repeat_calls_skip_user_and_profile_queries(self):
+        with self.assertNumQueries(1):  # user + profile in one query
+            self.assertEqual(self.client.get('/api/users/me/').status_code, 200)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get('/api/users/me/').status_code, 200)
+
+    def test_profile_change_is_visible(self):
+        self.client.get('/api/users/me/')
+        with self.captureOnCommitCallbacks(execute=True):
+            profile = Profile.objects.get(user=self.user)
+            profile.full_name = 'New Name'
+            profile.save()
+        self.assertEqual(self.client.get('/api/users/me/').data['full_name'], 'New Name')
+
+    def test_deactivated_user_is_rejected(self):
+        self.client.get('/api/users/me/')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.is_active = False
+            self.user.save()
+        self.assertEqual(self.client.get('/api/users/me/').status_code, 401)
+
+
+
+class AsyncReadTests(ApiTestCase):
+    def setUp(self):
+        super().setUp()
+        self.seller = make_user('seller@example.com')
+        self.props = [make_property(self.seller, title=f'House {i}') for i in range(3)]
+        make_lead(self.props[0], buyer=self.seller)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(self.seller)}')
+
+    def assertSameAsSync(self, path):
+        sync = self.client.get(f'/api/{path}')
+        cache.clear()
+        response = self.client.get(f'/api/async/{path}')
+        self.assertEqual(response.status_code, sync.status_code)
+        # Only the next-page links point at the async path
+        self.assertEqual(json.loads(response.content.decode().replace('/api/async/', '/api/')), json.loads(sync.content))
+        return response
+
+    def test_bodies_match_the_sync_views(self):
+        self.assertSameAsSync('properties/?sort=price_low')
+        self.assertSameAsSync('properties/?fields=title,price&expand=images')
+        page = self.assertSameAsSync('properties/search/?page_size=2&q=house').json()
+        self.assertIn('/api/async/properties/search/', page['next'])
+        self.assertSameAsSync(f'properties/{self.props[0].id}/')
+        self.assertSameAsSync('properties/999999/')
+        self.assertSameAsSync('properties/my-listings/')
+        self.assertSameAsSync('leads/my-interests/')
+
+    def test_cache_headers_and_auth(self):
+        first = self.client.get('/api/async/properties/')
+        self.assertEqual(first['X-Cache'], 'MISS')
+        again = self.client.get('/api/async/properties/', HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(again.status_code, 304)
+        self.assertEqual(APIClient().get('/api/async/properties/my-listings/').status_code, 401)
+        self.assertEqual(self.client.post('/api/async/properties/').status_code, 405)
+
+
+class SparseFieldsTests(ApiTestCase):
+    def setUp(self):
+        super().setUp()
+        self.owner = make_user('owner@example.com')
+        self.property = make_property(self.owner, images=2, description='Corner plot')
+        self.client = APIClient()
+
+    def test_lists_default_to_the_card_shape(self):
+        for path in ('/api/properties/', '/api/properties/search/', '/api/async/properties/'):
+            row = self.client.get(path).json()
+            row = (row['results'] if isinstance(row, dict) else row)[0]
+            self.assertEqual(set(row), set(PROPERTY_CARD_FIELDS), path)
+            self.assertIn(self.property.images.order_by('id').first().image.name, row['cover_image'])
+
+    def test_fields_and_expand(self):
+        row = self.client.get('/api/properties/?fields=title,price').json()['results'][0]
+        self.assertEqual(set(row), {'id', 'title', 'price'})
+        row = self.client.get('/api/properties/search/?expand=images').json()['results'][0]
+        self.assertEqual(len(row['images']), 2)
+        self.assertIn('cover_image', row)
+
+    def test_fields_without_images_skip_the_image_query(self):
+        with self.assertNumQueries(1):
+            self.client.get('/api/properties/?fields=title,price')
+
+    def test_detail_keeps_the_full_shape(self):
+        body = self.client.get(f'/api/properties/{self.property.id}/').json()
+        self.assertEqual(body['description'], 'Corner plot')
+        self.assertEqual(len(body['images']), 2)
+        body = self.client.get(f'/api/properties/{self.property.id}/?fields=title').json()
+        self.assertEqual(set(body), {'id', 'title'})
+
+    def test_unknown_fields_are_rejected(self):
+        self.assertEqual(self.client.get('/api/properties/?fields=title,secret').status_code, 400)
+        self.assertEqual(self.client.get('/api/properties/?expand=owner').status_code, 400)
+        self.assertEqual(self.client.get('/api/async/properties/?fields=secret').status_code, 400)
+
+
+class FastSerializationTests(ApiTestCase):
+    def setUp(self):
+        super().setUp()
+        self.seller = make_user('seller@example.com', name='Gurpreet')
+        self.buyer = make_user('buyer@example.com')
+        self.props = [
+            make_property(self.seller, title='Kothi \u2028 ਸੰਗਰੂਰ "corner"', images=2, description='Line\nbreak'),
+            make_property(self.buyer, title='Plot', images=0, price='on request', area=''),
+        ]
+        image = self.props[0].images.order_by('id').last()
+        image.card_image.name = 'property_images/variants/card.webp'
+        image.save()
+        make_lead(self.props[0], buyer=self.buyer, buyer_name='Ravi \u2029')
+        make_lead(self.props[1], buyer=self.buyer, status='Contacted')
+        orphan = make_lead(self.props[1], buyer=self.buyer)
+        Lead.objects.filter(pk=orphan.pk).update(property=None, created_at=timezone.now().replace(microsecond=123456))
+
+    def render(self, data):
+        return JSONRenderer().render(data)
+
+    def test_rows_match_the_serializers(self):
+        for fields in (PROPERTY_CARD_FIELDS, {'id', 'title', 'submitted_by', 'description'}):
+            queryset = Property.objects.with_card_data(fields).order_by('id')
+            expected = PropertySerializer(queryset, many=True, fields=fields).data
+            self.assertEqual(FastJSONRenderer().render(property_rows(queryset, fields)), self.render(expected))
+        for serializer_class, queryset in ((MyInterestSerializer, Lead.objects.select_related('property')),
+                                           (LeadSerializer, Lead.objects.all())):
+            queryset = queryset.order_by('id')
+            expected = serializer_class(queryset, many=True).data
+            self.assertEqual(FastJSONRenderer().render(values_rows(serializer_class(), queryset)), self.render(expected))
+
+    def test_endpoints_send_the_serializer_bytes(self):
+        client = APIClient()
+        response = client.get('/api/properties/?sort=oldest')
+        queryset = Property.objects.with_card_data(PROPERTY_CARD_FIELDS).order_by('created_at', 'id')
+        expected = PropertySerializer(queryset, many=True, fields=PROPERTY_CARD_FIELDS).data
+        self.assertEqual(response.content, self.render({'next': None, 'results': expected}))
+
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(self.buyer)}')
+        response = client.get('/api/leads/my-interests/?envelope=0')
+        leads = Lead.objects.filter(buyer=self.buyer).select_related('property').order_by('-created_at', '-id')
+        self.assertEqual(response.content, self.render(MyInterestSerializer(leads, many=True).data))
+
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(self.seller)}')
+        response = client.get('/api/seller/leads/?envelope=0')
+        leads = Lead.objects.filter(seller=self.seller).order_by('-created_at', '-id')
+        self.assertEqual(response.content, self.render(LeadSerializer(leads, many=True).data))
+
+    def test_renderer_matches_drf(self):
+        data = {'a': [1, None, True, 'é\u2028'], 'when': timezone.now(), 'day': timezone.now().date(), 2: 'x'}
+        self.assertEqual(FastJSONRenderer().render(data), self.render(data))
+        self.assertEqual(FastJSONRenderer().render(None), b'')
+
+
+GC_MEDIA_ROOT = '/tmp/sangrurestate-test-media-gc'
+
+
+@override_settings(MEDIA_ROOT=GC_MEDIA_ROOT)
+class MediaStorageTests(ApiTestCase):
+    def setUp(self):
+        super().setUp()
+        shutil.rmtree(GC_MEDIA_ROOT, ignore_errors=True)
+        self.owner = make_user('owner@example.com')
+        self.first = make_property(self.owner, images=1)
+        self.second = make_property(self.owner, images=1)
+        self.image = self.first.images.get()
+
+    def test_same_bytes_are_stored_once(self):
+        other = self.second.images.get()
+        self.assertEqual(self.image.image.name, other.image.name)
+        digest = hashlib.sha256(TINY_GIF).hexdigest()
+        self.assertEqual(self.image.image.name, f'property_images/{digest[:2]}/{digest}.gif')
+        self.assertEqual(content_digest(self.image.image.name), digest)
+        self.assertEqual(len(os.listdir(os.path.dirname(self.image.image.path))), 1)
+
+    def test_media_is_served_with_cache_headers_and_ranges(self):
+        url = self.image.image.url
+        response = self.client.get(url)
+        self.assertEqual(b''.join(response.streaming_content), TINY_GIF)
+        self.assertEqual(response['Cache-Control'], 'public, max-age=31536000, immutable')
+        self.assertEqual(response['Content-Type'], 'image/gif')
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
+
+        partial = self.client.get(url, HTTP_RANGE='bytes=0-9')
+        self.assertEqual(partial.status_code, 206)
+        self.assertEqual(partial['Content-Range'], f'bytes 0-9/{len(TINY_GIF)}')
+        self.assertEqual(b''.join(partial.streaming_content), TINY_GIF[:10])
+        tail = self.client.get(url, HTTP_RANGE='bytes=-5')
+        self.assertEqual(b''.join(tail.streaming_content), TINY_GIF[-5:])
+        self.assertEqual(self.client.get(url, HTTP_RANGE='bytes=5000-').status_code, 416)
+        stale = self.client.get(url, HTTP_RANGE='bytes=0-9', HTTP_IF_RANGE='"old"')
+        self.assertEqual(stale.status_code, 200)
+
+    def test_media_edge_cases(self):
+        self.assertEqual(self.client.get('/media/../core/settings.py').status_code, 404)
+        self.assertEqual(self.client.get('/media/property_images/missing.jpg').status_code, 404)
+        with open(os.path.join(GC_MEDIA_ROOT, 'property_images', 'legacy.gif'), 'wb') as handle:
+            handle.write(TINY_GIF)
+        self.assertEqual(self.client.get('/media/property_images/legacy.gif')['Cache-Control'], 'public, max-age=86400')
+        with self.settings(MEDIA_SENDFILE='x-accel-redirect'):
+            response = self.client.get(self.image.image.url)
+        self.assertEqual(response['X-Accel-Redirect'], f'/protected-media/{self.image.image.name}')
+        self.assertEqual(response.content, b'')
+
+    def test_stored_files_are_named_and_served_by_their_content(self):
+        html = default_storage.save('property_images/evil.html', ContentFile(b'<script>alert(1)</script>'))
+        self.assertEqual(os.path.splitext(html)[1], '')
+        gif = default_storage.save('property_images/photo.html', ContentFile(TINY_GIF))
+        self.assertEqual(gif, self.image.image.name)
+
+        # A file stored under its client's name before the checks is only ever downloaded
+        with open(os.path.join(GC_MEDIA_ROOT, 'property_images', 'legacy.html'), 'wb') as handle:
+            handle.write(b'<script>alert(1)</script>')
+        for name in (html, 'property_images/legacy.html'):
+            response = self.client.get(f'/media/{name}')
+            self.assertEqual(response['Content-Type'], 'application/octet-stream')
+            self.assertEqual(response['Content-Disposition'], 'attachment')
+        self.assertNotIn('attachment', self.client.get(self.image.image.url).get('Content-Disposition', ''))
+
+    def test_gc_deletes_only_old_orphans(self):
+        orphan = default_storage.save('property_images/photo.jpg', ContentFile(b'orphan'))
+        fresh = default_storage.save('property_images/photo.jpg', ContentFile(b'fresh orphan'))
+        old = time.time() - 2 * 86400
+        for name in (orphan, self.image.image.name):
+            os.utime(default_storage.path(name), (old, old))
+        self.first.delete()  # The photo is still used by self.second
+
+        call_command('gc_media', '--dry-run', stdout=io.StringIO())
+        self.assertTrue(default_storage.exists(orphan))
+        call_command('gc_media', stdout=io.StringIO())
+        self.assertFalse(default_storage.exists(orphan))
+        self.assertTrue(default_storage.exists(fresh))
+        self.assertTrue(default_storage.exists(self.image.image.name))
+
+    def test_uploading_an_old_orphan_again_saves_it_from_gc(self):
+        orphan = default_storage.save('property_images/photo.jpg', ContentFile(b'orphan'))
+        old = time.time() - 2 * 86400
+        os.utime(default_storage.path(orphan), (old, old))
+        # Same bytes again, e.g. a new listing whose row isn't committed when gc runs
+        self.assertEqual(default_storage.save('property_images/again.jpg', ContentFile(b'orphan')), orphan)
+        call_command('gc_media', stdout=io.StringIO())
+        self.assertTrue(default_storage.exists(orphan))
+
+
+@override_settings(UPLOAD_TEMP_DIR='/tmp/sangrurestate-test-upload-parts', UPLOAD_CHUNK_SIZE=100)
+class ChunkedUploadTests(ApiTestCase):
+    def setUp(self):
+        super().setUp()
+        self.seller = make_user('seller@example.com')
+        self.client = APIClient()
+        self.client.force_authenticate(self.seller)
+        buffer = BytesIO()
+        Image.effect_noise((24, 24), 60).convert('RGB').save(buffer, format='PNG')
+        self.photo = buffer.getvalue()
+
+    def start(self, size=None):
+        response = self.client.post('/api/uploads/', {'filename': 'house.png', 'size': size or len(self.photo)})
+        self.assertEqual(response.status_code, 201, response.data)
+        return f"/api/uploads/{response.data['id']}/", response.data['id']
+
+    def put(self, url, start, end, body=None, total=None):
+        return self.client.put(
+            url, body if body is not None else self.photo[start:end + 1], content_type='application/octet-stream',
+            HTTP_CONTENT_RANGE=f'bytes {start}-{end}/{total or len(self.photo)}',
+        )
+
+    def upload(self):
+        url, upload_id = self.start()
+        for start in range(0, len(self.photo), 100):
+            self.assertEqual(self.put(url, start, min(start + 99, len(self.photo) - 1)).status_code, 200)
+        self.assertEqual(self.client.post(f'{url}complete/').status_code, 200)
+        return upload_id
+
+    def test_chunks_resume_and_attach_to_a_new_property(self):
+        self.assertGreater(len(self.photo), 200)
+        url, upload_id = self.start()
+        self.assertEqual(self.put(url, 0, 99).data['offset'], 100)
+        # The client lost the response and resends the first chunk
+        retry = self.put(url, 0, 99)
+        self.assertEqual((retry.status_code, retry.data['offset']), (409, 100))
+        self.assertEqual(self.client.get(url).data['offset'], 100)
+        self.assertEqual(self.client.post(f'{url}complete/').status_code, 409)
+        for start in range(100, len(self.photo), 100):
+            self.put(url, start, min(start + 99, len(self.photo) - 1))
+        done = self.client.post(f'{url}complete/')
+        self.assertEqual(done.data['status'], Upload.COMPLETE)
+
+        second = self.upload()
+        response = self.client.post('/api/properties/create/', {
+            'title': 'Plot', 'price': '20 Lakh', 'location': 'Sangrur', 'colony': 'Model Town',
+            'type': 'Plot', 'area': '100 gaj', 'upload_ids': [second, str(upload_id).upper()],
+        })
+        self.assertEqual(response.status_code, 200, response.data)
+        images = PropertyImage.objects.filter(property_id=response.data['id'])
+        self.assertEqual(images.count(), 2)
+        with images.first().image.open('rb') as handle:
+            self.assertEqual(handle.read(), self.photo)
+        self.assertFalse(Upload.objects.exists())
+        self.assertEqual(Job.objects.filter(name='process_property_image').count(), 2)
+
+    def test_limits_are_checked_early(self):
+        with self.settings(UPLOAD_MAX_SIZE=1000):
+            self.assertEqual(self.client.post('/api/uploads/', {'size': 5000}).status_code, 413)
+        url, _ = self.start()
+        self.assertEqual(self.put(url, 0, 149).status_code, 413)
+        self.assertEqual(self.put(url, 0, 99, total=99999).status_code, 416)
+        self.assertEqual(self.put(url, 0, 9, body=b'MZ' + b'\x00' * 8).status_code, 415)
+        self.assertEqual(self.client.get(url).data['offset'], 0)
+
+    def test_uploads_are_private(self):
+        upload_id = self.upload()
+        unfinished_url, unfinished_id = self.start()
+        other = APIClient()
+        other.force_authenticate(make_user('other@example.com'))
+        self.assertEqual(other.get(f'/api/uploads/{upload_id}/').status_code, 404)
+        response = other.post('/api/properties/create/', {
+            'title': 'Plot', 'price': '20 Lakh', 'location': 'Sangrur', 'colony': 'Model Town',
+            'type': 'Plot', 'area': '100 gaj', 'upload_ids': [upload_id],
+        })
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Property.objects.exists())
+        response = self.client.post('/api/properties/create/', {
+            'title': 'Plot', 'price': '20 Lakh', 'location': 'Sangrur', 'colony': 'Model Town',
+            'type': 'Plot', 'area': '100 gaj', 'upload_ids': [unfinished_id, 'nonsense'],
+        })
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.client.delete(unfinished_url).status_code, 204)
+        self.assertEqual(Upload.objects.count(), 1)
+
+
+class AdminTests(ApiTestCase):
+    def setUp(self):
+        super().setUp()
+        admin_user = User.objects.create_superuser('admin', 'admin@example.com', 'pass12345')
+        self.client.force_login(admin_user)
+        sellers = [make_user(f'seller{i}@example.com') for i in range(3)]
+        for i in range(12):
+            prop = make_property(sellers[i % 3], images=0, title=f'House {i}')
+            make_lead(prop, buyer_phone=f'98000000{i:02d}', status='Contacted' if i % 2 else 'New')
+
+    def test_changelists_use_a_fixed_number_of_queries(self):
+        for url in ['/admin/api/lead/', '/admin/api/property/', '/admin/api/contact/', '/admin/api/job/',
+                    '/admin/api/propertyimage/', '/admin/api/lead/?status=New']:
+            self.assertEqual(self.client.get(url).status_code, 200, url)
+        # More rows must not mean more queries (no per-row __str__ lookups, no DISTINCT for filters)
+        counts = []
+        for _ in range(2):
+            with CaptureQueriesContext(connection) as queries:
+                self.client.get('/admin/api/lead/')
+            counts.append(len(queries))
+            prop = make_property(make_user(f'late{len(counts)}@example.com'), images=0)
+            for i in range(10):
+                make_lead(prop)
+        self.assertEqual(counts[0], counts[1])
+
+    def test_lead_form_does_not_list_every_property(self):
+        lead = Lead.objects.first()
+        response = self.client.get(f'/admin/api/lead/{lead.id}/change/')
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'admin-autocomplete')
+        self.assertNotContains(response, 'House 11</option>')
+
+    def test_search_and_filters(self):
+        response = self.client.get('/admin/api/lead/', {'q': '9800000003'})
+        self.assertEqual(response.context['cl'].result_count, 1)
+        response = self.client.get('/admin/api/lead/', {'status': 'Contacted'})
+        self.assertEqual(response.context['cl'].result_count, 6)
+        prop = Property.objects.get(title='House 4')
+        response = self.client.get('/admin/api/property/', {'q': str(prop.id)})
+        self.assertEqual(list(response.context['cl'].result_list), [prop])
+        response = self.client.get('/admin/api/property/', {'q': 'house', 'type': 'House'})
+        self.assertEqual(response.context['cl'].result_count, 12)
+        with_images = make_property(prop.owner, images=2)
+        response = self.client.get('/admin/api/propertyimage/', {'q': str(with_images.id)})
+        self.assertEqual(response.context['cl'].result_count, 2)
+        self.assertNotIn('CAST', str(response.context['cl'].queryset.query).upper())
+        response = self.client.get('/admin/api/propertyimage/', {'q': 'house'})
+        self.assertEqual(response.context['cl'].result_count, 0)
+        # Exact counts below the estimate threshold (and always on SQLite)
+        self.assertEqual(self.client.get('/admin/api/lead/').context['cl'].paginator.count, 12)
+
+
+class SubmissionProtectionTests(ApiTestCase):
+    def setUp(self):
+        super().setUp()
+        self.seller = make_user('seller@example.com')
+        self.props = [make_property(self.seller, images=0) for _ in range(3)]
+        self.client = APIClient()
+
+    def lead(self, prop, phone='9876543210', **extra):
+        return self.client.post('/api/leads/', {'property': prop.id, 'buyer_name': 'Ravi', 'buyer_phone': phone}, **extra)
+
+    def test_duplicates_return_the_existing_lead(self):
+        first = self.lead(self.props[0])
+        self.assertEqual(first.status_code, 201)
+        again = self.lead(self.props[0], phone='+91 98765-43210')
+        self.assertEqual((again.status_code, again.data['id']), (200, first.data['id']))
+        cache.clear()  # Cold cache: the database check still catches it
+        self.assertEqual(self.lead(self.props[0]).status_code, 200)
+        self.assertEqual(self.lead(self.props[1]).status_code, 201)
+        self.assertEqual(Lead.objects.count(), 2)
+
+        # The old endpoint (shadowed by the router in urls.py, called directly here)
+        factory = APIRequestFactory()
+        request = factory.post('/', {'property': self.props[0].id, 'buyer_name': 'Ravi', 'buyer_phone': '9876543210'})
+        self.assertEqual(submit_lead(request).data['id'], first.data['id'])
+        request = factory.post('/', {'property': 'x', 'buyer_name': 'Ravi', 'buyer_phone': '9876543210'})
+        self.assertEqual(submit_lead(request).status_code, 404)
+        self.assertEqual(Lead.objects.count(), 2)
+
+    def test_idempotency_key(self):
+        first = self.lead(self.props[0], HTTP_IDEMPOTENCY_KEY='tap-1')
+        retry = self.lead(self.props[1], phone='9000000000', HTTP_IDEMPOTENCY_KEY='tap-1')
+        self.assertEqual((retry.status_code, retry.data['id']), (200, first.data['id']))
+        # Keys belong to the caller
+        other = self.lead(self.props[1], phone='9000000000', HTTP_IDEMPOTENCY_KEY='tap-1', REMOTE_ADDR='10.0.0.9')
+        self.assertEqual(other.status_code, 201)
+
+    def test_client_cannot_pick_seller_or_buyer(self):
+        victim = make_user('victim@example.com')
+        response = self.client.post('/api/leads/', {
+            'property': self.props[0].id, 'buyer_name': 'Ravi', 'buyer_phone': '9876543210',
+            'seller': victim.id, 'buyer': victim.id,
+        })
+        self.assertEqual(response.status_code, 201)
+        lead = Lead.objects.get(pk=response.data['id'])
+        self.assertEqual((lead.seller_id, lead.buyer_id), (self.seller.id, None))
+
+    def test_concurrent_twin_gets_a_conflict(self):
+        key = f"api:duplicate:lead:{hashlib.sha256(f'{self.props[0].id}:9876543210'.encode()).hexdigest()[:32]}"
+        cache.set(key, 'pending')
+        self.assertEqual(self.lead(self.props[0]).status_code, 409)
+        self.assertFalse(Lead.objects.exists())
+
+    @override_settings(REST_FRAMEWORK={**settings.REST_FRAMEWORK, 'DEFAULT_THROTTLE_RATES': {
+        'lead_ip': '4/hour', 'lead_phone': '2/hour', 'contact_ip': '2/hour',
+    }})
+    def test_token_buckets(self):
+        self.assertEqual(self.lead(self.props[0]).status_code, 201)
+        self.assertEqual(self.lead(self.props[1]).status_code, 201)
+        with self.assertNumQueries(0):  # Turned away before any SQL
+            throttled = self.lead(self.props[2], phone='98765 43210')
+        self.assertEqual(throttled.status_code, 429)
+        self.assertGreater(int(throttled['Retry-After']), 0)
+        self.assertEqual(self.lead(self.props[2], phone='9000000000').status_code, 201)
+        # Every attempt took one of this IP's 4 tokens; another IP has its own bucket
+        self.assertEqual(self.lead(self.props[2], phone='9111111111').status_code, 429)
+        self.assertEqual(self.lead(self.props[2], phone='9111111111', REMOTE_ADDR='10.0.0.9').status_code, 201)
+        self.assertEqual(self.client.get('/api/leads/').status_code, 200)  # Reads aren't counted
+
+        message = {'name': 'Asha', 'email': 'asha@example.com', 'subject': 'Hi', 'message': 'Call me'}
+        self.assertEqual(self.client.post('/api/contact/', message).status_code, 201)
+        self.assertEqual(self.client.post('/api/contact/', message).status_code, 200)
+        self.assertEqual(self.client.post('/api/contact/', {**message, 'message': 'Again'}).status_code, 429)
+        self.assertEqual(Contact.objects.count(), 1)
+
+
+    @override_settings(REST_FRAMEWORK={**settings.REST_FRAMEWORK, 'NUM_PROXIES': 1, 'DEFAULT_THROTTLE_RATES': {
+        **settings.REST_FRAMEWORK['DEFAULT_THROTTLE_RATES'], 'lead_ip': '2/hour',
+    }})
+    def test_forged_forwarded_for_shares_the_bucket(self):
+        # The proxy appends the real address; whatever the client put before it is ignored
+        statuses = [
+            self.lead(prop, phone=f'90000000{i}', HTTP_X_FORWARDED_FOR=f'10.1.1.{i}, 203.0.113.5').status_code
+            for i, prop in enumerate(self.props)
+        ]
+        self.assertEqual(statuses, [201, 201, 429])
+
+@override_settings(SYNC_SAFETY_LAG=0)
+class DeltaSyncTests(ApiTestCase):
+    def setUp(self):
+        super().setUp()
+        self.seller = make_user('seller@example.com')
+        self.props = [make_property(self.seller, title=f'House {i}', images=2) for i in range(5)]
+        self.client = APIClient()
+
+    def sync(self, token=None, **params):
+        response = self.client.get('/api/properties/changes/', {**params, **({'since': token} if token else {})})
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json()
+
+    def test_full_sync_then_deltas(self):
+        ids, token, pages = [], None, 0
+        while True:
+            body = self.sync(token, page_size=2)
+            ids += [row['id'] for row in body['changed']]
+            self.assertEqual(body['deleted'], {'properties': [], 'images': []})
+            token, pages = body['sync_token'], pages + 1
+            if not body['has_more']:
+                break
+        self.assertEqual((sorted(ids), pages), (sorted(prop.id for prop in self.props), 3))
+        self.assertEqual(self.sync(token)['changed'], [])
+
+        renamed, gone, retouched = self.props[:3]
+        gone_id, gone_images = gone.id, list(gone.images.values_list('id', flat=True))
+        image = retouched.images.order_by('id').first()
+        image_id = image.id
+        with self.captureOnCommitCallbacks(execute=True):  # Drops the cached responses
+            renamed.title = 'Renamed'
+            renamed.save(update_fields=['title'])
+            image.delete()
+            gone.delete()
+
+        body = self.sync(token)
+        self.assertEqual({row['id']: row['title'] for row in body['changed']}, {renamed.id: 'Renamed', retouched.id: 'House 2'})
+        self.assertEqual(body['deleted']['properties'], [gone_id])
+        self.assertEqual(sorted(body['deleted']['images']), sorted([image_id, *gone_images]))
+        again = self.sync(body['sync_token'])
+        self.assertEqual((again['changed'], again['deleted']), ([], {'properties': [], 'images': []}))
+
+    def test_recent_rows_wait_for_the_lag(self):
+        with override_settings(SYNC_SAFETY_LAG=60):
+            self.assertEqual(self.sync()['changed'], [])
+
+    def test_bad_and_expired_tokens(self):
+        self.assertEqual(self.client.get('/api/properties/changes/', {'since': 'nonsense'}).status_code, 404)
+        old = timezone.now() - timedelta(days=31)
+        token = SyncPagination().encode_cursor([old, 0, old])
+        self.assertEqual(self.client.get('/api/properties/changes/', {'since': token}).status_code, 410)
+        now = timezone.now()
+        for position in ([now, 'x', now], [now, True, now], [now, {'a': 1}, now]):
+            response = self.client.get('/api/properties/changes/', {'since': SyncPagination().encode_cursor(position)})
+            self.assertEqual((response.status_code, response.json()), (404, {'detail': 'Invalid sync token'}))
+
+        self.props[0].delete()
+        Tombstone.objects.update(deleted_at=old)
+        call_command('prune_tombstones', stdout=io.StringIO())
+        self.assertFalse(Tombstone.objects.exists())
+
+
+class RequestProfilingTests(ApiTestCase):
+    def setUp(self):
+        super().setUp()
+        self.seller = make_user('seller@example.com')
+        for i in range(3):
+            make_property(self.seller, title=f'House {i}')
+        self.client = APIClient()
+
+    def scrape(self):
+        response = self.client.get('/metrics/', HTTP_AUTHORIZATION='Bearer s3cret')
+        self.assertEqual(response.status_code, 200)
+        return response.content.decode()
+
+    def count(self, body, route):
+        match = re.search(rf'^api_request_duration_seconds_count{{route="{route}"}} (\d+)$', body, re.M)
+        return int(match.group(1)) if match else 0
+
+    @override_settings(METRICS_SERVER_TIMING=True)
+    def test_server_timing_counts_the_requests_sql(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/properties/')
+        timing = response['Server-Timing']
+        for phase in ('total', 'db', 'serialize', 'app'):
+            self.assertIn(f'{phase};dur=', timing)
+        self.assertIn(f'desc="{len(queries)} queries"', timing)
+
+        with override_settings(METRICS_SERVER_TIMING=False):
+            self.assertFalse(self.client.get('/api/properties/').has_header('Server-Timing'))
+
+    @override_settings(METRICS_TOKEN='s3cret')
+    def test_metrics_endpoint(self):
+        self.assertEqual(self.client.get('/metrics/').status_code, 403)
+        self.assertEqual(self.client.get('/metrics/', HTTP_AUTHORIZATION='Bearer wrong').status_code, 403)
+
+        before = self.count(self.scrape(), 'get_properties')
+        self.client.get('/api/properties/')
+        self.client.get('/api/properties/', {'page_size': 2})
+        body = self.scrape()
+        self.assertEqual(self.count(body, 'get_properties'), before + 2)
+        self.assertIn('# TYPE api_db_queries histogram', body)
+        self.assertIn('api_response_size_bytes_bucket{route="get_properties",le="+Inf"}', body)
+        self.assertNotIn('route="metrics"', body)  # Scrapes aren't counted
+
+        self.client.force_login(User.objects.create_user('staff', is_staff=True))
+        self.assertEqual(self.client.get('/metrics/').status_code, 200)
+
+    @override_settings(METRICS_SLOW_REQUEST_MS=0)
+    def test_slow_requests_log_their_sql(self):
+        self.client.force_authenticate(self.seller)
+        with self.assertLogs('api.metrics', 'WARNING') as logs:
+            self.client.get('/api/properties/my-listings/')
+        output = '\n'.join(logs.output)
+        self.assertIn('(my_listings)', output)
+        self.assertIn('FROM "api_property"', output)
+        self.assertIn('= %s', output)  # Placeholders, not the parameters
+
+
+@override_settings(DATABASE_REPLICAS=['replica_1'], REPLICA_READ_YOUR_WRITES=10)
+class ReplicaRoutingTests(SimpleTestCase):
+    # Only asks the router where a query would go (QuerySet.db), so no replica database is needed
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(_state.reset, _state.set(RoutingState()))
+
+    def read_alias(self, user=None, cached=False):
+        with use_replica(user, cached):
+            return Property.objects.all().db
+
+    def test_reads_go_to_the_replica_only_inside_replica_views(self):
+        self.assertEqual(self.read_alias(), 'replica_1')
+        self.assertEqual(Property.objects.all().db, 'default')
+        with override_settings(DATABASE_REPLICAS=[]):
+            self.assertEqual(self.read_alias(), 'default')
+
+    def test_writes_and_recent_writers_stay_on_the_primary(self):
+        user, other = User(pk=1), User(pk=2)
+        cache.set(RECENT_WRITE_KEY.format(user_id=user.pk), True)
+        self.assertEqual(self.read_alias(user), 'default')
+        self.assertEqual(self.read_alias(other), 'replica_1')
+
+        self.assertEqual(PrimaryReplicaRouter().db_for_write(Property), 'default')
+        self.assertEqual(self.read_alias(other), 'default')  # This request has written
+
+    def test_cached_reads_wait_out_listing_changes(self):
+        cache.set(MODIFIED_KEY, int(time.time()))
+        self.assertEqual(self.read_alias(cached=True), 'default')
+        self.assertEqual(self.read_alias(), 'replica_1')
+
+    def test_replicas_marked_down_are_skipped(self):
+        cache.set(DOWN_KEY.format(alias='replica_1'), True)
+        self.assertEqual(self.read_alias(), 'default')
+
+
+class ReplicaMiddlewareTests(ApiTestCase):
+    @override_settings(DATABASE_REPLICAS=['replica_1'])
+    def test_writers_are_remembered(self):
+        seller, buyer = make_user('seller@example.com'), make_user('buyer@example.com')
+        prop = make_property(seller)
+        client = APIClient()
+        client.force_authenticate(buyer)
+        client.get('/api/properties/my-listings/')
+        self.assertIsNone(cache.get(RECENT_WRITE_KEY.format(user_id=buyer.pk)))
+        response = client.post('/api/leads/', {'property': prop.id, 'buyer_name': 'B', 'buyer_phone': '9812345678'})
+        self.assertEqual(response.status_code, 201)
+        self.assertTrue(cache.get(RECENT_WRITE_KEY.format(user_id=buyer.pk)))
+
+    def test_health(self):
+        response = self.client.get('/health/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {'status': 'ok', 'databases': {'default': 'ok'}})
+
+
+def reachable_routes(patterns=None, prefix=''):
+    """Every route a request can reach, outside the admin, joined the way ResolverMatch.route is."""
+    for pattern in get_resolver().url_patterns if patterns is None else patterns:
+        route = prefix + str(pattern.pattern).removeprefix('^') if prefix else str(pattern.pattern)
+        if isinstance(pattern, URLResolver):
+            if pattern.app_name != 'admin':
+                yield from reachable_routes(pattern.url_patterns, route)
+            continue
+        if 'format' in pattern.pattern.regex.groupindex:
+            continue  # DRF's .json suffixes: the same view
+        literal = route.removesuffix('$')
+        if re.fullmatch(r'[\w/-]*', literal) and resolve('/' + literal).route != route:
+            continue  # Shadowed by an earlier pattern
+        yield route
+
+
+class SeedAndBenchmarkTests(ApiTestCase):
+    def setUp(self):
+        super().setUp()
+        seed_dataset(properties=200, leads=2000, users=20, contacts=5, images_per_property=1)
+
+    def test_seed_is_skewed(self):
+        self.assertEqual((Property.objects.count(), Lead.objects.count(), PropertyImage.objects.count()), (200, 2000, 200))
+        busiest = Lead.objects.values('seller').annotate(n=Count('id')).order_by('-n').first()['n']
+        self.assertGreater(busiest, 5 * 2000 / 20)
+
+    def test_benchmark_drives_every_route(self):
+        report = run_benchmark(requests=2, warmup=0)
+        self.assertEqual(set(report['endpoints']), {endpoint.name for endpoint in ENDPOINTS})
+        self.assertEqual({name: result['errors'] for name, result in report['endpoints'].items() if result['errors']}, {})
+        self.assertGreaterEqual(report['meta']['dataset']['leads'], 2000)
+
+    def test_benchmark_covers_every_route(self):
+        values = {'property_id': 1, 'lead_id': 1, 'throwaway_id': 1, 'upload_id': uuid.uuid4(), 'media_path': 'a.jpg',
+                  'sync_token': 'x'}
+        covered = {resolve(urlsplit(endpoint.url.format(**values)).path).route for endpoint in ENDPOINTS}
+        self.assertEqual([route for route in reachable_routes() if route not in covered], [])
+
+    def test_percentile(self):
+        values = list(range(1, 101))
+        self.assertEqual((percentile(values, 50), percentile(values, 95), percentile(values, 99)), (50, 95, 99))
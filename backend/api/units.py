@@ -0,0 +1,66 @@
+import re
+from decimal import Decimal, InvalidOperation
+
+# Listings are typed by hand ("1.5 Cr", "45 Lakh", "200 gaj"), so these parsers
+# are forgiving: they return None instead of raising when a value can't be read.
+
+PRICE_UNITS = {
+    'cr': 10_000_000, 'crore': 10_000_000, 'crores': 10_000_000,
+    'l': 100_000, 'lac': 100_000, 'lacs': 100_000, 'lakh': 100_000, 'lakhs': 100_000,
+    'k': 1_000, 'thousand': 1_000,
+}
+
+# Square feet per unit. Marla/kanal use the Punjab revenue measure (1 marla = 272.25 sq ft).
+AREA_UNITS = {
+    'sqft': Decimal('1'), 'sqfeet': Decimal('1'), 'sqfoot': Decimal('1'), 'ft': Decimal('1'), 'feet': Decimal('1'),
+    'gaj': Decimal('9'), 'sqyd': Decimal('9'), 'sqyard': Decimal('9'), 'sqyards': Decimal('9'),
+    'yd': Decimal('9'), 'yard': Decimal('9'), 'yards': Decimal('9'),
+    'sqm': Decimal('10.7639'), 'sqmeter': Decimal('10.7639'), 'sqmetre': Decimal('10.7639'),
+    'marla': Decimal('272.25'), 'marlas': Decimal('272.25'),
+    'kanal': Decimal('5445'), 'kanals': Decimal('5445'),
+    'acre': Decimal('43560'), 'acres': Decimal('43560'), 'killa': Decimal('43560'), 'kila': Decimal('43560'),
+}
+
+_NUMBER_UNIT = re.compile(r'(\d+(?:\.\d+)?)\s*([a-z]*)')
+
+
+def _normalise(text):
+    text = str(text).lower().replace(',', '').replace('₹', '')
+    text = re.sub(r'\b(?:inr|rs)\.?', '', text)
+    # "sq. ft", "sq ft", "square feet" -> "sqft"
+    text = re.sub(r'sq(?:uare)?\.?\s*', 'sq', text)
+    return text.strip()
+
+
+def _parse(text, units, default_multiplier):
+    if text in (None, ''):
+        return None
+    match = _NUMBER_UNIT.search(_normalise(text))
+    if not match:
+        return None
+    try:
+        number = Decimal(match.group(1))
+    except InvalidOperation:
+        return None
+    unit = match.group(2)
+    if unit and unit not in units:
+        return None
+    return number * Decimal(units.get(unit, default_multiplier))
+
+
+def parse_price(text):
+    """'1.5 Cr' -> 15000000 rupees. Bare numbers are taken as rupees."""
+    value = _parse(text, PRICE_UNITS, 1)
+    return int(value) if value is not None else None
+
+
+def parse_area(text):
+    """'200 gaj' -> 1800 sq ft. Bare numbers are taken as sq ft."""
+    value = _parse(text, AREA_UNITS, 1)
+    return int(value.to_integral_value()) if value is not None else None
+
+
+def price_per_sqft(price_value, area_sqft):
+    if not price_value or not area_sqft:
+        return None
+    return price_value // area_sqft
@@ -0,0 +1,223 @@
+import os
+import re
+import tempfile
+import uuid
+
+from django.conf import settings
+from django.core.files import File
+from django.db import transaction
+from PIL import Image, UnidentifiedImageError
+from rest_framework import serializers
+
+from .models import PropertyImage, Upload
+
+# Chunked, resumable photo uploads, for sellers on flaky mobile connections:
+#
+#   POST   /api/uploads/                 {"filename", "size"} -> {"id", "offset": 0, "chunk_size"}
+#   PUT    /api/uploads/<id>/            body = bytes, "Content-Range: bytes <start>-<end>/<size>"
+#   GET    /api/uploads/<id>/            -> {"offset"}: where to resume after a dropped connection
+#   POST   /api/uploads/<id>/complete/   checks the image and stores it
+#
+# then create the property with upload_ids=[...]. Chunks are streamed to a
+# scratch file and only appended to the upload once they have fully arrived,
+# so a broken request never leaves half a chunk behind.
+
+CONTENT_RANGE = re.compile(r'^bytes (\d+)-(\d+)/(\d+)$')
+READ_SIZE = 64 * 1024
+# Leading bytes of the formats we accept -> stored extension
+IMAGE_SIGNATURES = [
+    (b'\xff\xd8\xff', '.jpg'),
+    (b'\x89PNG\r\n\x1a\n', '.png'),
+    (b'GIF87a', '.gif'),
+    (b'GIF89a', '.gif'),
+]
+
+
+class UploadError(Exception):
+    def __init__(self, message, status=400, offset=None):
+        super().__init__(message)
+        self.message, self.status, self.offset = message, status, offset
+
+
+def max_upload_size():
+    return getattr(settings, 'UPLOAD_MAX_SIZE', 20 * 1024 * 1024)
+
+
+def chunk_size():
+    return getattr(settings, 'UPLOAD_CHUNK_SIZE', 1024 * 1024)
+
+
+def upload_dir():
+    # Shared by every worker that can receive a chunk; never under MEDIA_ROOT, which is public
+    path = getattr(settings, 'UPLOAD_TEMP_DIR', None) or os.path.join(tempfile.gettempdir(), 'sangrurestate-uploads')
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def partial_path(upload):
+    return os.path.join(upload_dir(), f'{upload.id}.part')
+
+
+def image_extension(head):
+    for signature, extension in IMAGE_SIGNATURES:
+        if head.startswith(signature):
+            return extension
+    if head[:4] == b'RIFF' and head[8:12] == b'WEBP':
+        return '.webp'
+    return None
+
+
+def checked_image_extension(handle):
+    """The extension for the image in `handle` (from its content, not its name), or None if it isn't a readable image."""
+    extension = image_extension(handle.read(16))
+    if extension is None:
+        return None
+    handle.seek(0)
+    try:
+        with Image.open(handle) as image:
+            image.verify()
+    except (UnidentifiedImageError, OSError, SyntaxError, ValueError):
+        return None
+    finally:
+        handle.seek(0)
+    return extension
+
+
+def checked_photo(file):
+    """
+    An uploaded file (UploadedFile), renamed after the image type in its
+    content; ValidationError if it's too big or not a photo we take.
+    """
+    if file.size > max_upload_size():
+        raise serializers.ValidationError(f'Photos can be at most {max_upload_size() // (1024 * 1024)} MB.')
+    extension = checked_image_extension(file)
+    if extension is None:
+        raise serializers.ValidationError('Only JPEG, PNG, GIF and WebP photos can be uploaded.')
+    file.name = f'photo{extension}'
+    return file
+
+
+def start_upload(user, filename, size):
+    try:
+        size = int(size)
+    except (TypeError, ValueError):
+        raise UploadError('size must be the file size in bytes.')
+    if size <= 0:
+        raise UploadError('size must be the file size in bytes.')
+    if size > max_upload_size():
+        raise UploadError(f'Photos can be at most {max_upload_size() // (1024 * 1024)} MB.', status=413)
+    if Upload.objects.filter(owner=user, status=Upload.UPLOADING).count() >= getattr(settings, 'UPLOAD_MAX_OPEN', 50):
+        raise UploadError('Too many unfinished uploads; finish or cancel some first.', status=429)
+    upload = Upload.objects.create(owner=user, filename=str(filename or 'photo')[:255], size=size)
+    open(partial_path(upload), 'wb').close()
+    return upload
+
+
+def receive_chunk(upload, content_range, content_length, stream):
+    """Append one chunk read from `stream`; returns the new offset."""
+    match = CONTENT_RANGE.match(content_range or '')
+    if not match:
+        raise UploadError('Send a "Content-Range: bytes <start>-<end>/<size>" header.')
+    start, end, total = map(int, match.groups())
+    length = end - start + 1
+    if total != upload.size or end >= upload.size or length <= 0:
+        raise UploadError(f'The range must lie inside the declared size ({upload.size} bytes).', status=416)
+    if length > chunk_size():
+        raise UploadError(f'Chunks can be at most {chunk_size()} bytes.', status=413)
+    if content_length != length:
+        raise UploadError('Content-Length does not match the Content-Range.')
+    if upload.status != Upload.UPLOADING:
+        raise UploadError('This upload is already complete.', status=409, offset=upload.received)
+    if start != upload.received:
+        # Usually a retry of a chunk that did arrive: tell the client where to carry on
+        raise UploadError(f'Expected the chunk at offset {upload.received}.', status=409, offset=upload.received)
+
+    scratch = os.path.join(upload_dir(), f'{upload.id}.{uuid.uuid4().hex}.chunk')
+    try:
+        with open(scratch, 'wb') as handle:
+            remaining = length
+            while remaining:
+                data = stream.read(min(READ_SIZE, remaining))
+                if not data:
+                    raise UploadError('The chunk was cut short; resend it.', offset=upload.received)
+                if remaining == length and start == 0 and image_extension(data[:16]) is None:
+                    # Checked on the first bytes, before the rest of the file is sent
+                    raise UploadError('Only JPEG, PNG, GIF and WebP photos can be uploaded.', status=415)
+                handle.write(data)
+                remaining -= len(data)
+
+        with transaction.atomic():
+            # Another request may have delivered this chunk while we were reading ours
+            locked = Upload.objects.select_for_update().get(pk=upload.pk)
+            if locked.status != Upload.UPLOADING or locked.received != start:
+                raise UploadError(f'Expected the chunk at offset {locked.received}.', status=409, offset=locked.received)
+            with open(partial_path(locked), 'r+b') as target, open(scratch, 'rb') as source:
+                target.seek(start)
+                target.truncate()
+                while data := source.read(READ_SIZE):
+                    target.write(data)
+            locked.received = end + 1
+            locked.save(update_fields=['received', 'updated_at'])
+    finally:
+        if os.path.exists(scratch):
+            os.remove(scratch)
+    upload.received = end + 1
+    return upload.received
+
+
+def complete_upload(upload):
+    """Check the assembled file is a real image and store it (content-addressed)."""
+    with transaction.atomic():
+        upload = Upload.objects.select_for_update().get(pk=upload.pk)
+        if upload.status == Upload.COMPLETE:
+            return upload
+        if upload.received != upload.size:
+            raise UploadError(f'Only {upload.received} of {upload.size} bytes have arrived.', status=409,
+                              offset=upload.received)
+        path = partial_path(upload)
+        with open(path, 'rb') as handle:
+            extension = checked_image_extension(handle)
+            if extension is None:
+                raise UploadError('The file is not a readable image.', status=415)
+            upload.file.save(f'photo{extension}', File(handle), save=False)
+        upload.status = Upload.COMPLETE
+        upload.save(update_fields=['file', 'status', 'updated_at'])
+    os.remove(path)
+    return upload
+
+
+def cancel_upload(upload):
+    path = partial_path(upload)
+    upload.delete()
+    if os.path.exists(path):
+        os.remove(path)
+
+
+def attach_uploads(prop, user, upload_ids):
+    """
+    Create PropertyImages for finished uploads, in the order given. The file
+    is already in storage, so this only writes rows. Call inside the
+    transaction that creates the property.
+    """
+    wanted, valid = [], []
+    for upload_id in upload_ids:
+        try:
+            parsed = uuid.UUID(str(upload_id))
+        except ValueError:
+            wanted.append(str(upload_id))
+            continue
+        valid.append(parsed)
+        wanted.append(str(parsed))
+    wanted = list(dict.fromkeys(wanted))
+    found = Upload.objects.select_for_update().filter(owner=user, status=Upload.COMPLETE, id__in=valid)
+    uploads = {str(upload.id): upload for upload in found}
+    missing = [upload_id for upload_id in wanted if upload_id not in uploads]
+    if missing:
+        raise serializers.ValidationError({'upload_ids': f"Unknown or unfinished upload(s): {', '.join(missing)}"})
+
+    images = PropertyImage.objects.bulk_create(
+        [PropertyImage(property=prop, image=uploads[upload_id].file.name) for upload_id in wanted]
+    )
+    # The PropertyImage owns the file now
+    Upload.objects.filter(id__in=wanted).delete()
+    return images
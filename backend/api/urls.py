@@ -1,6 +1,7 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import PropertyViewSet, LeadViewSet, RegisterView, ContactViewSet, ManageUserView, SellerLeadsView,get_profile, get_properties, create_property, get_my_listings, get_my_interests, submit_lead
+from .views import PropertyViewSet, LeadViewSet, RegisterView, ContactViewSet, ManageUserView, SellerLeadsView, export_seller_leads, seller_lead_stats, get_profile, get_properties, search_properties, create_property, import_properties, get_my_listings, get_my_interests, get_dashboard, batch_requests, submit_lead, get_cache_stats, create_upload, upload_detail, finish_upload, property_changes
+from . import async_views
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 
 router = DefaultRouter()
@@ -10,9 +11,17 @@ router.register(r'contact', ContactViewSet)
 
 urlpatterns = [
     path('properties/', get_properties, name='get_properties'),
+    path('properties/search/', search_properties, name='search_properties'),
+    path('properties/changes/', property_changes, name='property_changes'),
     path('properties/create/', create_property, name='create_property'),
+    path('properties/import/', import_properties, name='import_properties'),
     path('properties/my-listings/', get_my_listings, name='my_listings'),
     path('leads/my-interests/', get_my_interests, name='my_interests'),
+    path('dashboard/', get_dashboard, name='dashboard'),
+    path('batch/', batch_requests, name='batch'),
+    path('uploads/', create_upload, name='create_upload'),
+    path('uploads/<uuid:pk>/', upload_detail, name='upload_detail'),
+    path('uploads/<uuid:pk>/complete/', finish_upload, name='finish_upload'),
     path('', include(router.urls)),
     path('register/', RegisterView.as_view(), name='register'),
     path('login/', TokenObtainPairView.as_view(), name='token_obtain_pair'), # Returns access/refresh tokens
@@ -21,6 +30,8 @@ urlpatterns = [
 
     path('users/me/', ManageUserView.as_view(), name='me'),
     path('seller/leads/', SellerLeadsView.as_view(), name='seller-leads'),
+    path('seller/leads/export/', export_seller_leads, name='seller-leads-export'),
+    path('seller/leads/stats/', seller_lead_stats, name='seller-leads-stats'),
 
     
     # path('properties/<int:pk>/', get_property_detail, name='property_detail'),
@@ -28,5 +39,13 @@ urlpatterns = [
 
 
     path('leads/', submit_lead, name='submit_lead'),
+    path('cache/stats/', get_cache_stats, name='cache_stats'),
+
+    # Async versions of the hot reads (serve with an ASGI server, see core/asgi.py)
+    path('async/properties/', async_views.property_list, name='async_properties'),
+    path('async/properties/search/', async_views.property_search, name='async_search_properties'),
+    path('async/properties/<int:pk>/', async_views.property_detail, name='async_property_detail'),
+    path('async/properties/my-listings/', async_views.my_listings, name='async_my_listings'),
+    path('async/leads/my-interests/', async_views.my_interests, name='async_my_interests'),
 
 ]
\ No newline at end of file
@@ -1,14 +1,35 @@
+import csv
+import zipfile
 from rest_framework import viewsets, permissions, status, mixins, generics
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework.parsers import MultiPartParser, FormParser
-from .models import Property, Lead, Contact, PropertyImage
+from .models import Property, Lead, Contact, PropertyImage, LeadDailyStat
+from .serializers import PROPERTY_CARD_FIELDS, sparse_property_fields
 from .serializers import PropertySerializer, LeadSerializer, RegisterSerializer, ContactSerializer, UserProfileSerializer, DashboardPropertySerializer, MyInterestSerializer
 from rest_framework.permissions import IsAuthenticated
 from .serializers import UserSerializer
-from rest_framework.decorators import api_view, permission_classes, parser_classes
+from rest_framework.decorators import api_view, permission_classes, parser_classes, renderer_classes, throttle_classes
 from rest_framework.permissions import AllowAny
-from django.db.models import Count
+from django.db import transaction
+from django.db.models import Sum
+from .filters import filter_properties, property_ordering, filter_created_between, filter_days_between
+from .pagination import KeysetPagination, nulls_last_order
+from .search import text_search
+from .jobs import enqueue, enqueue_many
+from .importer import ImportAborted, import_file
+from .exports import LEAD_EXPORT_FORMATS
+from django.http import StreamingHttpResponse
+from .batch import MAX_BATCH_CALLS, run_call
+from .cache import CachedReadMixin, cache_public_read, cache_stats, invalidate_properties
+from .fast import FAST_RENDERERS, property_rows, values_rows
+from .models import Upload
+from .replicas import ReplicaReadMixin, replica_reads
+from .sync import property_changes as sync_changes
+from .submissions import CONTACT_THROTTLES, LEAD_THROTTLES, SubmissionInProgress, submit_contact_once, submit_lead_once
+from .uploads import UploadError, attach_uploads, cancel_upload, checked_photo, chunk_size, complete_upload, receive_chunk, start_upload
+from rest_framework.permissions import IsAdminUser
 
 class ManageUserView(APIView):
     permission_classes = [IsAuthenticated]
@@ -36,10 +57,32 @@ class RegisterView(APIView):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 # 2. Property ViewSet (Handles GET, POST, DELETE automatically)
-class PropertyViewSet(viewsets.ModelViewSet):
-    queryset = Property.objects.all().order_by('-created_at')
+class PropertyViewSet(CachedReadMixin, ReplicaReadMixin, viewsets.ModelViewSet):
+    queryset = Property.objects.with_card_data().order_by('-created_at')
     serializer_class = PropertySerializer
     parser_classes = (MultiPartParser, FormParser) # To handle image uploads
+    cache_namespace = 'properties'
+    replica_cached = True
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action == 'list':
+            queryset = filter_properties(queryset, self.request.query_params)
+            queryset = queryset.order_by(*nulls_last_order(property_ordering(self.request.query_params)))
+        return queryset
+
+    @property
+    def keyset_ordering(self):
+        # Pages follow the ?sort= the list was asked for (api/pagination.py)
+        return property_ordering(self.request.query_params)
+
+    def get_serializer(self, *args, **kwargs):
+        # Lists send card-sized rows, detail the full shape; both take ?fields= / ?expand=images
+        if self.action == 'list':
+            kwargs['fields'] = sparse_property_fields(self.request.query_params, PROPERTY_CARD_FIELDS)
+        elif self.action == 'retrieve':
+            kwargs['fields'] = sparse_property_fields(self.request.query_params)
+        return super().get_serializer(*args, **kwargs)
 
     def get_permissions(self):
         if self.action in ['list', 'retrieve']:
@@ -52,26 +95,116 @@ class PropertyViewSet(viewsets.ModelViewSet):
 
 # 3. Lead ViewSet
 class LeadViewSet(viewsets.ModelViewSet):
-    queryset = Lead.objects.all()
+    queryset = Lead.objects.order_by('-created_at', '-id')
     serializer_class = LeadSerializer
     permission_classes = [permissions.AllowAny] # Allow public to submit leads
+    throttle_classes = LEAD_THROTTLES
+
+    def create(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        prop = serializer.validated_data.get('property')
+
+        def create_lead():
+            self.perform_create(serializer)
+            return serializer.instance
+
+        try:
+            lead, created = submit_lead_once(
+                request, prop.id if prop else None, serializer.validated_data['buyer_phone'], create_lead,
+            )
+        except SubmissionInProgress:
+            return Response({"error": "This request is already being submitted."}, status=409)
+        if not created:
+            # A retry or double tap: the lead that already exists
+            return Response(self.get_serializer(lead).data, status=status.HTTP_200_OK)
+        return Response(serializer.data, status=status.HTTP_201_CREATED, headers=self.get_success_headers(serializer.data))
+
+    def perform_create(self, serializer):
+        # Same links as submit_lead, so seller dashboards can filter on seller directly
+        prop = serializer.validated_data.get('property')
+        lead = serializer.save(
+            seller=prop.owner if prop else None,
+            buyer=self.request.user if self.request.user.is_authenticated else None,
+        )
+        enqueue('notify_seller_of_lead', lead_id=lead.id)
 
 
 class ContactViewSet(mixins.CreateModelMixin, viewsets.GenericViewSet):
     queryset = Contact.objects.all()
     serializer_class = ContactSerializer
     permission_classes = [permissions.AllowAny] # Allow anyone to submit a form
+    throttle_classes = CONTACT_THROTTLES
+
+    def create(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        try:
+            contact, created = submit_contact_once(request, serializer.validated_data, serializer.save)
+        except SubmissionInProgress:
+            return Response({"error": "This message is already being sent."}, status=409)
+        return Response(self.get_serializer(contact).data, status=status.HTTP_201_CREATED if created else status.HTTP_200_OK)
 
 
 class SellerLeadsView(generics.ListAPIView):
     serializer_class = LeadSerializer
     permission_classes = [IsAuthenticated]
+    renderer_classes = FAST_RENDERERS
 
     def get_queryset(self):
-        # This logic finds leads for all properties 
-        # submitted by the logged-in user
-        return Lead.objects.filter(property__submitted_by=self.request.user).order_by('-created_at')
-    
+        # Leads for all properties submitted by the logged-in user.
+        # Every lead is stamped with the property owner as seller (backfilled
+        # in migration 0009), so this walks the (seller, created_at) index.
+        leads = Lead.objects.filter(seller=self.request.user)
+        return filter_created_between(leads, self.request.query_params).order_by('-created_at', '-id')
+
+    def list(self, request, *args, **kwargs):
+        # Read-only rows straight from .values(), same output as LeadSerializer (api/fast.py)
+        serializer = self.get_serializer()
+        leads = self.filter_queryset(self.get_queryset())
+        if self.paginator is None:
+            return Response(values_rows(serializer, leads))
+        rows = self.paginator.paginate_rows(
+            leads, request, lambda page, keys: values_rows(serializer, page, keys=keys), view=self,
+        )
+        return self.get_paginated_response(rows)
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def export_seller_leads(request):
+    # Streams the seller's leads as CSV (default) or NDJSON: ?output=ndjson&since=2026-01-01&until=2026-01-31
+    # ('format' is taken by DRF's content negotiation, hence 'output')
+    output = request.query_params.get('output', 'csv')
+    if output not in LEAD_EXPORT_FORMATS:
+        return Response({"error": f"output must be one of: {', '.join(LEAD_EXPORT_FORMATS)}"}, status=400)
+    stream, content_type = LEAD_EXPORT_FORMATS[output]
+
+    leads = Lead.objects.filter(seller=request.user)
+    leads = filter_created_between(leads, request.query_params).order_by('-created_at', '-id')
+
+    response = StreamingHttpResponse(stream(leads), content_type=content_type)
+    response['Content-Disposition'] = f'attachment; filename="leads.{output}"'
+    return response
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def seller_lead_stats(request):
+    # Leads per day across the seller's listings (or one, with ?property=),
+    # summed from the daily rollup rows instead of counting leads
+    stats = filter_days_between(LeadDailyStat.objects.filter(seller=request.user), request.query_params)
+    property_id = request.query_params.get('property')
+    if property_id:
+        if not property_id.isdigit():
+            return Response({"error": "property must be an id"}, status=400)
+        stats = stats.filter(property_id=property_id)
+    days = list(stats.values('day').annotate(leads=Sum('leads'), new_leads=Sum('new_leads')).order_by('day'))
+    return Response({
+        "days": days,
+        "leads": sum(day['leads'] for day in days),
+        "new_leads": sum(day['new_leads'] for day in days),
+    })
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
@@ -85,12 +218,66 @@ def get_profile(request):
 
 # --- PROPERTY ENDPOINTS ---
 
+def property_list_queryset(params, fields=None):
+    properties = filter_properties(Property.objects.with_card_data(fields), params)
+    return properties.order_by(*nulls_last_order(property_ordering(params)))
+
+def property_search_queryset(params, fields=None):
+    # Returns (queryset, keyset ordering)
+    properties = filter_properties(Property.objects.all(), params)
+    properties = properties.with_card_data(fields)
+    ordering = property_ordering(params)
+
+    # Free-text search: ranked by relevance unless the client picked a sort
+    q = (params.get('q') or '').strip()
+    if q:
+        properties = text_search(properties, q)
+        if 'sort' not in params:
+            ordering = ('-rank', '-id')
+    return properties, ordering
+
 @api_view(['GET'])
 @permission_classes([AllowAny])
+@renderer_classes(FAST_RENDERERS)
+@cache_public_read('get_properties')
+@replica_reads(cached=True)
 def get_properties(request):
-    properties = Property.objects.all().order_by('-created_at')
-    serializer = PropertySerializer(properties, many=True)
-    return Response(serializer.data)
+    # Card-sized rows, a page at a time; ?fields= / ?expand=images for more
+    fields = sparse_property_fields(request.query_params, PROPERTY_CARD_FIELDS)
+    properties = property_list_queryset(request.query_params, fields)
+    ordering = property_ordering(request.query_params)
+    paginator = KeysetPagination()
+    if 'images' in fields:
+        page = paginator.paginate_queryset(properties, request, ordering=ordering)
+        return paginator.get_paginated_response(PropertySerializer(page, many=True, fields=fields).data)
+    # Without nested images the rows come straight from .values() (api/fast.py)
+    rows = paginator.paginate_rows(
+        properties, request, lambda page, keys: property_rows(page, fields, keys), ordering=ordering,
+    )
+    return paginator.get_paginated_response(rows)
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+@cache_public_read('search_properties')
+@replica_reads(cached=True)
+def search_properties(request):
+    # Filtering and paging happen in the database, so the response size
+    # stays the same no matter how many listings exist
+    fields = sparse_property_fields(request.query_params, PROPERTY_CARD_FIELDS)
+    properties, ordering = property_search_queryset(request.query_params, fields)
+    paginator = KeysetPagination()
+    page = paginator.paginate_queryset(properties, request, ordering=ordering)
+    serializer = PropertySerializer(page, many=True, fields=fields)
+    return paginator.get_paginated_response(serializer.data)
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+@renderer_classes(FAST_RENDERERS)
+@cache_public_read('property_changes')
+def property_changes(request):
+    # Delta sync: only listings created, updated or deleted since ?since=<sync_token> (api/sync.py)
+    fields = sparse_property_fields(request.query_params, PROPERTY_CARD_FIELDS)
+    return Response(sync_changes(request, fields))
 
 @api_view(['POST'])
 @permission_classes([IsAuthenticated]) # Must be logged in to post
@@ -100,69 +287,218 @@ def create_property(request):
     # but manually saving owner is easier here:
     
     data = request.data
-    images = request.FILES.getlist('uploaded_images')
-
-    # Create Property Object
-    new_property = Property.objects.create(
-        owner=request.user,  # <--- SAVE THE OWNER
-        title=data.get('title'),
-        price=data.get('price'),
-        location=data.get('location'),
-        colony=data.get('colony'),
-        type=data.get('type'),
-        area=data.get('area'),
-        beds=data.get('beds') if data.get('beds') else None,
-        baths=data.get('baths') if data.get('baths') else None,
-        description=data.get('description'),
-        status='Available'
-    )
+    # bulk_create below skips the ImageField's checks, so every file is checked here
+    try:
+        images = [checked_photo(image) for image in request.FILES.getlist('uploaded_images')]
+    except ValidationError as error:
+        return Response({"uploaded_images": error.detail}, status=400)
 
-    # Save Images
-    for image in images:
-        PropertyImage.objects.create(property=new_property, image=image)
+    # One transaction: a failure can't leave a property without its images
+    with transaction.atomic():
+        # Create Property Object
+        new_property = Property.objects.create(
+            owner=request.user,  # <--- SAVE THE OWNER
+            title=data.get('title'),
+            price=data.get('price'),
+            location=data.get('location'),
+            colony=data.get('colony'),
+            type=data.get('type'),
+            area=data.get('area'),
+            beds=data.get('beds') or 0, # Plots have no beds/baths
+            baths=data.get('baths') or 0,
+            description=data.get('description'),
+            status='Available'
+        )
+
+        # Save Images in one INSERT; resizing happens in the background worker.
+        # Photos sent ahead through the chunked upload API come as upload_ids
+        property_images = PropertyImage.objects.bulk_create(
+            [PropertyImage(property=new_property, image=image) for image in images]
+        )
+        property_images += attach_uploads(new_property, request.user, data.getlist('upload_ids'))
+        enqueue_many('process_property_image', [{'image_id': image.id} for image in property_images])
+        transaction.on_commit(invalidate_properties) # bulk_create sends no post_save
 
     return Response({"message": "Property created successfully", "id": new_property.id})
 
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+@parser_classes([MultiPartParser])
+def import_properties(request):
+    # Bulk import for agencies: a CSV/JSON/JSON-lines file, or a zip of one plus its images
+    upload = request.FILES.get('file')
+    if upload is None:
+        return Response({"error": "Upload the listings as 'file'."}, status=400)
+    dry_run = request.data.get('dry_run') in ('1', 'true', 'True')
+    try:
+        report = import_file(upload, upload.name, request.user, dry_run=dry_run)
+    except ImportAborted as exc:
+        # Earlier batches are committed: say which listings exist now
+        return Response({"error": str(exc), **exc.report}, status=400)
+    except (ValueError, UnicodeDecodeError, csv.Error, zipfile.BadZipFile) as exc:
+        return Response({"error": str(exc)}, status=400)
+    return Response(report)
+
 # --- DASHBOARD ENDPOINTS (NEW) ---
 
+def my_listings_queryset(user):
+    # Lead counts are stored on the property (api/counters.py), so this is one
+    # walk of the (owner, created_at) index with no aggregation
+    return (
+        Property.objects.filter(owner=user)
+        .prefetch_related(Property.ordered_images())
+        .order_by('-created_at', '-id')
+    )
+
+def my_interests_queryset(user):
+    return Lead.objects.filter(buyer=user).select_related('property').order_by('-created_at', '-id')
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@replica_reads()
 def get_my_listings(request):
-    # Fetch properties owned by current user AND count their leads
-    properties = Property.objects.filter(owner=request.user).annotate(leads_count=Count('leads')).order_by('-created_at')
-    serializer = DashboardPropertySerializer(properties, many=True)
-    return Response(serializer.data)
+    # Fetch properties owned by current user with their lead counts
+    paginator = KeysetPagination()
+    page = paginator.paginate_queryset(my_listings_queryset(request.user), request)
+    return paginator.get_paginated_response(DashboardPropertySerializer(page, many=True).data)
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@renderer_classes(FAST_RENDERERS)
+@replica_reads()
 def get_my_interests(request):
-    # FILTER BY BUYER (The new field)
-    leads = Lead.objects.filter(buyer=request.user).select_related('property').order_by('-created_at')
-    serializer = MyInterestSerializer(leads, many=True)
-    return Response(serializer.data)
+    # FILTER BY BUYER (The new field); MyInterestSerializer's output, built from .values()
+    serializer = MyInterestSerializer()
+    paginator = KeysetPagination()
+    rows = paginator.paginate_rows(
+        my_interests_queryset(request.user), request, lambda page, keys: values_rows(serializer, page, keys=keys),
+    )
+    return paginator.get_paginated_response(rows)
+
+def _dashboard_section(request, name, queryset, serializer_class):
+    # ?<name>_page_size= / ?<name>_cursor= page through one section
+    paginator = KeysetPagination()
+    paginator.page_size_query_param = f'{name}_page_size'
+    paginator.cursor_query_param = f'{name}_cursor'
+    page = paginator.paginate_queryset(queryset, request)
+    return {"next": paginator.get_next_link(), "results": serializer_class(page, many=True).data}
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+@replica_reads()
+def get_dashboard(request):
+    # Profile, listings and interests in one round trip (one JWT check, one user lookup)
+    return Response({
+        "profile": UserProfileSerializer(request.user).data,
+        "listings": _dashboard_section(request, 'listings', my_listings_queryset(request.user), DashboardPropertySerializer),
+        "interests": _dashboard_section(request, 'interests', my_interests_queryset(request.user), MyInterestSerializer),
+    })
+
+# --- BATCH ---
+
+@api_view(['POST'])
+@permission_classes([AllowAny])
+def batch_requests(request):
+    # {"calls": [{"method": "GET", "url": "/api/profile/"}, ...]} -> {"responses": [...]} in the same order.
+    # Each call runs with the caller's credentials and keeps its own status code
+    calls = request.data.get('calls') if isinstance(request.data, dict) else None
+    if not isinstance(calls, list) or not calls:
+        return Response({"error": "Send a non-empty 'calls' list."}, status=400)
+    if len(calls) > MAX_BATCH_CALLS:
+        return Response({"error": f"At most {MAX_BATCH_CALLS} calls per batch."}, status=400)
+    return Response({"responses": [run_call(request, call) for call in calls]})
+
+batch_requests.batchable = False
 
 # --- LEAD ENDPOINTS ---
 
 @api_view(['POST'])
 @permission_classes([AllowAny])
+@throttle_classes(LEAD_THROTTLES)
 def submit_lead(request):
     data = request.data
-    try:
-        property_instance = Property.objects.get(id=data.get('property'))
-        
-        # Determine Buyer (User object or None)
-        buyer_user = request.user if request.user.is_authenticated else None
-        
-        # Determine Seller (The owner of the property)
-        seller_user = property_instance.owner
-
-        Lead.objects.create(
-            property=property_instance,
-            buyer=buyer_user,       # Save the logged-in buyer
-            seller=seller_user,     # Save the property owner
+    property_id = str(data.get('property') or '')
+    if not data.get('buyer_name') or not data.get('buyer_phone'):
+        return Response({"error": "buyer_name and buyer_phone are required"}, status=400)
+
+    # Only the owner id is needed, not the whole listing row
+    owner_id = Property.objects.filter(id=property_id).values_list('owner_id', flat=True).first() if property_id.isdigit() else None
+    if owner_id is None:
+        return Response({"error": "Property not found"}, status=404)
+
+    def create_lead():
+        return Lead.objects.create(
+            property_id=property_id,
+            buyer=request.user if request.user.is_authenticated else None, # Save the logged-in buyer
+            seller_id=owner_id,     # Save the property owner
             buyer_name=data.get('buyer_name'),
             buyer_phone=data.get('buyer_phone')
         )
-        return Response({"message": "Lead submitted successfully"})
-    except Property.DoesNotExist:
-        return Response({"error": "Property not found"}, status=404)
\ No newline at end of file
+
+    try:
+        lead, created = submit_lead_once(request, property_id, data.get('buyer_phone'), create_lead)
+    except SubmissionInProgress:
+        return Response({"error": "This request is already being submitted."}, status=409)
+    if created:
+        enqueue('notify_seller_of_lead', lead_id=lead.id)
+    return Response({"message": "Lead submitted successfully", "id": lead.id})
+
+# --- CHUNKED PHOTO UPLOADS (see api/uploads.py) ---
+
+def _upload_error(error):
+    body = {"error": error.message}
+    if error.offset is not None:
+        body["offset"] = error.offset
+    return Response(body, status=error.status)
+
+def _upload_state(upload):
+    return {
+        "id": upload.id, "filename": upload.filename, "size": upload.size, "offset": upload.received,
+        "status": upload.status, "chunk_size": chunk_size(),
+    }
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def create_upload(request):
+    try:
+        upload = start_upload(request.user, request.data.get('filename'), request.data.get('size'))
+    except UploadError as error:
+        return _upload_error(error)
+    return Response(_upload_state(upload), status=201)
+
+@api_view(['GET', 'PUT', 'DELETE'])
+@permission_classes([IsAuthenticated])
+def upload_detail(request, pk):
+    upload = Upload.objects.filter(owner=request.user, pk=pk).first()
+    if upload is None:
+        return Response({"error": "Upload not found"}, status=404)
+    if request.method == 'DELETE':
+        cancel_upload(upload)
+        return Response(status=204)
+    if request.method == 'PUT':
+        # The body is the raw chunk, read straight off the connection
+        try:
+            content_length = int(request.META.get('CONTENT_LENGTH') or 0)
+            receive_chunk(upload, request.headers.get('Content-Range'), content_length, request.stream)
+        except UploadError as error:
+            return _upload_error(error)
+    return Response(_upload_state(upload))
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def finish_upload(request, pk):
+    upload = Upload.objects.filter(owner=request.user, pk=pk).first()
+    if upload is None:
+        return Response({"error": "Upload not found"}, status=404)
+    try:
+        upload = complete_upload(upload)
+    except UploadError as error:
+        return _upload_error(error)
+    return Response(_upload_state(upload))
+
+# --- CACHE STATS (staff only) ---
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def get_cache_stats(request):
+    return Response(cache_stats())
@@ -5,6 +5,24 @@ It exposes the ASGI callable as a module-level variable named ``application``.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
+
+Serving with ASGI
+-----------------
+The Procfile runs the WSGI app (core/wsgi.py). Every endpoint works under
+ASGI too, and the async read endpoints under /api/async/ (api/async_views.py)
+only pay off there: a worker keeps serving other requests while one waits on
+the database instead of blocking on it. Supported configuration:
+
+    web: gunicorn core.asgi:application -k uvicorn_worker.UvicornWorker -w 2 --log-file -
+
+with DB_POOL=True (or DB_CONN_MAX_AGE=0). Under ASGI each request runs its
+ORM calls on its own thread, so per-thread persistent connections are never
+reused and would pile up; the pool (see core/settings.py) hands connections
+from one shared set to whichever thread needs one. Sync views still work,
+each one on a thread from the worker's pool.
+
+To compare the two, run both servers against the same database and use
+`python manage.py bench_concurrency --sync-url ... --async-url ...`.
 """
 
 import os
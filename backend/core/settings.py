@@ -12,6 +12,7 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 
 from pathlib import Path
 import dj_database_url
+import logging
 import os
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -37,6 +38,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     # Third party
     'rest_framework',
     'corsheaders',
@@ -47,6 +49,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'api.metrics.ProfilingMiddleware', # First, so it times everything below it
+    'api.replicas.ReplicaMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
@@ -80,27 +84,127 @@ WSGI_APPLICATION = 'core.wsgi.application'
 
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
-# PRINT DEBUG INFO TO LOGS
-print("--- DATABASE DEBUGGING ---")
 db_url = os.environ.get('DATABASE_URL')
-if db_url:
-    print(f"FOUND DATABASE_URL: {db_url[:15]}...") # Print first 15 chars for safety
-else:
-    print("WARNING: DATABASE_URL is missing! Falling back to localhost.")
-print("--------------------------")
+if not db_url:
+    # LOGGING isn't set up yet at this point; warnings still reach stderr
+    logging.getLogger('core.settings').warning('DATABASE_URL is missing, falling back to localhost.')
+if 'RAILWAY_ENVIRONMENT' in os.environ and not db_url:
+    logging.getLogger('core.settings').critical('Running on Railway but DATABASE_URL is missing.')
+
+# DB_POOL=True keeps a pool of connections per process (Django's psycopg 3
+# pool) instead of one persistent connection per thread. Use it under ASGI,
+# where per-thread connections are never reused (see core/asgi.py).
+DB_POOL = os.environ.get('DB_POOL', 'False') == 'True'
+
+def database(url):
+    pooled = DB_POOL and url.startswith(('postgres', 'postgis'))
+    config = dj_database_url.parse(
+        url,
+        # The pool manages connection lifetimes itself. Otherwise set
+        # DB_CONN_MAX_AGE=0 under ASGI (see core/asgi.py)
+        conn_max_age=0 if pooled else int(os.environ.get('DB_CONN_MAX_AGE', 600)),
+        # A reused connection (persistent, or from the pool) is checked before use,
+        # so one the server dropped is replaced instead of failing the request
+        conn_health_checks=True,
+    )
+    if pooled:
+        config.setdefault('OPTIONS', {})['pool'] = {
+            'min_size': int(os.environ.get('DB_POOL_MIN_SIZE', 2)),
+            'max_size': int(os.environ.get('DB_POOL_MAX_SIZE', 10)),
+            'timeout': int(os.environ.get('DB_POOL_TIMEOUT', 10)), # Seconds to wait for a free connection
+        }
+    return config
+
 DATABASES = {
-    'default': dj_database_url.config(
-        # 1. Try to read DATABASE_URL from the environment (Railway)
-        default= os.environ.get('DATABASE_URL') or 
-        
-        # 2. If not found, use your Local Postgres credentials
-        f"postgres://postgres:{'' if not 'PASSWORD' in os.environ else os.environ['PASSWORD']}@localhost:5432/sangrur_estate_db",
-        
-        conn_max_age=600
+    # 1. DATABASE_URL from the environment (Railway)
+    # 2. If not found, your Local Postgres credentials
+    'default': database(
+        db_url or f"postgres://postgres:{'' if not 'PASSWORD' in os.environ else os.environ['PASSWORD']}@localhost:5432/sangrur_estate_db"
     )
 }
-if 'RAILWAY_ENVIRONMENT' in os.environ and not db_url:
-     print("CRITICAL ERROR: Running on Railway but DATABASE_URL is missing.")
+
+# Read replicas (api/replicas.py): comma-separated URLs, e.g.
+# DATABASE_REPLICA_URLS=postgres://...@replica-1/db,postgres://...@replica-2/db
+# Public listing reads and dashboards go to them; writes and everything else
+# to the primary. Locally, a copy of an SQLite file can stand in for one.
+DATABASE_REPLICAS = []
+for number, url in enumerate(filter(None, os.environ.get('DATABASE_REPLICA_URLS', '').split(',')), 1):
+    alias = f'replica_{number}'
+    DATABASES[alias] = database(url.strip())
+    DATABASES[alias]['TEST'] = {'MIRROR': 'default'} # Tests read what they wrote
+    DATABASE_REPLICAS.append(alias)
+DATABASE_ROUTERS = ['api.replicas.PrimaryReplicaRouter']
+# After a user writes (or any listing changes), reads stay on the primary this
+# many seconds, longer than the replicas usually lag
+REPLICA_READ_YOUR_WRITES = int(os.environ.get('REPLICA_READ_YOUR_WRITES', 10))
+REPLICA_DOWN_SECONDS = int(os.environ.get('REPLICA_DOWN_SECONDS', 30)) # A replica /health/ can't reach is skipped this long
+
+# Cache (public property responses, see api/cache.py)
+# Set REDIS_URL to share the cache (and its invalidation) between workers;
+# otherwise each process keeps its own.
+if os.environ.get('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ['REDIS_URL'],
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+PROPERTY_CACHE_TIMEOUT = int(os.environ.get('PROPERTY_CACHE_TIMEOUT', 300))
+# Authenticated users are cached this long. Changes invalidate at once with
+# Redis; with the per-process cache other workers can lag by up to this much.
+AUTH_USER_CACHE_TIMEOUT = int(os.environ.get('AUTH_USER_CACHE_TIMEOUT', 60))
+
+# Request profiling (api/metrics.py)
+METRICS_ENABLED = os.environ.get('METRICS_ENABLED', 'True') == 'True'
+# Adds a Server-Timing header (total/db/serialize/app) to every response
+METRICS_SERVER_TIMING = os.environ.get('METRICS_SERVER_TIMING', 'False') == 'True'
+# Prometheus scrapes /metrics/ with "Authorization: Bearer <token>"; staff can always open it
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN', '')
+METRICS_FLUSH_INTERVAL = int(os.environ.get('METRICS_FLUSH_INTERVAL', 10)) # Seconds between adding a worker's counts to the cache
+# Requests slower than this are logged with their SQL; a share of them on busy sites
+METRICS_SLOW_REQUEST_MS = int(os.environ.get('METRICS_SLOW_REQUEST_MS', 1000))
+METRICS_SLOW_SAMPLE_RATE = float(os.environ.get('METRICS_SLOW_SAMPLE_RATE', 1.0))
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'plain': {'format': '{asctime} {levelname} {name}: {message}', 'style': '{'},
+    },
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler', 'formatter': 'plain'},
+    },
+    # Our own code; Django's loggers keep their defaults
+    'loggers': {
+        name: {'handlers': ['console'], 'level': os.environ.get('LOG_LEVEL', 'INFO'), 'propagate': False}
+        for name in ('api', 'core')
+    },
+}
+
+# Background jobs (api/jobs.py, run with `manage.py run_jobs`)
+# Max jobs running at once per queue, across all workers
+JOB_QUEUE_CONCURRENCY = {
+    'images': int(os.environ.get('JOB_IMAGES_CONCURRENCY', 2)),
+    'notifications': int(os.environ.get('JOB_NOTIFICATIONS_CONCURRENCY', 4)),
+}
+JOB_LOCK_TIMEOUT = 600 # Seconds before a job from a dead worker is retried
+# Run jobs inline instead of queueing them (local dev without a worker)
+JOBS_RUN_EAGERLY = os.environ.get('JOBS_RUN_EAGERLY', 'False') == 'True'
+
+# Email (seller notifications). Prints to the console unless configured.
+EMAIL_BACKEND = os.environ.get('EMAIL_BACKEND', 'django.core.mail.backends.console.EmailBackend')
+EMAIL_HOST = os.environ.get('EMAIL_HOST', 'localhost')
+EMAIL_PORT = int(os.environ.get('EMAIL_PORT', 25))
+EMAIL_HOST_USER = os.environ.get('EMAIL_HOST_USER', '')
+EMAIL_HOST_PASSWORD = os.environ.get('EMAIL_HOST_PASSWORD', '')
+EMAIL_USE_TLS = os.environ.get('EMAIL_USE_TLS', 'False') == 'True'
+DEFAULT_FROM_EMAIL = os.environ.get('DEFAULT_FROM_EMAIL', 'no-reply@sangrurestate.com')
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -159,12 +263,36 @@ CSRF_TRUSTED_ORIGINS = [
 # DRF Configuration
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        # JWTAuthentication plus a short-lived user/profile cache (api/authentication.py)
+        'api.authentication.CachedJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.AllowAny',
     ],
+    # Every list is paged (at most 100 rows, ?page_size=/?cursor=), see api/pagination.py
+    'DEFAULT_PAGINATION_CLASS': 'api.pagination.KeysetPagination',
+    # Proxies in front of the app that append to X-Forwarded-For (Railway's edge: 1).
+    # The client IP is read that many entries from the right, so the throttles
+    # below can't be dodged by sending a made-up X-Forwarded-For. 0 = no proxy
+    'NUM_PROXIES': int(os.environ.get('NUM_PROXIES', 1)),
+    # Token buckets for the public lead/contact forms (api/submissions.py): N at once, refilled at N per period
+    'DEFAULT_THROTTLE_RATES': {
+        'lead_ip': os.environ.get('LEAD_IP_RATE', '30/hour'),
+        'lead_phone': os.environ.get('LEAD_PHONE_RATE', '10/hour'),
+        'contact_ip': os.environ.get('CONTACT_IP_RATE', '10/hour'),
+    },
 }
+# A lead from the same phone for the same property within this many seconds
+# returns the existing lead; Idempotency-Key headers are remembered this long
+LEAD_DUPLICATE_WINDOW = int(os.environ.get('LEAD_DUPLICATE_WINDOW', 600))
+IDEMPOTENCY_KEY_TIMEOUT = int(os.environ.get('IDEMPOTENCY_KEY_TIMEOUT', 86400))
+# Delta sync (/api/properties/changes/, api/sync.py): deletions are remembered this
+# many days (`manage.py prune_tombstones`), and rows younger than the lag wait for the next sync
+SYNC_TOMBSTONE_DAYS = int(os.environ.get('SYNC_TOMBSTONE_DAYS', 30))
+SYNC_SAFETY_LAG = int(os.environ.get('SYNC_SAFETY_LAG', 5))
+# Compatibility mode: lists come back as plain arrays (next page in the Link header)
+# instead of {"next", "results"}; per request with ?envelope=0 / ?envelope=1
+API_BARE_LISTS = os.environ.get('API_BARE_LISTS', 'False') == 'True'
 
 # Media Config (For Image Uploads)
 STATIC_URL = 'static/'
@@ -176,6 +304,27 @@ STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+STORAGES = {
+    # Uploads are named by content hash (api/storage.py): duplicates are stored
+    # once and every URL can be cached forever. `manage.py gc_media` cleans up.
+    'default': {'BACKEND': 'api.storage.ContentAddressedStorage'},
+    # What Django has used since STATICFILES_STORAGE (above) stopped being read in 5.1
+    'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+}
+
+# Media is served by api/media.py (cache headers, Range). Set MEDIA_SENDFILE to
+# 'x-accel-redirect' (nginx, internal location at MEDIA_ACCEL_PREFIX aliased to
+# MEDIA_ROOT) or 'x-sendfile' (Apache/lighttpd) to hand the bytes to the proxy.
+MEDIA_SENDFILE = os.environ.get('MEDIA_SENDFILE', '')
+MEDIA_ACCEL_PREFIX = os.environ.get('MEDIA_ACCEL_PREFIX', '/protected-media/')
+MEDIA_CACHE_MAX_AGE = int(os.environ.get('MEDIA_CACHE_MAX_AGE', 86400)) # Files not named by content hash
+
+# Chunked photo uploads (api/uploads.py). Partial files live in UPLOAD_TEMP_DIR,
+# which must be shared by all web workers (defaults to the system temp dir)
+UPLOAD_TEMP_DIR = os.environ.get('UPLOAD_TEMP_DIR') or None
+UPLOAD_MAX_SIZE = int(os.environ.get('UPLOAD_MAX_SIZE', 20 * 1024 * 1024))
+UPLOAD_CHUNK_SIZE = int(os.environ.get('UPLOAD_CHUNK_SIZE', 1024 * 1024)) # Largest chunk accepted
+
 SIMPLE_JWT = {
     'USER_ID_FIELD': 'id',
     'USER_ID_CLAIM': 'user_id',
@@ -1,9 +1,16 @@
 from django.contrib import admin
 from django.urls import path, include
 from django.conf import settings
-from django.conf.urls.static import static
+
+from api.media import serve_media
+from api.metrics import metrics_view
+from api.replicas import health_view
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/', include('api.urls')),
-] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
\ No newline at end of file
+    path('metrics/', metrics_view, name='metrics'), # Prometheus (api/metrics.py)
+    path('health/', health_view, name='health'), # Database checks for the platform's health check
+    # Uploaded photos, with long-lived cache headers and Range support (api/media.py)
+    path(f"{settings.MEDIA_URL.strip('/')}/<path:path>", serve_media, name='media'),
+]
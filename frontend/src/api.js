@@ -11,9 +11,57 @@ const api = axios.create({
 });
 
 // --- PUBLIC ENDPOINTS ---
-export const getProperties = () => api.get("/properties/");
+// Lists are paged ({next, results}, at most 100 per page); the listings page filters client-side, so ask for a full page
+export const getProperties = () => api.get("/properties/", { params: { page_size: 100 } });
+// Listings kept in localStorage and brought up to date with /properties/changes/, so a
+// repeat visit downloads only what was added, edited or deleted since the last one
+const SYNC_STORAGE_KEY = "sangrurestate:listings:v1";
+
+export const syncProperties = async () => {
+    let saved = null;
+    try {
+        saved = JSON.parse(localStorage.getItem(SYNC_STORAGE_KEY));
+    } catch {
+        saved = null;
+    }
+    let rows = new Map((saved?.rows || []).map((row) => [row.id, row]));
+    let token = saved?.token;
+
+    for (;;) {
+        let data;
+        try {
+            ({ data } = await api.get("/properties/changes/", { params: token ? { since: token } : {} }));
+        } catch (error) {
+            // Token too old (or unreadable): start again with a full sync
+            if (token && [404, 410].includes(error?.response?.status)) {
+                rows = new Map();
+                token = undefined;
+                continue;
+            }
+            throw error;
+        }
+        data.changed.forEach((row) => rows.set(row.id, row));
+        data.deleted.properties.forEach((id) => rows.delete(id));
+        token = data.sync_token;
+        if (!data.has_more) break;
+    }
+
+    // Newest first, like /properties/
+    const list = [...rows.values()].sort((a, b) => b.created_at.localeCompare(a.created_at) || b.id - a.id);
+    try {
+        localStorage.setItem(SYNC_STORAGE_KEY, JSON.stringify({ token, rows: list }));
+    } catch {
+        // Storage full or disabled: the next visit does a full sync
+    }
+    return list;
+};
+
+// Filtered + paginated search. Pass the `next` URL from the previous page to load more.
+export const searchProperties = (params) => api.get("/properties/search/", { params });
 export const getProperty = (id) => api.get(`/properties/${id}/`);
-export const submitLead = (data) => api.post("/leads/", data);
+// Retrying with the same idempotency key can't create a second lead (the server returns the first one)
+export const submitLead = (data, idempotencyKey) =>
+    api.post("/leads/", data, idempotencyKey ? { headers: { "Idempotency-Key": idempotencyKey } } : undefined);
 
 // --- AUTHENTICATION ---
 // Used in Auth.tsx
@@ -40,6 +88,52 @@ export const createProperty = (formData, token) => {
     return addProperty(formData, token);
 };
 
+// Multipart create on the endpoint that accepts it; photos go up first as upload_ids
+export const createListing = (formData, token) => {
+    return api.post("/properties/create/", formData, getAuthConfig(token));
+};
+
+// --- CHUNKED PHOTO UPLOADS ---
+// Sends one photo in chunks and returns its upload id. A dropped connection
+// only costs the current chunk: we ask the server how much it has and carry on.
+export const uploadPhoto = async (file, token, onProgress) => {
+    const auth = { headers: { Authorization: `Bearer ${token}` } };
+    const { data: upload } = await api.post("/uploads/", { filename: file.name, size: file.size }, auth);
+    let offset = upload.offset;
+    let failures = 0;
+
+    while (offset < file.size) {
+        const end = Math.min(offset + upload.chunk_size, file.size);
+        try {
+            const { data } = await api.put(`/uploads/${upload.id}/`, file.slice(offset, end), {
+                headers: {
+                    ...auth.headers,
+                    "Content-Type": "application/octet-stream",
+                    "Content-Range": `bytes ${offset}-${end - 1}/${file.size}`,
+                },
+            });
+            offset = data.offset;
+            failures = 0;
+            if (onProgress) onProgress(offset / file.size);
+        } catch (error) {
+            const status = error.response?.status;
+            if (status === 409 && error.response.data.offset !== undefined) {
+                offset = error.response.data.offset; // Server already has more (or less) than we thought
+            } else if (!status && failures < 5) {
+                failures += 1; // Network error: wait a little, then resume from the server's offset
+                await new Promise((resolve) => setTimeout(resolve, 1000 * 2 ** failures));
+                const { data } = await api.get(`/uploads/${upload.id}/`, auth);
+                offset = data.offset;
+            } else {
+                throw error;
+            }
+        }
+    }
+
+    await api.post(`/uploads/${upload.id}/complete/`, null, auth);
+    return upload.id;
+};
+
 export const getMyProfile = (token) => {
     return api.get("/profile/", {
         headers: { Authorization: `Bearer ${token}` }
@@ -52,6 +146,14 @@ export const getMyProperties = (token) => {
     });
 };
 
+// Profile, my listings and my interests in one request (each section is {next, results})
+export const getDashboard = (token, params) => {
+    return api.get("/dashboard/", {
+        params,
+        headers: { Authorization: `Bearer ${token}` }
+    });
+};
+
 // Get properties the user has showed interest in (submitted leads)
 export const getMyInterests = (token) => {
     return api.get("/leads/my-interests/", {
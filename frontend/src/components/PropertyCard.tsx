@@ -10,6 +10,9 @@ const BASE_URL = import.meta.env.MODE === "development"
 export interface PropertyImage {
   id: number;
   image: string; 
+  card?: string;   // Resized WebP variants (fall back to `image`)
+  detail?: string;
+  full?: string;
 }
 
 export interface Property {
@@ -22,9 +25,10 @@ export interface Property {
   area: string;
   beds: number | null;
   baths: number | null;
-  images: PropertyImage[];
+  images?: PropertyImage[];     // Detail responses only; lists send cover_image
+  cover_image?: string | null;
   status: string;
-  description: string | null;
+  description?: string | null;
   created_at: string;
 }
 
@@ -38,9 +42,10 @@ const PropertyCard = ({ property, onClick }: PropertyCardProps) => {
   // --- FIXED IMAGE LOGIC START ---
   let mainImage = "https://images.unsplash.com/photo-1564013799919-ab600027ffc6?w=800&auto=format&fit=crop&q=60";
 
-  if (property.images && property.images.length > 0) {
-    const imgPath = property.images[0].image;
-    
+  const imgPath = property.cover_image
+    || (property.images && property.images.length > 0 && (property.images[0].card || property.images[0].image));
+
+  if (imgPath) {
     // Check if the path is relative (starts with /) and add the backend URL
     if (imgPath.startsWith('/')) {
       mainImage = `${BASE_URL}${imgPath}`;
@@ -10,7 +10,7 @@ import {
   DialogHeader,
   DialogTitle,
 } from "@/components/ui/dialog";
-import { useState } from "react";
+import { useRef, useState } from "react";
 import { submitLead } from "@/api"; // Use your new API helper
 import { toast } from "sonner";
 
@@ -24,6 +24,8 @@ const PropertyModal = ({ property, isOpen, onClose }: PropertyModalProps) => {
   const [isSubmitting, setIsSubmitting] = useState(false);
   const [formData, setFormData] = useState({ name: "", phone: "" });
   const [showSuccess, setShowSuccess] = useState(false);
+  // One key per enquiry: a retry after a dropped response reuses it instead of sending a duplicate
+  const idempotencyKey = useRef<string | null>(null);
   
   // State to track which image is currently being viewed in the main frame
   const [activeImageIndex, setActiveImageIndex] = useState(0);
@@ -40,6 +42,7 @@ const PropertyModal = ({ property, isOpen, onClose }: PropertyModalProps) => {
     }
 
     setIsSubmitting(true);
+    idempotencyKey.current ??= crypto.randomUUID?.() ?? `${Date.now()}-${Math.random()}`;
     
     try {
       // Call Django API: POST /api/leads/
@@ -47,8 +50,9 @@ const PropertyModal = ({ property, isOpen, onClose }: PropertyModalProps) => {
         property: property.id, // Linking the lead to this property ID
         buyer_name: formData.name,
         buyer_phone: formData.phone,
-      });
+      }, idempotencyKey.current);
 
+      idempotencyKey.current = null;
       setShowSuccess(true);
       setFormData({ name: "", phone: "" });
       toast.success("Request submitted successfully!");
@@ -58,7 +62,11 @@ const PropertyModal = ({ property, isOpen, onClose }: PropertyModalProps) => {
       }, 3000);
     } catch (error) {
       console.error("Error submitting lead:", error);
-      toast.error("Failed to submit request. Please try again.");
+      if (error?.response?.status === 429) {
+        toast.error("Too many requests. Please wait a few minutes and try again.");
+      } else {
+        toast.error("Failed to submit request. Please try again.");
+      }
     } finally {
       setIsSubmitting(false);
     }
@@ -5,7 +5,7 @@ import Footer from "@/components/Footer";
 import { Button } from "@/components/ui/button";
 import { Card, CardContent, CardHeader, CardTitle, CardDescription } from "@/components/ui/card";
 import { Tabs, TabsContent, TabsList, TabsTrigger } from "@/components/ui/tabs";
-import { getMyProperties, getMyInterests, getMyProfile } from "@/api";
+import { getDashboard } from "@/api";
 import { 
   Building2, 
   Users, 
@@ -68,26 +68,11 @@ const Dashboard = () => {
     }
 
     try {
-      // 1. Get User Profile
-      const profileRes = await getMyProfile(token);
-      setUser(profileRes.data);
-
-      // 2. Get My Listings
-      try {
-        const listingsRes = await getMyProperties(token);
-        setMyListings(listingsRes.data);
-      } catch (e) {
-        console.log("No listings found");
-      }
-
-      // 3. Get My Interests
-      try {
-        const interestsRes = await getMyInterests(token);
-        setMyInterests(interestsRes.data);
-      } catch (e) {
-        console.log("No interests found");
-      }
-
+      // Profile, listings and interests in a single round trip
+      const { data } = await getDashboard(token, { listings_page_size: 100, interests_page_size: 100 });
+      setUser(data.profile);
+      setMyListings(data.listings.results);
+      setMyInterests(data.interests.results);
     } catch (error) {
       console.error("Dashboard Error:", error);
       toast.error("Failed to load dashboard data");
@@ -10,7 +10,7 @@ import { Card, CardContent, CardHeader, CardTitle } from "@/components/ui/card";
 import { Select, SelectContent, SelectItem, SelectTrigger, SelectValue } from "@/components/ui/select";
 import { UploadCloud, X, Loader2, User } from "lucide-react";
 import { toast } from "sonner";
-import { addProperty, getMyProfile } from "@/api"; 
+import { createListing, getMyProfile, uploadPhoto } from "@/api"; 
 
 const ListProperty = () => {
   const navigate = useNavigate();
@@ -101,12 +101,12 @@ const ListProperty = () => {
         formData.append(key, value);
       });
 
-      // Append all images
-      imageFiles.forEach((file) => {
-        formData.append('uploaded_images', file);
-      });
+      // Photos go up one by one in small resumable chunks; the create call only carries their ids
+      for (const file of imageFiles) {
+        formData.append('upload_ids', await uploadPhoto(file, token));
+      }
 
-      await addProperty(formData, token);
+      await createListing(formData, token);
 
       toast.success("Property listed successfully!");
       navigate("/properties"); // Redirect to listings page
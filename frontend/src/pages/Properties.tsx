@@ -4,7 +4,7 @@ import Navbar from "@/components/Navbar";
 import Footer from "@/components/Footer";
 import PropertyGrid from "@/components/PropertyGrid";
 // Remove PropertyModal import if you aren't using it anymore
-import { getProperties } from "@/api";
+import { syncProperties } from "@/api";
 import { Property } from "@/components/PropertyCard";
 import { Input } from "@/components/ui/input";
 import { Label } from "@/components/ui/label";
@@ -47,9 +47,8 @@ const Properties = () => {
   const fetchData = async () => {
     setIsLoading(true);
     try {
-      const response = await getProperties();
-      const data = response.data.results || response.data;
-      setProperties(Array.isArray(data) ? data : []);
+      // Only the changes since the last visit come over the network
+      setProperties(await syncProperties());
     } catch (error) {
       console.error("Fetch error:", error);
     } finally {
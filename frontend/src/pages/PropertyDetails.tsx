@@ -18,6 +18,8 @@ import { toast } from "sonner";
 interface PropertyImage {
   id: number;
   image: string;
+  card?: string;   // Resized WebP variants (fall back to `image`)
+  detail?: string;
 }
 
 interface Property {
@@ -58,7 +60,7 @@ const PropertyDetails = () => {
       
       // Set the first image as active by default
       if (data.images && data.images.length > 0) {
-        setActiveImage(data.images[0].image);
+        setActiveImage(data.images[0].detail || data.images[0].image);
       }
     } catch (error) {
       console.error("Error fetching property:", error);
@@ -178,12 +180,12 @@ const PropertyDetails = () => {
                     {property.images.map((img) => (
                       <button
                         key={img.id}
-                        onClick={() => setActiveImage(img.image)}
+                        onClick={() => setActiveImage(img.detail || img.image)}
                         className={`relative w-24 h-24 flex-shrink-0 rounded-lg overflow-hidden border-2 transition-all ${
-                          activeImage === img.image ? 'border-primary ring-2 ring-primary/20' : 'border-transparent opacity-70 hover:opacity-100'
+                          activeImage === (img.detail || img.image) ? 'border-primary ring-2 ring-primary/20' : 'border-transparent opacity-70 hover:opacity-100'
                         }`}
                       >
-                        <img src={img.image} alt="Thumbnail" className="w-full h-full object-cover" />
+                        <img src={img.card || img.image} alt="Thumbnail" className="w-full h-full object-cover" />
                       </button>
                     ))}
                   </div>